@@ -10,8 +10,15 @@ if [[ "${ROLE}" == "migrate" ]]; then
 fi
 
 if [[ "${ROLE}" == "worker" ]]; then
-  celery -A sophistry worker -l INFO -Q default --concurrency="${CELERY_CONCURRENCY:-4}"
+  BEAT=()
+  # one worker should also run the periodic tasks (learned-vocab compaction)
+  if [[ "${CELERY_BEAT:-false}" == "true" ]]; then
+    BEAT=(--beat --schedule /tmp/celerybeat-schedule)
+  fi
+  celery -A sophistry worker -l INFO -Q default --concurrency="${CELERY_CONCURRENCY:-4}" "${BEAT[@]}"
   exit 0
 fi
 
-gunicorn sophistry.wsgi:application --bind 0.0.0.0:8000 --workers "${WEB_WORKERS:-2}" --timeout 120
+# gunicorn with scoring state preloaded and shared by the workers;
+# WEB_WORKERS / WEB_THREADS override the CPU-based sizing
+exec python manage.py serve
@@ -0,0 +1,59 @@
+"""Bulk scoring and keyword extraction in worker processes, without Django.
+
+Workers import only the plain-Python scoring core, so a spawned worker starts
+in well under a second and never opens DB connections. The parent passes
+the base vocab dict and ScoringConfig through ``init_worker``, and the
+question-side inputs with every chunk. Each score is the same as
+``scoring.score_case(..., use_cache=False)`` in the parent.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DEFAULT_CONFIG, ScoringConfig
+from .engine import Question, case_result, evaluate
+from .structural_scoring import CompiledVocab, compile_vocab
+from .text_analysis import analyze
+from .vocab_learner import OverlayCache, extract_keywords, learned_revision
+
+_vocab: Optional[CompiledVocab] = None
+_config: ScoringConfig = DEFAULT_CONFIG
+_overlays: Optional[OverlayCache] = None
+
+
+def init_worker(vocab: Any, config: ScoringConfig) -> None:
+    """Pool initializer: compile the base vocab (a dict, or a CompiledVocab in-process) once per worker."""
+    global _vocab, _config, _overlays
+    _vocab = compile_vocab(vocab)
+    _config = config
+    _overlays = OverlayCache(maxsize=config.overlay_cache_size)
+
+
+def score_chunk(cases: Dict[int, Tuple], rows: List[Tuple]) -> List[Tuple]:
+    """
+    Score one chunk. ``cases`` maps testcase id to (prompt, learned_vocab,
+    slug, question_analysis); ``rows`` are (result_id, testcase_id, answer).
+    Returns [(result_id, score, score_details)].
+    """
+    if _vocab is None:
+        raise RuntimeError("init_worker() has not been called in this process")
+    out = []
+    questions: Dict[int, Question] = {}
+    for result_id, tc_id, answer in rows:
+        q = questions.get(tc_id)
+        if q is None:
+            prompt, learned, slug, analysis = cases[tc_id]
+            vocab = _overlays.get(_vocab, learned, slug)
+            q = questions[tc_id] = Question(prompt, vocab, analysis, _config, learned_revision(learned))
+        res = case_result(evaluate(q, answer, verdict=False, config=_config), q.vocab)
+        raw = res.get("score", 0) or 0
+        # same normalization as mobile_answer
+        out.append((result_id, round(raw if raw <= 1.0 else raw / 100.0, 2), res))
+    return out
+
+
+def extract_chunk(texts: List[str], config: ScoringConfig) -> List[List[str]]:
+    """Learner keywords of each answer, budgeted as in mobile_answer (for relearn_vocab)."""
+    limit = config.max_analyzed_chars
+    return [extract_keywords(analyze(text or "", limit)) for text in texts]
@@ -0,0 +1,94 @@
+"""Scoring configuration, independent of Django.
+
+The scoring core (text_analysis, structural, structural_scoring, engine,
+vocab_learner, incremental, profiling) reads its limits from a ScoringConfig
+instead of ``django.conf.settings``, so it can be imported and used without
+``django.setup()``: in process-pool workers, benchmarks and CLI tools.
+
+``ScoringConfig.from_env()`` reads the same SCORING_* variables as
+sophistry/settings.py, so the core's defaults (``DEFAULT_CONFIG``) match a
+Django process started with the same environment. Inside Django, scoring.py
+builds its config with ``from_settings(settings)``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+_TRUTHY = ("1", "true", "yes", "y")
+# fields that change scores for the same inputs (the rest size caches and switch features)
+_SCORING_FIELDS = ("min_words", "min_sentences", "max_analyzed_chars")
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    # minimum answer length for the legacy verdict / validation
+    min_words: int = 23
+    min_sentences: int = 2
+    # only the first N characters of an answer/prompt are analyzed (0 = no limit)
+    max_analyzed_chars: int = 20000
+    # how often each process checks for a changed vocab (0 disables)
+    vocab_reload_seconds: float = 30
+    # per-process LRU sizes
+    overlay_cache_size: int = 256
+    preview_state_size: int = 1024
+    # score_case cache: TTL in seconds (0 disables), L1 entries, CACHES alias (None for L1 only)
+    score_cache_ttl: int = 3600
+    score_cache_l1_size: int = 2048
+    score_cache_alias: Optional[str] = "default"
+    # per-stage timers (profiling.PROFILER)
+    profile: bool = False
+    # learned vocab: terms tracked per question, and answers per halving of their counts (0 = never)
+    learned_counters: int = 400
+    learned_half_life: int = 1000
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "ScoringConfig":
+        env = os.environ if environ is None else environ
+        d = cls()
+        return cls(
+            min_words=int(env.get("SCORING_MIN_WORDS", d.min_words)),
+            min_sentences=int(env.get("SCORING_MIN_SENTENCES", d.min_sentences)),
+            max_analyzed_chars=int(env.get("SCORING_MAX_ANALYZED_CHARS", d.max_analyzed_chars)),
+            vocab_reload_seconds=float(env.get("SCORING_VOCAB_RELOAD_SECONDS", d.vocab_reload_seconds)),
+            overlay_cache_size=int(env.get("SCORING_OVERLAY_CACHE_SIZE", d.overlay_cache_size)),
+            preview_state_size=int(env.get("SCORING_PREVIEW_STATE_SIZE", d.preview_state_size)),
+            score_cache_ttl=int(env.get("SCORING_CACHE_TTL", d.score_cache_ttl)),
+            score_cache_l1_size=int(env.get("SCORING_CACHE_L1_SIZE", d.score_cache_l1_size)),
+            score_cache_alias=env.get("SCORING_CACHE_ALIAS", d.score_cache_alias) or None,
+            profile=env.get("SCORING_PROFILE", "false").lower() in _TRUTHY,
+            learned_counters=int(env.get("SCORING_LEARNED_COUNTERS", d.learned_counters)),
+            learned_half_life=int(env.get("SCORING_LEARNED_HALF_LIFE", d.learned_half_life)),
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ScoringConfig":
+        """Config from a Django settings object (SOPHISTRY_* names; missing ones keep the defaults)."""
+        d = cls()
+        return cls(
+            min_words=getattr(settings, "SOPHISTRY_MIN_WORDS", d.min_words),
+            min_sentences=getattr(settings, "SOPHISTRY_MIN_SENTENCES", d.min_sentences),
+            max_analyzed_chars=getattr(settings, "SOPHISTRY_MAX_ANALYZED_CHARS", d.max_analyzed_chars),
+            vocab_reload_seconds=getattr(settings, "SOPHISTRY_VOCAB_RELOAD_SECONDS", d.vocab_reload_seconds),
+            overlay_cache_size=getattr(settings, "SOPHISTRY_OVERLAY_CACHE_SIZE", d.overlay_cache_size),
+            preview_state_size=getattr(settings, "SOPHISTRY_PREVIEW_STATE_SIZE", d.preview_state_size),
+            score_cache_ttl=getattr(settings, "SOPHISTRY_SCORE_CACHE_TTL", d.score_cache_ttl),
+            score_cache_l1_size=getattr(settings, "SOPHISTRY_SCORE_CACHE_L1_SIZE", d.score_cache_l1_size),
+            score_cache_alias=getattr(settings, "SOPHISTRY_SCORE_CACHE_ALIAS", d.score_cache_alias) or None,
+            profile=getattr(settings, "SOPHISTRY_PROFILE_SCORING", d.profile),
+            learned_counters=getattr(settings, "SOPHISTRY_LEARNED_COUNTERS", d.learned_counters),
+            learned_half_life=getattr(settings, "SOPHISTRY_LEARNED_HALF_LIFE", d.learned_half_life),
+        )
+
+    def replace(self, **changes: Any) -> "ScoringConfig":
+        return dataclasses.replace(self, **changes)
+
+    def scoring_values(self) -> Dict[str, Any]:
+        """The values that affect scores (e.g. for cache keys)."""
+        return {name: getattr(self, name) for name in _SCORING_FIELDS}
+
+
+DEFAULT_CONFIG = ScoringConfig.from_env()
@@ -0,0 +1,190 @@
+"""One scoring pass over an answer, producing both verdicts.
+
+- the structural alignment payload (0-1, ``score_case`` / Result.score_details),
+  from structural_scoring.score_structural_alignment;
+- the legacy band verdict (0-100, ``score_answer``), from
+  structural.score_structural.
+
+Both scorers read the same AnalyzedText, so the answer is lowercased,
+normalized and tokenized once however many verdicts are requested. The
+question side (vector, prompt type, prompt keywords) is computed at most once
+per Question, or taken from a stored ``question_analysis``. The outputs are
+exactly those of calling the two scorers directly.
+
+This module and everything it imports are plain Python (no Django): limits
+come from a ScoringConfig (``config.DEFAULT_CONFIG`` unless given), and
+``case_result`` / ``answer_result`` build the payloads stored in
+Result.score_details. scoring.py adapts it to the Django models, settings and
+caches.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DEFAULT_CONFIG, ScoringConfig
+from .structural import StructuralVerdict, classify_prompt_type, extract_keywords, score_structural
+from .structural_scoring import (
+    CompiledVocab,
+    StructuralVector,
+    compile_vocab,
+    infer_structural_vector,
+    score_structural_alignment,
+    vector_from_dict,
+)
+from .text_analysis import AnalyzedText, TextLike, analyze
+
+
+class Question:
+    """Question-side scoring inputs, derived lazily and at most once."""
+
+    def __init__(
+        self,
+        prompt: TextLike,
+        vocab: Any,
+        analysis: Optional[Dict[str, Any]] = None,
+        config: Optional[ScoringConfig] = None,
+        learned_revision: str = "0",
+    ):
+        """
+        ``analysis`` is an optional ``question_analysis`` for ``prompt``. Its
+        vector is used only if it was computed with ``vocab``'s version and,
+        as a learned-vocab overlay keeps its base vocab's version, the
+        ``learned_revision`` of the learned vocab ``vocab`` includes ("0" for
+        none). Its prompt type and keywords only depend on the prompt. A str
+        ``prompt`` is analyzed within ``config.max_analyzed_chars``.
+        """
+        config = config or DEFAULT_CONFIG
+        self.text = analyze(prompt, config.max_analyzed_chars)
+        self.prompt = self.text.raw
+        self.vocab: CompiledVocab = compile_vocab(vocab)
+        self.analysis = analysis or {}
+        self.learned_revision = learned_revision
+
+    @cached_property
+    def vector(self) -> Tuple[StructuralVector, Dict[str, Any]]:
+        a = self.analysis
+        # an analysis from before a vocab swap or a learned-vocab update is
+        # ignored rather than mixed in
+        if (
+            a.get("vocab_version") == self.vocab.version
+            and a.get("learned_revision") == self.learned_revision
+            and "vector" in a
+        ):
+            return vector_from_dict(a["vector"], self.vocab), a["debug"]
+        return infer_structural_vector(self.text, self.vocab)
+
+    @cached_property
+    def prompt_type(self) -> str:
+        return self.analysis.get("prompt_type") or classify_prompt_type(self.prompt)
+
+    @cached_property
+    def prompt_keywords(self) -> List[str]:
+        kws = self.analysis.get("prompt_keywords")
+        return kws if kws is not None else extract_keywords(self.text)
+
+
+@dataclass
+class Evaluation:
+    answer: AnalyzedText
+    alignment: Optional[Dict[str, Any]] = None
+    verdict: Optional[StructuralVerdict] = None
+
+
+def evaluate(
+    question: Question,
+    answer: TextLike,
+    *,
+    alignment: bool = True,
+    verdict: bool = True,
+    min_words: Optional[int] = None,
+    min_sentences: Optional[int] = None,
+    weights: Optional[Dict[str, float]] = None,
+    answer_vector: Optional[Tuple[StructuralVector, Dict[str, Any]]] = None,
+    config: Optional[ScoringConfig] = None,
+) -> Evaluation:
+    """
+    Score ``answer`` against ``question``; ``alignment`` / ``verdict`` select
+    the outputs. ``min_words`` / ``min_sentences`` default to ``config``'s.
+    ``answer_vector`` is an optional precomputed answer vector (e.g. from an
+    incremental preview state). A str ``answer`` is analyzed within
+    ``config.max_analyzed_chars``.
+    """
+    config = config or DEFAULT_CONFIG
+    a = analyze(answer, config.max_analyzed_chars)
+    out = Evaluation(a)
+    if alignment:
+        out.alignment = score_structural_alignment(
+            question.text,
+            a,
+            question.vocab,
+            weights=weights,
+            question_vector=question.vector,
+            answer_vector=answer_vector,
+        )
+    if verdict:
+        out.verdict = score_structural(
+            question.prompt,
+            a,
+            prompt_type=question.prompt_type,
+            prompt_keywords=question.prompt_keywords,
+            min_words=config.min_words if min_words is None else min_words,
+            min_sentences=config.min_sentences if min_sentences is None else min_sentences,
+        )
+    return out
+
+
+def case_result(ev: Evaluation, vocab: CompiledVocab) -> Dict[str, Any]:
+    """The score_case payload for an evaluation with ``alignment``."""
+    structural = ev.alignment
+    structural["vocab_version"] = vocab.version
+    if ev.answer.truncated:
+        structural["truncated"] = {
+            "analyzed_chars": len(ev.answer.raw),
+            "total_chars": ev.answer.original_length,
+        }
+    return {
+        "score": structural["structural_score"],
+        "score_details": structural,
+    }
+
+
+def validation_limits(expected: Any, config: Optional[ScoringConfig] = None) -> Tuple[int, int]:
+    """``(min_words, min_sentences)`` for a testcase's ``expected``.
+
+    Defaults from ``config``, overridable per testcase via expected.validation.
+    """
+    config = config or DEFAULT_CONFIG
+    validation = expected.get("validation") if isinstance(expected, dict) else None
+    min_words = config.min_words
+    min_sentences = config.min_sentences
+    if isinstance(validation, dict):
+        min_words = int(validation.get("min_words") or min_words)
+        min_sentences = int(validation.get("min_sentences") or min_sentences)
+    return min_words, min_sentences
+
+
+def answer_result(ev: Evaluation, min_words: int, min_sentences: int) -> Dict[str, Any]:
+    """The score_answer payload for an evaluation with ``verdict``."""
+    v = ev.verdict
+    if ev.answer.truncated:
+        v.signals["truncated"] = True
+    wc = int(v.signals.get("word_count", 0) or 0)
+    sc = int(v.signals.get("sentence_count", 0) or 0)
+    val_ok = (wc >= min_words) and (sc >= min_sentences)
+
+    return {
+        "score_0_100": v.score_0_100,
+        "band": v.band,
+        "signals": v.signals,
+        "notes": v.notes,
+        "validation": {
+            "min_words": min_words,
+            "min_sentences": min_sentences,
+            "word_count": wc,
+            "sentence_count": sc,
+            "ok": val_ok,
+        },
+    }
@@ -0,0 +1,120 @@
+"""LearnedVocabField: TestCase.learned_vocab stored as interned term ids.
+
+Code reading ``learned_vocab`` keeps seeing the plain dict (domain_keywords,
+term_counts, ...). Writes are packed explicitly: ``pack_learned_vocabs``
+interns the terms into the Term table and returns the term-id form
+(terms.pack) to store. TestCase.save and the bulk writers in evals.learning
+call it. Storing a plain dict is still valid, just not compact. Value prep
+never writes, so lookups and reads are safe on replicas and in read-only
+transactions.
+
+On load, ids are resolved through the process-wide ``TERMS`` index. When a
+row refers to an id the index lacks, one query fetches those ids and every
+term newer than the index, so the rest of the queryset resolves from memory
+rather than with a query per row.
+
+Term rows are never updated or deleted, so an id seen in a committed row
+always means the same term. Ids learned inside a transaction are only added
+to ``TERMS`` once it commits.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import ChainMap
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from django.apps import apps
+from django.db import connections, models, transaction
+from django.db.models import Q
+
+from .terms import TermIndex, ids_of, is_packed, pack, terms_of, unpack
+
+logger = logging.getLogger(__name__)
+
+TERMS = TermIndex()
+
+# Term rows are written on the primary
+PRIMARY = "default"
+
+
+def _term_model():
+    return apps.get_model("evals", "Term")
+
+
+def _remember(pairs: List[tuple], using: str) -> None:
+    if connections[using].in_atomic_block:
+        transaction.on_commit(lambda: TERMS.add(pairs), using=using)
+    else:
+        TERMS.add(pairs)
+
+
+def load_terms(using: str = PRIMARY) -> int:
+    """Fill TERMS with the whole Term table (e.g. before forking workers)."""
+    rows = _term_model().objects.using(using).values_list("id", "text")
+    if connections[using].in_atomic_block:
+        # uncommitted ids must not reach TERMS before the commit
+        _remember(list(rows), using)
+    else:
+        TERMS.add(rows.iterator(chunk_size=5000))
+    return len(TERMS)
+
+
+def resolve_ids(ids: Iterable[int], using: str) -> Mapping[int, str]:
+    """id -> term covering ``ids``: TERMS, plus one query for its missing ids and any newer terms."""
+    missing = TERMS.missing(ids)
+    if not missing:
+        return TERMS.texts
+    pairs = list(
+        _term_model()
+        .objects.using(using)
+        .filter(Q(id__in=missing) | Q(id__gt=TERMS.max_id))
+        .values_list("id", "text")
+    )
+    _remember(pairs, using)
+    known: Dict[int, str] = dict(pairs)
+    unknown = [i for i in missing if i not in known]
+    if unknown:
+        logger.warning("learned_vocab refers to %d unknown term ids (e.g. %s)", len(unknown), unknown[0])
+    return ChainMap(known, TERMS.texts)
+
+
+def intern_terms(texts: Iterable[str], using: str = PRIMARY) -> Dict[str, int]:
+    """term -> id for ``texts``, creating Term rows for new terms."""
+    known, missing = TERMS.ids(texts)
+    if not missing:
+        return known
+    Term = _term_model()
+    manager = Term.objects.using(using)
+    manager.bulk_create([Term(text=t) for t in missing], ignore_conflicts=True, batch_size=1000)
+    pairs = list(manager.filter(text__in=missing).values_list("id", "text"))
+    _remember(pairs, using)
+    known.update((text, term_id) for term_id, text in pairs)
+    return known
+
+
+def _packable(learned: Any) -> bool:
+    return isinstance(learned, dict) and not is_packed(learned) and (
+        "domain_keywords" in learned or "term_counts" in learned
+    )
+
+
+def pack_learned_vocabs(vocabs: List[Optional[dict]], using: str = PRIMARY) -> List[Optional[dict]]:
+    """The term-id form of each learned vocab to store, interning all their terms in one batch."""
+    texts = set()
+    for learned in vocabs:
+        if _packable(learned):
+            texts |= terms_of(learned)
+    ids = intern_terms(texts, using) if texts else {}
+    return [pack(learned, ids) if _packable(learned) else learned for learned in vocabs]
+
+
+class LearnedVocabField(models.JSONField):
+    def from_db_value(self, value, expression, connection):
+        value = super().from_db_value(value, expression, connection)
+        if not is_packed(value):
+            return value
+        try:
+            return unpack(value, TERMS.texts)
+        except KeyError:
+            return unpack(value, resolve_ids(ids_of(value), connection.alias), drop_unknown=True)
@@ -0,0 +1,224 @@
+"""Incremental scoring of an answer that is being typed.
+
+The mobile client re-scores the answer on (nearly) every keystroke, so each
+request usually differs from the one before it by a few characters at the end.
+AnswerState keeps what scoring needs from the last text the server saw for a
+session and testcase: word and sentence boundaries, domain keyword positions and
+the position of each label's match. The next revision only re-scans from
+where the two texts start to differ, which gives the same counts, vector and
+score as analysing the whole text again.
+
+States live in a bounded in-process LRU (PreviewStates). A miss, for example
+on another worker or after an eviction or vocab swap, scores the full text and
+starts a new state. A state names the vocab it was built with by key (e.g.
+vocab_learner.overlay_key) rather than holding it, so stored previews never
+keep an overlay alive after OverlayCache has evicted it; the caller passes
+the vocab for that key back in.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .structural_scoring import (
+    CompiledVocab,
+    StructuralVector,
+    _pick_domain,
+    _scope_of,
+    vector_debug,
+    vector_from_matches,
+)
+from .text_analysis import _SENT_SPLIT_RE, _WORD_RE, analyze
+
+# a character that can never be inside a _WORD_RE token
+_BREAK_RE = re.compile(r"[^\w']")
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    if a[:n] == b[:n]:
+        return n
+    lo, hi = 0, n  # a[:lo] == b[:lo], a[:hi] != b[:hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+class AnswerState:
+    """Scoring inputs for one revision of an answer, resumable for the next."""
+
+    __slots__ = (
+        "vocab_key",
+        "revision",
+        "raw",
+        "word_ends",
+        "stripped",
+        "sep_ends",
+        "sentences_before",
+        "sentence_count",
+        "normalized",
+        "keyword_starts",
+        "label_spans",
+    )
+
+    def __init__(self, vocab_key: Hashable, revision: Any = None):
+        self.vocab_key = vocab_key
+        self.revision = revision
+        self.raw = ""
+        self.word_ends = array("l")
+        self.stripped = ""
+        # end offset of each sentence separator in ``stripped``, and the number
+        # of non-blank sentences that precede it
+        self.sep_ends = array("l")
+        self.sentences_before = array("l")
+        self.sentence_count = 0
+        self.normalized = ""
+        self.keyword_starts: Dict[str, int] = {}
+        # intent, level, mode, scope: label index -> (start, end) in normalized
+        self.label_spans: Tuple[Dict[int, Tuple[int, int]], ...] = ({}, {}, {}, {})
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_ends)
+
+    def vector(self, cv: CompiledVocab) -> Tuple[StructuralVector, Dict[str, Any]]:
+        """Same result as ``infer_structural_vector(text, cv)``; ``cv`` is the vocab ``vocab_key`` names."""
+        counts = cv.domain_matcher.counts_for(self.keyword_starts)
+        intent, level, mode, scope = (m.mask_of(s) for m, s in zip(_axes(cv), self.label_spans))
+        vec = vector_from_matches(cv, _pick_domain(counts), intent, level, mode, _scope_of(scope, cv.scope))
+        return vec, vector_debug(vec, counts)
+
+
+def _axes(cv: CompiledVocab):
+    return (cv.intent, cv.level, cv.mode, cv.scope)
+
+
+def _update_words(state: AnswerState, prev: Optional[AnswerState], raw: str) -> None:
+    start = 0
+    ends = array("l")
+    if prev is not None:
+        # resume after the last non-word character both texts share: no token
+        # spans it, so every token before it is unchanged
+        i = _common_prefix_len(prev.raw, raw) - 1
+        while i >= 0 and not _BREAK_RE.match(raw, i):
+            i -= 1
+        if i >= 0:
+            start = i
+            ends = prev.word_ends[: bisect_right(prev.word_ends, i)]
+    ends.extend(m.end() for m in _WORD_RE.finditer(raw, start))
+    state.raw = raw
+    state.word_ends = ends
+
+
+def _update_sentences(state: AnswerState, prev: Optional[AnswerState], t: str) -> None:
+    # mirrors AnalyzedText.sentence_spans / sentence_count
+    start = 0
+    kept = 0
+    if prev is not None:
+        # a separator that ends before the first changed character is the
+        # same separator in the new text (one character kept back for "$")
+        k = bisect_right(prev.sep_ends, _common_prefix_len(prev.stripped, t) - 1)
+        if k:
+            start = prev.sep_ends[k - 1]
+            kept = prev.sentences_before[k - 1]
+            state.sep_ends = prev.sep_ends[:k]
+            state.sentences_before = prev.sentences_before[:k]
+    n = kept
+    for m in _SENT_SPLIT_RE.finditer(t, start):
+        if t[start:m.start()].strip():
+            n += 1
+        start = m.end()
+        state.sep_ends.append(start)
+        state.sentences_before.append(n)
+    if t[start:].strip():
+        n += 1
+    state.stripped = t
+    state.sentence_count = max(1, n) if t else 0
+
+
+def answer_state(
+    text: str,
+    vocab: CompiledVocab,
+    vocab_key: Hashable,
+    prev: Optional[AnswerState] = None,
+    revision: Any = None,
+) -> AnswerState:
+    """
+    Analyze ``text`` with ``vocab`` (identified by ``vocab_key``: vocabs with
+    equal keys must have the same content), resuming from ``prev`` (the
+    state of an earlier revision) when it was built with the same vocab.
+    """
+    if prev is not None and prev.vocab_key != vocab_key:
+        prev = None
+    a = analyze(text)
+    state = AnswerState(vocab_key, revision)
+    _update_words(state, prev, a.raw)
+    _update_sentences(state, prev, a.stripped)
+
+    t = a.normalized
+    state.normalized = t
+    if prev is None:
+        state.keyword_starts = vocab.domain_matcher.starts(t)
+        state.label_spans = tuple(m.spans(t) for m in _axes(vocab))
+    else:
+        p = _common_prefix_len(prev.normalized, t)
+        state.keyword_starts = vocab.domain_matcher.update_starts(prev.keyword_starts, t, p)
+        state.label_spans = tuple(
+            m.update_spans(s, t, p) for m, s in zip(_axes(vocab), prev.label_spans)
+        )
+    return state
+
+
+class PreviewStates:
+    """Bounded LRU of the latest AnswerState per (session, testcase)."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._states: "OrderedDict[Hashable, AnswerState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def update(
+        self, key: Hashable, text: str, vocab: CompiledVocab, vocab_key: Hashable, revision: Any = None
+    ) -> AnswerState:
+        """State for ``text``, resumed from the last one stored under ``key``."""
+        with self._lock:
+            prev = self._states.get(key)
+        if prev is not None and prev.vocab_key == vocab_key:
+            self.hits += 1
+        else:
+            self.misses += 1
+        state = answer_state(text, vocab, vocab_key, prev, revision)
+        if self.maxsize <= 0:
+            return state
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+        return state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._states),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
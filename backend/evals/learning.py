@@ -0,0 +1,123 @@
+"""Learned-vocab updates from answers, off the request path.
+
+Answer submission appends the answer's keywords to the AnswerTerms log
+(``record_answer_terms``) instead of rewriting TestCase.learned_vocab, so
+concurrent answers to the same question are plain inserts rather than
+read-modify-writes of one hot row.
+
+``compact_answer_terms`` (run periodically by the compact_learned_vocab
+Celery task) merges the log into learned_vocab in batches. Each batch locks
+the log rows it takes (skipping rows another compactor holds) and the
+testcases they belong to. It merges the terms, bumps learned_vocab's
+``revision`` counter, refreshes the stored question analysis and deletes the
+merged rows, all in one transaction, so every logged answer is merged
+exactly once.
+
+``store_relearned_vocab`` writes learned vocabs rebuilt from the Result
+history (manage.py relearn_vocab) the same way, dropping the log rows the
+rebuild already covers.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .fields import pack_learned_vocabs
+from .models import AnswerTerms, TestCase
+from .scoring import CONFIG, question_analysis
+from .vocab_learner import learn_answers
+
+logger = logging.getLogger(__name__)
+
+# compaction reads and writes the primary (the router sends reads to replicas)
+DB = "default"
+
+
+def record_answer_terms(testcase: TestCase, terms: List[str]) -> None:
+    """Append one answer's keywords to the log for the next compaction."""
+    AnswerTerms.objects.using(DB).create(testcase=testcase, terms=list(terms))
+
+
+def _store(testcases: List[TestCase]) -> None:
+    """bulk_update learned_vocab (as term ids, see evals.fields) and question_analysis."""
+    packed = pack_learned_vocabs([tc.learned_vocab for tc in testcases], DB)
+    for tc, learned in zip(testcases, packed):
+        tc.learned_vocab = learned
+    TestCase.objects.using(DB).bulk_update(testcases, ["learned_vocab", "question_analysis"])
+
+
+def _compact_batch(batch_size: int) -> Dict[str, int]:
+    with transaction.atomic(using=DB):
+        rows = list(
+            AnswerTerms.objects.using(DB)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "testcase_id", "terms")[:batch_size]
+        )
+        if not rows:
+            return {"answers": 0, "testcases": 0}
+        by_tc: Dict[int, List[list]] = defaultdict(list)
+        for _id, tc_id, terms in rows:
+            by_tc[tc_id].append(terms or [])
+
+        testcases = list(
+            TestCase.objects.using(DB)
+            .select_for_update()
+            .filter(id__in=by_tc)
+            .order_by("id")
+            .only("id", "slug", "prompt", "learned_vocab", "question_analysis")
+        )
+        for tc in testcases:
+            merged = learn_answers(tc.learned_vocab, by_tc[tc.id], config=CONFIG)
+            merged["revision"] = int((tc.learned_vocab or {}).get("revision", 0)) + 1
+            tc.learned_vocab = merged
+            question_analysis(tc, save=False)
+        _store(testcases)
+        AnswerTerms.objects.using(DB).filter(id__in=[r[0] for r in rows]).delete()
+    return {"answers": len(rows), "testcases": len(testcases)}
+
+
+def compact_answer_terms(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Merge logged answer terms into learned_vocab until the log is empty (or ``max_batches``)."""
+    batch_size = batch_size or getattr(settings, "SOPHISTRY_VOCAB_COMPACT_BATCH", 2000)
+    total = {"answers": 0, "testcases": 0, "batches": 0}
+    while max_batches is None or total["batches"] < max_batches:
+        done = _compact_batch(batch_size)
+        if not done["answers"]:
+            break
+        total["answers"] += done["answers"]
+        total["testcases"] += done["testcases"]
+        total["batches"] += 1
+    if total["answers"]:
+        logger.info("Compacted %(answers)d answers into %(testcases)d learned vocabs (%(batches)d batches)", total)
+    return total
+
+
+def store_relearned_vocab(vocabs: Dict[int, dict], log_through: int) -> int:
+    """
+    Replace learned_vocab for the testcases in ``vocabs`` (id -> rebuilt
+    learned_vocab) in one transaction, bumping each ``revision``. Log rows up
+    to id ``log_through`` for those testcases are deleted: their answers are
+    in the rebuild. Later ones are left for the next compaction.
+    """
+    with transaction.atomic(using=DB):
+        testcases = list(
+            TestCase.objects.using(DB)
+            .select_for_update()
+            .filter(id__in=vocabs)
+            .order_by("id")
+            .only("id", "slug", "prompt", "learned_vocab", "question_analysis")
+        )
+        for tc in testcases:
+            learned = dict(vocabs[tc.id])
+            learned["revision"] = int((tc.learned_vocab or {}).get("revision", 0)) + 1
+            tc.learned_vocab = learned
+            question_analysis(tc, save=False)
+        _store(testcases)
+        AnswerTerms.objects.using(DB).filter(testcase_id__in=vocabs, id__lte=log_through).delete()
+    return len(testcases)
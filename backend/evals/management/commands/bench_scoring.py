@@ -0,0 +1,263 @@
+"""
+Benchmark the scoring hot path over the seed corpus.
+
+Prompts come from seed_data/testcases.json and evals/fixtures/seed.json.
+Answers are synthetic and deterministic. Each is built from the corpus's own
+words in sentences of 8-20 words, at each --sizes length (50 to 50k words by
+default). Measured per size:
+
+  score_case            base vocab, cache bypassed
+  score_case_learned    learned-vocab overlay at the MAX_LEARNED_KEYWORDS cap
+  score_answer          legacy verdict
+  extract_keywords
+  merge_answer_vocab    into a learned vocab already at the cap
+
+Every call gets the answer as a plain string, as a request would, so text
+analysis is included. Results (throughput, mean/p50/p99 latency) are written
+as JSON to --output. With --baseline, each p50 is compared to an earlier run;
+--max-regression makes a slowdown beyond that percentage fail the command.
+
+Usage:
+    python manage.py bench_scoring                          # bench-scoring.json
+    python manage.py bench_scoring --sizes 50,500 --min-time 0.5
+    python manage.py bench_scoring --baseline main.json --max-regression 25
+"""
+
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from evals.management.commands.seed_testcases import _normalize
+from evals.models import TestCase
+from evals.profiling import PROFILER
+from evals.scoring import _get_vocab, _max_chars, analyze_question, score_answer, score_case
+from evals.vocab_learner import MAX_LEARNED_KEYWORDS, extract_keywords, merge_answer_vocab
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+CORPORA = [
+    BACKEND_DIR / "seed_data" / "testcases.json",
+    BACKEND_DIR / "evals" / "fixtures" / "seed.json",
+]
+DEFAULT_SIZES = "50,500,5000,50000"
+SCHEMA = 1
+
+_WORDS_RE = re.compile(r"[a-z][a-z'-]+")
+
+
+def load_corpus() -> list:
+    """Testcase dicts (slug, prompt, expected) from both seed files."""
+    cases = []
+    for path in CORPORA:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        items = data.get("test_cases", []) if isinstance(data, dict) else data
+        for item in items:
+            n = _normalize(item)
+            if n["slug"] and n["prompt"]:
+                cases.append({"slug": n["slug"], "prompt": n["prompt"], "expected": n["expected"]})
+    return cases
+
+
+def _corpus_words(cases: list) -> list:
+    words = []
+    for c in cases:
+        words.extend(_WORDS_RE.findall(c["prompt"].lower()))
+        answer = (c["expected"] or {}).get("answer") if isinstance(c["expected"], dict) else None
+        if isinstance(answer, str):
+            words.extend(_WORDS_RE.findall(answer.lower()))
+    return words
+
+
+def synth_answer(words: list, n_words: int, rng: random.Random) -> str:
+    out = []
+    left = n_words
+    while left > 0:
+        k = min(left, rng.randint(8, 20))
+        sentence = rng.choices(words, k=k)
+        sentence[0] = sentence[0].capitalize()
+        out.append(" ".join(sentence) + rng.choice(".?."))
+        left -= k
+    return " ".join(out)
+
+
+def learned_at_cap(words: list, rng: random.Random) -> dict:
+    """A learned vocab with MAX_LEARNED_KEYWORDS keywords drawn from the corpus."""
+    pool = sorted(set(extract_keywords(" ".join(words))))
+    kws = sorted(rng.sample(pool, min(MAX_LEARNED_KEYWORDS, len(pool))))
+    return {"domain_keywords": kws, "from_prompt": False, "answer_count": 50}
+
+
+def _percentile(sorted_ms: list, q: float) -> float:
+    # nearest rank
+    i = max(0, min(len(sorted_ms) - 1, int(round(q * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[i]
+
+
+def measure(fn, min_time: float, min_iters: int, max_iters: int) -> dict:
+    """Call ``fn(i)`` for i = 0, 1, ... until min_time and min_iters are both reached."""
+    fn(0)  # warm-up: overlays, compiled patterns
+    samples = []
+    start = time.perf_counter()
+    i = 0
+    while i < max_iters and (i < min_iters or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter_ns()
+        fn(i)
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+        i += 1
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / (total / 1000), 2) if total else 0.0,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p50_ms": round(_percentile(samples, 0.50), 4),
+        "p99_ms": round(_percentile(samples, 0.99), 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def compare(results: list, baseline: dict) -> list:
+    """(name, words, baseline p50, p50, change %) for entries present in both runs."""
+    old = {(r["name"], r["words"]): r for r in baseline.get("results", [])}
+    rows = []
+    for r in results:
+        b = old.get((r["name"], r["words"]))
+        if b and b["p50_ms"] > 0:
+            change = (r["p50_ms"] - b["p50_ms"]) / b["p50_ms"] * 100
+            rows.append((r["name"], r["words"], b["p50_ms"], r["p50_ms"], round(change, 1)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Benchmark score_case, score_answer and vocab learning over the seed corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="bench-scoring.json", help="Result file (default: bench-scoring.json)")
+        parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Answer lengths in words (default: {DEFAULT_SIZES})")
+        parser.add_argument("--variants", type=int, default=5, help="Distinct answers per size (default: 5)")
+        parser.add_argument("--min-time", type=float, default=2.0, help="Seconds per benchmark (default: 2)")
+        parser.add_argument("--min-iters", type=int, default=20, help="Minimum calls per benchmark (default: 20)")
+        parser.add_argument("--max-iters", type=int, default=100000, help="Maximum calls per benchmark")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for synthetic answers (default: 1)")
+        parser.add_argument("--only", help="Comma-separated benchmark names to run")
+        parser.add_argument("--profile", action="store_true", help="Enable stage timers and include their histograms")
+        parser.add_argument("--baseline", help="Earlier result file to compare p50 latencies against")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="With --baseline: fail if any p50 is more than this many percent slower",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = [int(s) for s in opts["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError(f"Invalid --sizes: {opts['sizes']!r}")
+        baseline = None
+        if opts["baseline"]:
+            baseline = json.loads(Path(opts["baseline"]).read_text(encoding="utf-8"))
+        if opts["profile"]:
+            PROFILER.enabled = True
+            PROFILER.reset()
+
+        rng = random.Random(opts["seed"])
+        cases = load_corpus()
+        if not cases:
+            raise CommandError("No testcases found in the seed corpus")
+        words = _corpus_words(cases)
+        learned = learned_at_cap(words, rng)
+        testcases = [
+            TestCase(slug=c["slug"], prompt=c["prompt"], expected=c["expected"], learned_vocab=learned)
+            for c in cases
+        ]
+        base_analyses = [analyze_question(tc.prompt) for tc in testcases]
+        for tc in testcases:
+            tc.question_analysis = analyze_question(tc.prompt, learned, tc.slug)
+        self.stdout.write(
+            f"  {len(cases)} prompts, {len(set(words))} distinct words, "
+            f"learned vocab {len(learned['domain_keywords'])} terms"
+        )
+
+        def benchmarks(answers):
+            # call i scores answer i % len(answers) against prompt i % len(testcases)
+            def tc(i):
+                return testcases[i % len(testcases)]
+
+            def answer(i):
+                return answers[i % len(answers)]
+
+            return {
+                "score_case": lambda i: score_case(
+                    tc(i).prompt, answer(i), analysis=base_analyses[i % len(testcases)], use_cache=False,
+                ),
+                "score_case_learned": lambda i: score_case(
+                    tc(i).prompt,
+                    answer(i),
+                    learned_vocab=learned,
+                    question_slug=tc(i).slug,
+                    analysis=tc(i).question_analysis,
+                    use_cache=False,
+                ),
+                "score_answer": lambda i: score_answer(tc(i), answer(i)),
+                "extract_keywords": lambda i: extract_keywords(answer(i)),
+                "merge_answer_vocab": lambda i: merge_answer_vocab(learned, answer(i)),
+            }
+
+        only = set(opts["only"].split(",")) if opts["only"] else None
+        results = []
+        for n_words in sizes:
+            answers = [synth_answer(words, n_words, rng) for _ in range(max(1, opts["variants"]))]
+            for name, fn in benchmarks(answers).items():
+                if only and name not in only:
+                    continue
+                r = measure(fn, opts["min_time"], opts["min_iters"], opts["max_iters"])
+                r = {"name": name, "words": n_words, "chars": len(answers[0]), **r}
+                results.append(r)
+                self.stdout.write(
+                    f"  {name:<20} {n_words:>6} words  {r['ops_per_sec']:>10.1f}/s  "
+                    f"p50 {r['p50_ms']:>9.3f} ms  p99 {r['p99_ms']:>9.3f} ms"
+                )
+
+        report = {
+            "schema": SCHEMA,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "version": os.environ.get("APP_VERSION", "dev"),
+            "python": platform.python_version(),
+            "vocab_version": _get_vocab().version,
+            "max_analyzed_chars": _max_chars(),
+            "seed": opts["seed"],
+            "prompts": len(cases),
+            "learned_terms": len(learned["domain_keywords"]),
+            "results": results,
+        }
+        if opts["profile"]:
+            report["profile"] = PROFILER.snapshot()
+
+        regressions = []
+        if baseline is not None:
+            rows = compare(results, baseline)
+            report["baseline"] = {"file": opts["baseline"], "created_at": baseline.get("created_at")}
+            report["comparison"] = [
+                {"name": n, "words": w, "baseline_p50_ms": b, "p50_ms": p, "change_pct": c} for n, w, b, p, c in rows
+            ]
+            self.stdout.write(f"  vs {opts['baseline']}:")
+            for n, w, b, p, c in rows:
+                style = self.style.WARNING if c > 0 else self.style.SUCCESS
+                self.stdout.write(style(f"  {n:<20} {w:>6} words  {b:>9.3f} -> {p:>9.3f} ms  {c:+.1f}%"))
+                if opts["max_regression"] is not None and c > opts["max_regression"]:
+                    regressions.append(f"{n}@{w}")
+
+        Path(opts["output"]).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"  Wrote {len(results)} results to {opts['output']}"))
+
+        if regressions:
+            raise CommandError(
+                f"p50 regressed more than {opts['max_regression']}%: {', '.join(regressions)}"
+            )
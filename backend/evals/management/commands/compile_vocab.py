@@ -0,0 +1,83 @@
+"""
+Build the precompiled structural vocab artifact loaded by workers at boot.
+
+The YAML vocab is validated (every pattern compiled, lint findings reported)
+and written as JSON next to it (evals/structural_vocab.json by default),
+which the scorer then prefers over the YAML for as long as it is at least as
+new. See evals/vocab_artifact.py for the format.
+
+Usage:
+    python manage.py compile_vocab                      # evals/structural_vocab.yaml -> .json
+    python manage.py compile_vocab --strict             # exit 1 on lint findings
+    python manage.py compile_vocab --check              # exit 1 if the artifact is missing or stale
+    python manage.py compile_vocab --file v.yaml --output /srv/vocab.json
+"""
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from evals.structural_scoring import load_vocab
+from evals.vocab_artifact import artifact_path, build_artifact, compile_artifact, read_artifact, write_artifact
+from evals.vocab_lint import _MARKER_AXES
+
+DEFAULT_VOCAB_PATH = Path(__file__).resolve().parents[2] / "structural_vocab.yaml"
+
+
+class Command(BaseCommand):
+    help = "Compile the structural vocab YAML into a validated, versioned JSON artifact"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=str(DEFAULT_VOCAB_PATH),
+            help=f"Vocab YAML file (default: {DEFAULT_VOCAB_PATH})",
+        )
+        parser.add_argument("--output", help="Artifact path (default: the YAML path with a .json suffix)")
+        parser.add_argument("--strict", action="store_true", help="Fail if there are lint findings")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Do not write; fail unless the artifact exists and matches the YAML",
+        )
+
+    def handle(self, *args, **opts):
+        source = opts["file"]
+        output = opts["output"] or artifact_path(source)
+        try:
+            vocab = load_vocab(source)
+            artifact = build_artifact(vocab, source=Path(source).name)
+        except Exception as e:
+            raise CommandError(f"Invalid vocab {source}: {e}")
+
+        if opts["check"]:
+            try:
+                existing = read_artifact(output)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No usable artifact at {output}: {e}")
+            if existing.get("version") != artifact["version"] or existing.get("schema") != artifact["schema"]:
+                raise CommandError(
+                    f"{output} is stale (version {existing.get('version')}, {source} is {artifact['version']})"
+                )
+            self.stdout.write(self.style.SUCCESS(f"  {output} is up to date ({artifact['version']})"))
+            return
+
+        for issue in artifact["lint"]:
+            self.stdout.write(self.style.WARNING(f"  {issue}"))
+        if artifact["lint"] and opts["strict"]:
+            raise CommandError(f"{len(artifact['lint'])} risky pattern(s); artifact not written")
+
+        write_artifact(artifact, output)
+        # load it back the way a worker does
+        started = time.perf_counter()
+        compiled = compile_artifact(read_artifact(output))
+        load_ms = (time.perf_counter() - started) * 1000
+
+        n_patterns = sum(len(ps) for axis in _MARKER_AXES for ps in (vocab.get(axis) or {}).values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Wrote {output}: vocab {compiled.version}, {len(artifact['labels'])} labels, "
+                f"{len(artifact['patterns'])} distinct patterns (of {n_patterns}), loads in {load_ms:.1f} ms"
+            )
+        )
@@ -0,0 +1,60 @@
+"""
+Check a structural vocab for patterns that could make scoring slow on long
+answers, and time each pattern.
+
+Lint findings are the same warnings load_vocab logs. Timings run each marker
+pattern on its own (as the matcher runs it) against --text, or against an
+adversarial probe built from the pattern ("if if if ..." for
+\\bif\\b.*\\bthen\\b).
+
+Usage:
+    python manage.py lint_vocab                           # evals/structural_vocab.yaml
+    python manage.py lint_vocab --file path.yaml --strict # exit 1 on findings
+    python manage.py lint_vocab --text long_answer.txt --top 20
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from evals.structural_scoring import load_vocab
+from evals.vocab_lint import lint_vocab, time_patterns
+
+DEFAULT_VOCAB_PATH = Path(__file__).resolve().parents[2] / "structural_vocab.yaml"
+
+
+class Command(BaseCommand):
+    help = "Lint structural vocab patterns for backtracking risk and time each pattern"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=str(DEFAULT_VOCAB_PATH),
+            help=f"Vocab YAML file (default: {DEFAULT_VOCAB_PATH})",
+        )
+        parser.add_argument("--text", help="Time patterns on this text file instead of per-pattern probes")
+        parser.add_argument("--size", type=int, default=20000, help="Probe length in characters (default: 20000)")
+        parser.add_argument("--top", type=int, default=10, help="Show the N slowest patterns (default: 10)")
+        parser.add_argument("--strict", action="store_true", help="Fail if there are lint findings")
+
+    def handle(self, *args, **opts):
+        vocab = load_vocab(opts["file"])
+        issues = lint_vocab(vocab)
+        for issue in issues:
+            self.stdout.write(self.style.WARNING(f"  {issue}"))
+        if not issues:
+            self.stdout.write(self.style.SUCCESS("  No risky patterns found"))
+
+        text = None
+        if opts["text"]:
+            text = Path(opts["text"]).read_text(encoding="utf-8")
+        rows = time_patterns(vocab, text=text, size=opts["size"])
+        self.stdout.write(f"  Slowest patterns ({'--text' if text is not None else 'probe'}):")
+        for r in rows[: opts["top"]]:
+            self.stdout.write(
+                f"  {r['seconds'] * 1000:9.3f} ms  {r['axis']}.{r['label']}  {r['pattern']!r}"
+                f"{'  [gap]' if r['gap'] else ''}"
+            )
+
+        if issues and opts["strict"]:
+            raise CommandError(f"{len(issues)} risky pattern(s)")
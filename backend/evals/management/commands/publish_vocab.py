@@ -0,0 +1,68 @@
+"""
+Store a structural vocab in the DB and make it the active scoring vocab.
+
+Running API and worker processes pick it up within
+SOPHISTRY_VOCAB_RELOAD_SECONDS, without a restart.
+
+Usage:
+    python manage.py publish_vocab                         # publish evals/structural_vocab.yaml
+    python manage.py publish_vocab --file path.yaml --notes "add chemistry terms"
+    python manage.py publish_vocab --deactivate            # fall back to the YAML file
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from evals.models import StructuralVocab
+from evals.structural_scoring import compile_vocab, load_vocab
+from evals.vocab_lint import lint_vocab
+
+DEFAULT_VOCAB_PATH = Path(__file__).resolve().parents[2] / "structural_vocab.yaml"
+
+
+class Command(BaseCommand):
+    help = "Publish a structural vocab YAML file as the active DB-stored vocab"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=str(DEFAULT_VOCAB_PATH),
+            help=f"Vocab YAML file (default: {DEFAULT_VOCAB_PATH})",
+        )
+        parser.add_argument("--notes", default="", help="Free-text note stored with the version")
+        parser.add_argument(
+            "--deactivate",
+            action="store_true",
+            help="Deactivate all DB-stored vocabs so the YAML file is used again",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        if opts["deactivate"]:
+            n = StructuralVocab.objects.filter(is_active=True).update(is_active=False)
+            self.stdout.write(self.style.SUCCESS(f"  Deactivated {n} DB vocab(s); the YAML file is active"))
+            return
+
+        try:
+            vocab = load_vocab(opts["file"])
+            compiled = compile_vocab(vocab)  # validates every pattern
+        except Exception as e:
+            raise CommandError(f"Invalid vocab {opts['file']}: {e}")
+        for issue in lint_vocab(vocab):
+            self.stdout.write(self.style.WARNING(f"  {issue}"))
+
+        obj, created = StructuralVocab.objects.get_or_create(
+            version=compiled.version,
+            defaults={"content": vocab, "notes": opts["notes"]},
+        )
+        StructuralVocab.objects.exclude(pk=obj.pk).filter(is_active=True).update(is_active=False)
+        obj.is_active = True
+        obj.save(update_fields=["is_active"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Vocab {obj.version} {'published' if created else 're-activated'} and active"
+            )
+        )
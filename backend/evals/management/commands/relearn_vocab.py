@@ -0,0 +1,160 @@
+"""
+Rebuild every TestCase.learned_vocab from its prompt and the human answers on record.
+
+Testcases are processed in id order, --batch-size at a time. For each batch,
+the done human Results are streamed in (testcase, id) order, their keywords
+are extracted across a process pool (evals.batch.extract_chunk, the same
+extraction mobile_answer does) and replayed through the streaming learner
+(vocab_learner.learn_answers) on top of the prompt's keywords. The batch's
+learned vocabs are then written in one transaction (learning.store_relearned_vocab).
+
+Answers logged for compaction before the command started are covered by the
+rebuild, so their log rows are dropped; answers arriving while it runs are
+left to the compaction task.
+
+Usage:
+    python manage.py relearn_vocab                      # every testcase
+    python manage.py relearn_vocab --test-set Physics --workers 8
+    python manage.py relearn_vocab --dry-run            # extract and merge, do not write
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from evals.batch import extract_chunk
+from evals.learning import DB, store_relearned_vocab
+from evals.models import AnswerTerms, Result, TestCase, TestSet
+from evals.scoring import CONFIG
+from evals.vocab_learner import extract_from_prompt, learn_answers
+
+
+class Command(BaseCommand):
+    help = "Rebuild learned vocab for every testcase from its prompt and all human answers, in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--test-set", help="Only testcases in this TestSet (name or id)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Testcases per write transaction (default: 500)")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Answers per extraction chunk (default: 500)")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Extraction processes (default: CPU count; 0 extracts in-process)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Rebuild but do not write")
+
+    def _testcases(self, opts):
+        qs = TestCase.objects.using(DB).order_by("id")
+        if opts["test_set"]:
+            ts = opts["test_set"]
+            try:
+                ts_obj = TestSet.objects.get(id=int(ts)) if ts.isdigit() else TestSet.objects.get(name=ts)
+            except TestSet.DoesNotExist:
+                raise CommandError(f"Unknown test set: {ts}")
+            qs = qs.filter(test_set=ts_obj)
+        return qs
+
+    def _chunks(self, tc_ids, results_through: int, size: int):
+        """(testcase ids, answers) chunks of the batch's answers, in (testcase, id) order."""
+        rows = (
+            Result.objects.using(DB)
+            .filter(testcase_id__in=tc_ids, provider="human", status="done", id__lte=results_through)
+            .order_by("testcase_id", "id")
+            .values_list("testcase_id", "output_text")
+            .iterator(chunk_size=size)
+        )
+        ids, texts = [], []
+        for tc_id, text in rows:
+            ids.append(tc_id)
+            texts.append(text)
+            if len(texts) >= size:
+                yield ids, texts
+                ids, texts = [], []
+        if texts:
+            yield ids, texts
+
+    def _keywords(self, chunks, pool, workers: int):
+        """(testcase id, keywords) per answer, in the order the answers were streamed."""
+        if pool is None:
+            for ids, texts in chunks:
+                yield from zip(ids, extract_chunk(texts, CONFIG))
+            return
+        # a bounded number of chunks in flight, consumed in submission order
+        pending = deque()
+        for ids, texts in chunks:
+            pending.append((ids, pool.submit(extract_chunk, texts, CONFIG)))
+            if len(pending) >= workers * 2:
+                ids, fut = pending.popleft()
+                yield from zip(ids, fut.result())
+        while pending:
+            ids, fut = pending.popleft()
+            yield from zip(ids, fut.result())
+
+    def _relearn(self, batch, results_through: int, opts, pool) -> tuple:
+        """Rebuilt learned vocabs for one batch of (id, prompt), and the number of answers merged."""
+        seeds = {tc_id: extract_from_prompt(prompt) for tc_id, prompt in batch}
+        vocabs = {}
+        answers = 0
+        stream = self._keywords(self._chunks(list(seeds), results_through, opts["chunk_size"]), pool, opts["workers"])
+        for tc_id, group in groupby(stream, key=lambda r: r[0]):
+            vocabs[tc_id] = learn_answers(seeds[tc_id], (kw for _, kw in group), config=CONFIG)
+            answers += vocabs[tc_id]["answer_count"]
+        for tc_id, seed in seeds.items():
+            if tc_id not in vocabs:  # no answers yet
+                vocabs[tc_id] = learn_answers(seed, (), config=CONFIG)
+        return vocabs, answers
+
+    def handle(self, *args, **opts):
+        qs = self._testcases(opts)
+        total = qs.count()
+        # The answer history to rebuild from. mobile_answer logs an answer's
+        # terms just after creating its Result, so reading the log watermark
+        # first means every log row dropped below has its Result in the
+        # rebuild; only an answer submitted between the two reads is merged
+        # twice (rebuilt here, and compacted from its log row later).
+        log_through = AnswerTerms.objects.using(DB).aggregate(m=Max("id"))["m"] or 0
+        results_through = Result.objects.using(DB).aggregate(m=Max("id"))["m"] or 0
+        self.stdout.write(f"  Relearning {total} testcases from results up to id {results_through}")
+
+        started = time.monotonic()
+        done = answers = 0
+        batch_size = max(1, opts["batch_size"])
+        pool = None
+        if opts["workers"] > 0:
+            # workers only import the plain-Python core (evals.batch), so spawn
+            # them rather than fork a process holding DB connections
+            pool = ProcessPoolExecutor(max_workers=opts["workers"], mp_context=multiprocessing.get_context("spawn"))
+        try:
+            after_id = 0
+            while True:
+                batch = list(qs.filter(id__gt=after_id).values_list("id", "prompt")[:batch_size])
+                if not batch:
+                    break
+                after_id = batch[-1][0]
+                vocabs, n = self._relearn(batch, results_through, opts, pool)
+                if not opts["dry_run"]:
+                    store_relearned_vocab(vocabs, log_through)
+                done += len(vocabs)
+                answers += n
+                elapsed = max(time.monotonic() - started, 1e-9)
+                self.stdout.write(
+                    f"  {done}/{total} testcases, {answers} answers ({answers / elapsed:.0f} answers/s)"
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Relearn complete: {done} testcases from {answers} answers in {elapsed:.1f}s "
+                f"dry_run={opts['dry_run']}"
+            )
+        )
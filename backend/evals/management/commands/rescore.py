@@ -0,0 +1,203 @@
+"""
+Recompute Result.score / score_details with the current scorer and vocab.
+
+Rows are streamed in primary-key order (keyset pagination), scored across a
+process pool and written back with bulk_update, one short transaction per
+chunk. Progress is checkpointed to a JSON file so an interrupted run can be
+resumed with --resume.
+
+Usage:
+    python manage.py rescore                          # all human results
+    python manage.py rescore --run <uuid> --workers 8
+    python manage.py rescore --test-set Physics --since 2025-01-01
+    python manage.py rescore --resume                 # continue after interruption
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+
+from evals.batch import init_worker, score_chunk
+from evals.models import Result, TestCase, TestSet
+from evals.scoring import CONFIG, _get_vocab, analyze_question
+
+DEFAULT_CHECKPOINT = ".rescore-checkpoint.json"
+
+
+def _parse_when(value: str, end: bool = False):
+    dt = parse_datetime(value)
+    if dt is not None:
+        return dt
+    d = parse_date(value)
+    if d is None:
+        raise CommandError(f"Invalid date: {value!r} (use YYYY-MM-DD or ISO datetime)")
+    from datetime import datetime, time as dtime, timezone
+
+    return datetime.combine(d, dtime.max if end else dtime.min, tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = "Recompute Result scores with the current scorer, in parallel and resumably"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--run", help="Only results of this run_uuid")
+        parser.add_argument(
+            "--provider",
+            default="human",
+            help="Only results from this provider (default: human; 'all' for every provider)",
+        )
+        parser.add_argument("--test-set", help="Only results for testcases in this TestSet (name or id)")
+        parser.add_argument("--since", help="Only results created at/after this date or datetime")
+        parser.add_argument("--until", help="Only results created at/before this date or datetime")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows per chunk (default: 500)")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Scoring processes (default: CPU count; 0 scores in-process)",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=DEFAULT_CHECKPOINT,
+            help=f"Checkpoint file (default: {DEFAULT_CHECKPOINT})",
+        )
+        parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint file")
+        parser.add_argument("--dry-run", action="store_true", help="Score but do not write results")
+
+    def _queryset(self, opts):
+        qs = Result.objects.filter(status="done")
+        if opts["run"]:
+            qs = qs.filter(run_uuid=opts["run"])
+        if opts["provider"] and opts["provider"] != "all":
+            qs = qs.filter(provider=opts["provider"])
+        if opts["test_set"]:
+            ts = opts["test_set"]
+            try:
+                ts_obj = TestSet.objects.get(id=int(ts)) if ts.isdigit() else TestSet.objects.get(name=ts)
+            except TestSet.DoesNotExist:
+                raise CommandError(f"Unknown test set: {ts}")
+            qs = qs.filter(testcase__test_set=ts_obj)
+        if opts["since"]:
+            qs = qs.filter(created_at__gte=_parse_when(opts["since"]))
+        if opts["until"]:
+            qs = qs.filter(created_at__lte=_parse_when(opts["until"], end=True))
+        return qs
+
+    def _cases(self, tc_ids, cache: dict) -> dict:
+        """Question-side inputs per testcase, computed once per command run."""
+        missing = [i for i in tc_ids if i not in cache]
+        for tc in TestCase.objects.filter(id__in=missing).only("id", "slug", "prompt", "learned_vocab"):
+            analysis = analyze_question(tc.prompt, tc.learned_vocab, tc.slug)
+            cache[tc.id] = (tc.prompt, tc.learned_vocab, tc.slug, analysis)
+        return {i: cache[i] for i in tc_ids}
+
+    def _chunks(self, qs, after_id: int, size: int, cache: dict):
+        last = after_id
+        while True:
+            rows = list(
+                qs.filter(id__gt=last).order_by("id").values_list("id", "testcase_id", "output_text")[:size]
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield last, self._cases({r[1] for r in rows}, cache), rows
+
+    def _write(self, scored: list, dry_run: bool) -> None:
+        if dry_run:
+            return
+        objs = [Result(id=rid, score=score, score_details=details) for rid, score, details in scored]
+        with transaction.atomic():
+            Result.objects.bulk_update(objs, ["score", "score_details"])
+
+    def handle(self, *args, **opts):
+        filters = {k: opts[k] for k in ("run", "provider", "test_set", "since", "until")}
+        checkpoint = Path(opts["checkpoint"])
+        after_id = 0
+        done = 0
+        if opts["resume"]:
+            if not checkpoint.exists():
+                raise CommandError(f"No checkpoint at {checkpoint}")
+            state = json.loads(checkpoint.read_text(encoding="utf-8"))
+            if state.get("filters") != filters:
+                raise CommandError(
+                    f"Checkpoint filters {state.get('filters')} do not match this invocation {filters}"
+                )
+            after_id = int(state["last_id"])
+            done = int(state.get("done", 0))
+            self.stdout.write(f"  Resuming after result id {after_id} ({done} already rescored)")
+
+        qs = self._queryset(opts)
+        total = qs.filter(id__gt=after_id).count()
+        self.stdout.write(f"  {total} results to rescore")
+
+        def save_checkpoint(last_id: int) -> None:
+            if opts["dry_run"]:
+                return
+            tmp = checkpoint.with_suffix(checkpoint.suffix + ".tmp")
+            tmp.write_text(json.dumps({"filters": filters, "last_id": last_id, "done": done}), encoding="utf-8")
+            tmp.replace(checkpoint)
+
+        started = time.monotonic()
+        processed = 0
+
+        def report(last_id: int, n: int) -> None:
+            nonlocal done, processed
+            done += n
+            processed += n
+            save_checkpoint(last_id)
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                f"  {processed}/{total} rescored (last id {last_id}, {processed / elapsed:.0f} rows/s)"
+            )
+
+        chunks = self._chunks(qs, after_id, opts["chunk_size"], {})
+        vocab = _get_vocab()
+        if opts["workers"] <= 0:
+            init_worker(vocab, CONFIG)
+            for last_id, cases, rows in chunks:
+                scored = score_chunk(cases, rows)
+                self._write(scored, opts["dry_run"])
+                report(last_id, len(scored))
+        else:
+            # Keep a bounded number of chunks in flight and consume them in
+            # submission order, so the checkpoint only ever advances past
+            # rows that have been written. Workers only import the scoring
+            # core (evals.batch), so they are spawned rather than forked from
+            # a process holding DB connections.
+            with ProcessPoolExecutor(
+                max_workers=opts["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(vocab.raw, CONFIG),
+            ) as pool:
+                pending = deque()
+                for last_id, cases, rows in chunks:
+                    pending.append((last_id, pool.submit(score_chunk, cases, rows)))
+                    if len(pending) >= opts["workers"] * 2:
+                        last, fut = pending.popleft()
+                        scored = fut.result()
+                        self._write(scored, opts["dry_run"])
+                        report(last, len(scored))
+                while pending:
+                    last, fut = pending.popleft()
+                    scored = fut.result()
+                    self._write(scored, opts["dry_run"])
+                    report(last, len(scored))
+
+        elapsed = time.monotonic() - started
+        if not opts["dry_run"] and checkpoint.exists():
+            checkpoint.unlink()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Rescore complete: {processed} results in {elapsed:.1f}s "
+                f"({processed / max(elapsed, 1e-9):.0f} rows/s) dry_run={opts['dry_run']}"
+            )
+        )
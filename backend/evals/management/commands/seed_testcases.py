@@ -22,6 +22,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from evals.models import TestCase, TestSet
+from evals.vocab_learner import extract_from_prompt
 
 DEFAULT_SEED_PATH = Path(__file__).resolve().parents[3] / "seed_data" / "testcases.json"
 
@@ -197,7 +198,7 @@ class Command(BaseCommand):
                         },
                     )
 
-                defaults = {**data}
+                defaults = {**data, "learned_vocab": extract_from_prompt(data.get("prompt", ""))}
                 if test_set_obj:
                     defaults["test_set"] = test_set_obj
 
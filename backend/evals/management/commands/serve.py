@@ -0,0 +1,137 @@
+"""
+Run the API under gunicorn with scoring state preloaded in the master.
+
+The master loads Django, compiles the structural vocab and warms the
+question-side caches (scoring.preload) once, closes its DB connections and
+then forks the workers. The garbage collector is disabled while loading and
+everything loaded is frozen (gc.freeze) before each fork, so the workers
+share those pages copy-on-write instead of each holding a private copy.
+
+Workers and threads default to the CPUs available to the process: one
+worker per CPU (scoring is CPU-bound), counting the container's cgroup CPU
+quota rather than the node's CPUs, and WEB_THREADS threads each for
+requests waiting on the DB or Redis.
+
+Usage:
+    python manage.py serve                        # 0.0.0.0:8000, one worker per CPU
+    python manage.py serve --workers 4 --threads 4
+    python manage.py serve --no-warm              # skip warming learned terms and overlays
+    python manage.py serve --preload-only         # load, report, exit (smoke test)
+"""
+
+import gc
+import math
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def _cgroup_cpus():
+    """CPUs allowed by the cgroup CPU quota (v2 cpu.max, else v1 cfs), or None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def _cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpus()
+    return min(cpus, quota) if quota else cpus
+
+
+def _pre_fork(server, worker):
+    # objects the master allocated since preload; workers then never scan them
+    gc.freeze()
+
+
+class Command(BaseCommand):
+    help = "Serve the API with gunicorn, preloading the app and scoring state before forking workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=os.environ.get("WEB_BIND", "0.0.0.0:8000"), help="Address (default: 0.0.0.0:8000)")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=int(os.environ.get("WEB_WORKERS", 0)),
+            help="Worker processes (default: WEB_WORKERS, else one per CPU of the container's quota)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=int(os.environ.get("WEB_THREADS", 2)),
+            help="Threads per worker (default: WEB_THREADS, else 2)",
+        )
+        parser.add_argument("--timeout", type=int, default=int(os.environ.get("WEB_TIMEOUT", 120)))
+        parser.add_argument("--no-warm", action="store_true", help="Do not warm learned terms and overlays")
+        parser.add_argument("--preload-only", action="store_true", help="Preload, report and exit without serving")
+
+    def handle(self, *args, **opts):
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            raise CommandError("gunicorn is not installed (pip install gunicorn)")
+
+        gc.disable()
+        started = time.perf_counter()
+        from django.core.wsgi import get_wsgi_application
+
+        from evals.scoring import preload
+
+        application = get_wsgi_application()
+        stats = preload(warm=not opts["no_warm"])
+        # workers must not share the master's DB sockets
+        connections.close_all()
+        gc.collect()
+        # move everything loaded out of the collector's reach and re-enable it
+        gc.freeze()
+        gc.enable()
+        self.stdout.write(
+            f"  Preloaded vocab {stats['vocab_version']}, {stats['questions']} active questions, "
+            f"{stats['overlays']} overlays, {stats['terms']} learned terms in {time.perf_counter() - started:.2f}s"
+        )
+        if opts["preload_only"]:
+            return
+
+        workers = opts["workers"] or _cpus()
+        threads = max(1, opts["threads"])
+        options = {
+            "bind": opts["bind"],
+            "workers": workers,
+            "threads": threads,
+            "worker_class": "gthread" if threads > 1 else "sync",
+            "timeout": opts["timeout"],
+            "preload_app": True,
+            "pre_fork": _pre_fork,
+            "accesslog": "-",
+        }
+        self.stdout.write(f"  Serving on {opts['bind']}: {workers} workers x {threads} threads")
+
+        class Server(BaseApplication):
+            def load_config(self):
+                for key, value in options.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return application
+
+        Server().run()
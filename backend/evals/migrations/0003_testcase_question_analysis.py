@@ -0,0 +1,22 @@
+"""Add TestCase.question_analysis JSONField."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evals", "0002_testcase_learned_vocab"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testcase",
+            name="question_analysis",
+            field=models.JSONField(
+                blank=True,
+                null=True,
+                help_text="Cached question-side scoring analysis. Recomputed when prompt or vocab changes.",
+            ),
+        ),
+    ]
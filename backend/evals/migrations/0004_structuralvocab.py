@@ -0,0 +1,25 @@
+"""Add StructuralVocab (DB-stored, versioned scoring vocab)."""
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evals", "0003_testcase_question_analysis"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StructuralVocab",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", models.CharField(help_text="Content hash of the vocab.", max_length=32, unique=True)),
+                ("content", models.JSONField()),
+                ("is_active", models.BooleanField(default=False)),
+                ("notes", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
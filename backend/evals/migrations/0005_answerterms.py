@@ -0,0 +1,29 @@
+"""Add AnswerTerms (append-only log of per-answer keywords for vocab learning)."""
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evals", "0004_structuralvocab"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnswerTerms",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("terms", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "testcase",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="evals.testcase"
+                    ),
+                ),
+            ],
+        ),
+    ]
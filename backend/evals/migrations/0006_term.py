@@ -0,0 +1,35 @@
+"""Add Term (interned learned-vocab terms) and store TestCase.learned_vocab as term ids.
+
+Existing learned_vocab rows still load as they are and are packed the next
+time they are written (compaction, or all at once with manage.py relearn_vocab).
+"""
+
+from django.db import migrations, models
+
+import evals.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evals", "0005_answerterms"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Term",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("text", models.CharField(max_length=200, unique=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="testcase",
+            name="learned_vocab",
+            field=evals.fields.LearnedVocabField(
+                blank=True,
+                help_text="Auto-learned keywords from prompt + answers. Merged into scoring vocab. Stored as Term ids.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,7 +1,11 @@
 import uuid
-from django.db import models
+from django.db import models, router
 from django.utils import timezone
 
+from .fields import LearnedVocabField, pack_learned_vocabs
+from .terms import MAX_TERM_CHARS
+from .vocab_learner import extract_from_prompt
+
 
 class TestSet(models.Model):
     name = models.CharField(max_length=80, unique=True)
@@ -24,15 +28,77 @@ class TestCase(models.Model):
         TestSet, on_delete=models.SET_NULL,
         null=True, blank=True, related_name="testcases",
     )
-    learned_vocab = models.JSONField(
+    learned_vocab = LearnedVocabField(
+        blank=True, null=True,
+        help_text="Auto-learned keywords from prompt + answers. Merged into scoring vocab. Stored as Term ids.",
+    )
+    question_analysis = models.JSONField(
         blank=True, null=True,
-        help_text="Auto-learned keywords from prompt + answers. Merged into scoring vocab.",
+        help_text="Cached question-side scoring analysis. Recomputed when prompt or vocab changes.",
     )
     created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return self.slug
 
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.learned_vocab:
+            # new testcases start from their prompt's keywords, as seed_testcases does
+            self.learned_vocab = extract_from_prompt(self.prompt)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            # a full save (create, admin or API edit) also stores a current
+            # question analysis; request paths only ever read it
+            from .scoring import question_analysis
+
+            question_analysis(self, save=False)
+        elif "learned_vocab" not in update_fields:
+            return super().save(*args, **kwargs)
+        # store learned_vocab as term ids; the instance keeps the plain dict
+        learned = self.learned_vocab
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        self.learned_vocab = pack_learned_vocabs([learned], using)[0]
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self.learned_vocab = learned
+
+class AnswerTerms(models.Model):
+    """Keywords extracted from one answer, appended at submission time.
+
+    An append-only log: answers never write to their TestCase row.
+    evals.learning.compact_answer_terms merges batches into
+    TestCase.learned_vocab and deletes the merged rows.
+    """
+    testcase = models.ForeignKey(TestCase, on_delete=models.CASCADE, related_name="+")
+    terms = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+
+
+class Term(models.Model):
+    """One distinct learned-vocab keyword or bigram.
+
+    TestCase.learned_vocab stores ids into this table (see evals.fields).
+    Rows are only ever added, so an id always means the same term.
+    """
+    text = models.CharField(max_length=MAX_TERM_CHARS, unique=True)
+
+    def __str__(self):
+        return self.text
+
+
+class StructuralVocab(models.Model):
+    """A structural vocab stored in the DB. The active row overrides the YAML file."""
+    version = models.CharField(max_length=32, unique=True, help_text="Content hash of the vocab.")
+    content = models.JSONField()
+    is_active = models.BooleanField(default=False)
+    notes = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.version
+
+
 class Run(models.Model):
     run_uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, db_index=True)
     name = models.CharField(max_length=200, blank=True, default="")
@@ -0,0 +1,140 @@
+"""Per-stage scoring timers.
+
+Scoring code wraps its stages (domain matching, each label axis, flags,
+overlay building, ...) in ``PROFILER.stage(name)``. When the profiler is
+enabled each stage's wall time goes into an in-process histogram for that
+stage, and into the current ``trace()`` if there is one, which is how
+score_case reports per-call timings. When disabled, ``stage()`` returns a
+shared no-op context manager, so the instrumentation costs one attribute
+check per stage.
+
+Histograms are per process; the metrics endpoint (api/scoring/metrics/)
+reports the process that served the request.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+# bucket upper bounds, in milliseconds (the last bucket is unbounded)
+BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_NOOP = nullcontext()
+_TRACE: "contextvars.ContextVar[Optional[Dict[str, float]]]" = contextvars.ContextVar("scoring_trace", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile, capped at max_ms."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], round(self.max_ms, 3)) if i < len(BUCKETS_MS) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                **{f"le_{b}": n for b, n in zip(BUCKETS_MS, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000.0)
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._hists: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        """Context manager timing one stage (no-op when disabled)."""
+        if not self.enabled:
+            return _NOOP
+        return _Stage(self, name)
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = Histogram()
+            hist.add(ms)
+        trace = _TRACE.get()
+        if trace is not None:
+            trace[name] = trace.get(name, 0.0) + ms
+
+    @contextmanager
+    def trace(self) -> Iterator[Optional[Dict[str, float]]]:
+        """
+        Collect this context's stage timings (ms, summed per stage) into the
+        yielded dict; yields None when disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        timings: Dict[str, float] = {}
+        token = _TRACE.set(timings)
+        try:
+            yield timings
+        finally:
+            _TRACE.reset(token)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "stages": {name: h.summary() for name, h in sorted(self._hists.items())},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+
+PROFILER = Profiler()
@@ -0,0 +1,119 @@
+"""Per-run shuffled question decks in Redis.
+
+A deck is the ids of the questions a run has not answered yet, in random
+order, stored as a Redis list with a TTL. mobile_question pops the next id
+from it (one LPOP, no queries over the question bank or the run's answers);
+when there is no deck (new scope, expired, exhausted, Redis unavailable) it
+selects from the DB as before and stores the rest of the shuffled ids as a
+new deck. So a deck that runs out while questions were skipped rather than
+answered is rebuilt, and the skipped ones come round again.
+
+Decks are keyed by run and by the set the client asked for ("run" when it
+asked for none and the run's own filter applies), so answering from several
+sets in one run keeps one deck per set. Redis errors are logged and treated
+as a missing deck; decks are then skipped for ``retry_after`` seconds, so
+question selection never fails (or waits on connection timeouts) because
+Redis is unavailable.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionDecks:
+    def __init__(self, url: Optional[str], ttl: int = 86400, prefix: str = "sophistry:deck:", retry_after: float = 30.0):
+        """``url`` is a Redis URL (None or "" disables decks); ``ttl`` in seconds, <= 0 disables."""
+        self.url = url or None
+        self.ttl = ttl
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self._client = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.url is not None and self.ttl > 0
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+
+            with self._lock:
+                if self._client is None:
+                    self._client = redis.Redis.from_url(self.url, socket_timeout=1, socket_connect_timeout=1)
+        return self._client
+
+    def key(self, run_uuid: str, scope: str) -> str:
+        return f"{self.prefix}{run_uuid}:{scope}"
+
+    def pop(self, run_uuid: str, scope: str) -> Optional[int]:
+        """The next question id of the deck, or None if there is none."""
+        if not self._usable():
+            return None
+        try:
+            value = self._redis().lpop(self.key(run_uuid, scope))
+        except Exception as e:
+            self._failed("read", e)
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return int(value)
+
+    def store(self, run_uuid: str, scope: str, ids: List[int]) -> None:
+        """Replace the deck with ``ids`` (already shuffled); an empty list just drops it."""
+        if not self._usable():
+            return
+        key = self.key(run_uuid, scope)
+        try:
+            pipe = self._redis().pipeline(transaction=True)
+            pipe.delete(key)
+            if ids:
+                pipe.rpush(key, *ids)
+                pipe.expire(key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            self._failed("write", e)
+            return
+        self.builds += 1
+
+    def _usable(self) -> bool:
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _failed(self, op: str, error: Exception) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning("Question deck %s failed (%s); selecting from the DB for %.0fs", op, error, self.retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "errors": self.errors,
+        }
+
+
+def _from_settings() -> QuestionDecks:
+    from django.conf import settings
+
+    return QuestionDecks(
+        getattr(settings, "SOPHISTRY_QUESTION_DECK_URL", None),
+        ttl=getattr(settings, "SOPHISTRY_QUESTION_DECK_TTL", 86400),
+    )
+
+
+DECKS = _from_settings()
@@ -0,0 +1,195 @@
+"""Content-addressed cache of score_case results.
+
+A score depends only on the prompt, the answer, the base vocab version, the
+question's learned vocab (revision and slug) and the scorer itself: the
+scoring core's code and the ScoringConfig values that affect scores
+(``scorer_fingerprint``). All of them are hashed into the key, so entries
+never go stale: a new vocab, learned vocab, scorer release or scoring limit
+simply stops matching old keys.
+
+Two layers:
+
+- L1: a small in-process LRU (repeat previews from the same client usually
+  land on the same worker);
+- L2: a Django cache (Redis ``CACHES["default"]`` by default), shared by all
+  API pods.
+
+Values are stored as JSON, so every lookup returns a fresh dict. Cache
+backend errors are logged and treated as misses, and the shared layer is
+skipped for ``retry_after`` seconds; scoring never fails (or waits on
+connection timeouts) because Redis is unavailable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import ScoringConfig
+
+logger = logging.getLogger(__name__)
+
+# The modules score_case results are computed by (see engine.py)
+SCORING_MODULES = (
+    "text_analysis",
+    "structural",
+    "structural_labels",
+    "structural_matchers",
+    "structural_scoring",
+    "engine",
+    "incremental",
+    "vocab_learner",
+)
+
+
+def scorer_fingerprint(config: ScoringConfig) -> str:
+    """Hash of the scoring modules' code and ``config``'s score-affecting values."""
+    h = hashlib.sha256(json.dumps(config.scoring_values(), sort_keys=True).encode("utf-8"))
+    for name in SCORING_MODULES:
+        h.update(Path(import_module(f"{__package__}.{name}").__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def score_key(
+    prompt: str,
+    answer: str,
+    vocab_version: str,
+    learned_revision: str,
+    question_slug: str,
+    scorer: str,
+    answer_chars: int,
+) -> str:
+    """
+    Cache key of one score. ``answer`` is the analyzed (budgeted) answer and
+    ``answer_chars`` the length of the whole answer, which the payload
+    reports when it was cut. ``scorer`` is the scorer_fingerprint of the
+    config scoring with.
+    """
+    blob = json.dumps(
+        [scorer, vocab_version, learned_revision, question_slug, prompt, answer, answer_chars],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    def __init__(
+        self,
+        ttl: int = 3600,
+        l1_size: int = 2048,
+        alias: Optional[str] = "default",
+        prefix: str = "sophistry:score:",
+        retry_after: float = 30.0,
+    ):
+        """
+        ``ttl`` (seconds) applies to both layers; <= 0 disables the cache.
+        ``l1_size`` <= 0 disables the in-process layer, ``alias`` None the
+        shared one.
+        """
+        self.ttl = ttl
+        self.l1_size = l1_size
+        self.alias = alias
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self._l2_down_until = 0.0
+        self._l1: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and (self.l1_size > 0 or self.alias is not None)
+
+    def _backend(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._l1.get(key)
+            if item is not None:
+                expires, blob = item
+                if expires > now:
+                    self._l1.move_to_end(key)
+                    self.l1_hits += 1
+                    return json.loads(blob)
+                del self._l1[key]
+        blob = None
+        if self._l2_usable(now):
+            try:
+                blob = self._backend().get(self.prefix + key)
+            except Exception as e:
+                self._l2_failed(now, "read", e)
+        if blob is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        self._put_l1(key, blob, now)
+        return json.loads(blob)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        blob = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        now = time.monotonic()
+        self._put_l1(key, blob, now)
+        if self._l2_usable(now):
+            try:
+                self._backend().set(self.prefix + key, blob, timeout=self.ttl)
+            except Exception as e:
+                self._l2_failed(now, "write", e)
+
+    def _l2_usable(self, now: float) -> bool:
+        return self.alias is not None and now >= self._l2_down_until
+
+    def _l2_failed(self, now: float, op: str, error: Exception) -> None:
+        self.errors += 1
+        self._l2_down_until = now + self.retry_after
+        logger.warning("Score cache %s failed (%s); using L1 only for %.0fs", op, error, self.retry_after)
+
+    def _put_l1(self, key: str, blob: str, now: float) -> None:
+        if self.l1_size <= 0:
+            return
+        with self._lock:
+            self._l1[key] = (now + self.ttl, blob)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Clear the in-process layer (shared entries expire by TTL)."""
+        with self._lock:
+            self._l1.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.l1_hits + self.l2_hits + self.misses
+            hits = self.l1_hits + self.l2_hits
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "l1_size": len(self._l1),
+                "l1_maxsize": self.l1_size,
+                "l1_hits": self.l1_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
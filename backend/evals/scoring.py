@@ -6,79 +6,382 @@ Sophistry v0.6+ (this bundle) uses **structural scoring** as the primary score:
 how well an answer *structurally matches* the prompt.
 
 Correctness scoring (rubrics / model judges) can be layered later.
+
+This module is the Django adapter over the plain-Python scoring core
+(engine.py and what it imports): it reads the config from settings, sources
+the vocab from the file or DB, and holds the per-process caches.
 """
 
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
 from pathlib import Path
 
 from django.conf import settings
+from django.db import DatabaseError
+
+from .config import ScoringConfig
+from .engine import Question, answer_result, case_result, evaluate, validation_limits
+from .fields import TERMS, load_terms
+from .incremental import AnswerState, PreviewStates
+from .profiling import PROFILER
+from .score_cache import ScoreCache, score_key, scorer_fingerprint
+from .structural import classify_prompt_type, extract_keywords
+from .structural_scoring import (
+    CompiledVocab,
+    compile_vocab,
+    infer_structural_vector,
+    infer_vector,
+    score_alignment_batch,
+    vector_to_dict,
+)
+from .text_analysis import AnalyzedText, TextLike, analyze, truncate
+from .vocab_artifact import preferred_vocab_path
+from .vocab_learner import OverlayCache, learned_revision, overlay_key
+
+from .vocab_registry import VocabRegistry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of TestCase.question_analysis changes.
+ANALYSIS_SCHEMA = 1
+
+CONFIG = ScoringConfig.from_settings(settings)
+
+
+def _db_vocab():
+    """The active DB-stored vocab as (version, content), or None."""
+    from .models import StructuralVocab
+
+    return (
+        StructuralVocab.objects.filter(is_active=True)
+        .order_by("-created_at")
+        .values_list("version", "content")
+        .first()
+    )
+
+
+def _close_db():
+    from django.db import connections
+
+    connections.close_all()
+
+
+_default_path = Path(__file__).parent / "structural_vocab.yaml"
+VOCABS = VocabRegistry(
+    # the compile_vocab artifact next to the YAML, when it is up to date
+    os.environ.get("STRUCTURAL_VOCAB_PATH") or preferred_vocab_path(str(_default_path)),
+    db_source=_db_vocab,
+    poll_seconds=CONFIG.vocab_reload_seconds,
+    after_poll=_close_db,
+)
+
+
+def _get_vocab() -> CompiledVocab:
+    return VOCABS.current()
+
+
+OVERLAYS = OverlayCache(maxsize=CONFIG.overlay_cache_size)
+PREVIEWS = PreviewStates(maxsize=CONFIG.preview_state_size)
+SCORES = ScoreCache(
+    ttl=CONFIG.score_cache_ttl,
+    l1_size=CONFIG.score_cache_l1_size,
+    alias=CONFIG.score_cache_alias,
+)
+# score cache keys change with the scoring code and score-affecting settings
+SCORER = scorer_fingerprint(CONFIG)
+PROFILER.enabled = CONFIG.profile
+
 
-from .structural import score_structural
-from .structural_scoring import load_vocab, score_structural_alignment
-from .vocab_learner import overlay_vocab
+def _scoring_vocab(learned_vocab: dict | None, question_slug: str) -> CompiledVocab:
+    return _keyed_vocab(learned_vocab, question_slug)[0]
 
-_VOCAB = None
 
+def _keyed_vocab(learned_vocab: dict | None, question_slug: str) -> tuple:
+    """(scoring vocab, its overlay_key), from one read of the current base vocab."""
+    base = _get_vocab()
+    vocab = OVERLAYS.get(base, learned_vocab, question_slug) if learned_vocab else base
+    return vocab, overlay_key(base, learned_vocab, question_slug)
 
-def _get_vocab() -> dict:
-    global _VOCAB
-    if _VOCAB is None:
-        default = Path(__file__).parent / "structural_vocab.yaml"
-        path = os.environ.get("STRUCTURAL_VOCAB_PATH", str(default))
-        _VOCAB = load_vocab(path)
-    return _VOCAB
 
+def _max_chars() -> int:
+    return CONFIG.max_analyzed_chars
 
-def score_case(prompt: str, model_answer: str, learned_vocab: dict | None = None, question_slug: str = "q") -> dict:
+
+def budget_text(text: TextLike) -> AnalyzedText:
+    """``analyze(text)`` within the scoring budget.
+
+    Only the first SOPHISTRY_MAX_ANALYZED_CHARS characters are analyzed, so
+    an arbitrarily long paste costs at most as much as that many characters.
+    An AnalyzedText is returned as is (it was budgeted when created).
+    """
+    return analyze(text, _max_chars())
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()[:16]
+
+
+def analyze_question(prompt: str, learned_vocab: dict | None = None, question_slug: str = "q") -> dict:
+    """Compute the question-side scoring analysis for a prompt.
+
+    Everything score_case / score_answer derive from the prompt alone, tagged
+    with what it depends on so it can be stored and reused.
+    """
     vocab = _get_vocab()
+    tags = {
+        "schema": ANALYSIS_SCHEMA,
+        "prompt_hash": _prompt_hash(prompt),
+        "vocab_version": vocab.version,
+        "learned_revision": learned_revision(learned_vocab),
+    }
     if learned_vocab:
-        vocab = overlay_vocab(vocab, learned_vocab, question_slug)
-    structural = score_structural_alignment(prompt, model_answer, vocab)
+        vocab = OVERLAYS.get(vocab, learned_vocab, question_slug)
+    text = budget_text(prompt)
+    vec, dbg = infer_structural_vector(text, vocab)
+    return {
+        **tags,
+        "vector": vector_to_dict(vec),
+        "debug": dbg,
+        "prompt_keywords": extract_keywords(text),
+        "prompt_type": classify_prompt_type(text.raw),
+    }
+
+
+def _analysis_is_current(analysis, prompt: str, learned_vocab: dict | None) -> bool:
+    return (
+        isinstance(analysis, dict)
+        and analysis.get("schema") == ANALYSIS_SCHEMA
+        and analysis.get("prompt_hash") == _prompt_hash(prompt)
+        and analysis.get("vocab_version") == _get_vocab().version
+        and analysis.get("learned_revision") == learned_revision(learned_vocab)
+    )
+
+
+def question_analysis(testcase, save: bool = True) -> dict:
+    """Return ``testcase.question_analysis``, recomputing it if stale.
+
+    Stale means the prompt, the base vocab or the learned vocab changed since
+    it was computed. With ``save=True`` a recomputed analysis is written back;
+    pass ``save=False`` when the caller saves the testcase itself.
+    """
+    analysis = testcase.question_analysis
+    if _analysis_is_current(analysis, testcase.prompt, testcase.learned_vocab):
+        return analysis
+
+    analysis = analyze_question(testcase.prompt, testcase.learned_vocab, testcase.slug)
+    testcase.question_analysis = analysis
+    if save and testcase.pk:
+        testcase.save(update_fields=["question_analysis"])
+    return analysis
+
+
+def score_case(
+    prompt: str,
+    model_answer: TextLike,
+    learned_vocab: dict | None = None,
+    question_slug: str = "q",
+    analysis: dict | None = None,
+    answer_state: AnswerState | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """Structural alignment score for one answer.
+
+    ``analysis`` is an optional precomputed ``question_analysis`` for the same
+    prompt and learned vocab; its question vector is reused instead of
+    re-inferring it. ``answer_state`` is an optional ``preview_state`` for
+    ``model_answer``, used the same way for the answer side.
+
+    Results are cached by content (see score_cache); ``use_cache=False``
+    bypasses the cache for bulk jobs that would only flood it.
+
+    With SOPHISTRY_PROFILE_SCORING on, a freshly computed result carries its
+    per-stage timings in ``score_details["debug"]["timings_ms"]`` (cache hits
+    and cached copies do not).
+    """
+    with PROFILER.trace() as timings:
+        with PROFILER.stage("score_case"):
+            result, cached = _score_case(
+                prompt, model_answer, learned_vocab, question_slug, analysis, answer_state, use_cache
+            )
+    if timings and not cached:
+        result["score_details"].setdefault("debug", {})["timings_ms"] = {
+            k: round(v, 4) for k, v in timings.items()
+        }
+    return result
+
+
+def _score_case(prompt, model_answer, learned_vocab, question_slug, analysis, answer_state, use_cache) -> tuple:
+    """``(result, cached)`` for score_case."""
+    vocab, vocab_key = _keyed_vocab(learned_vocab, question_slug)
+    model_answer = budget_text(model_answer)
+    revision = learned_revision(learned_vocab)
+    key = None
+    if use_cache and SCORES.enabled:
+        key = score_key(
+            prompt or "",
+            model_answer.raw,
+            vocab.version,
+            revision,
+            question_slug if revision != "0" else "",
+            SCORER,
+            model_answer.original_length,
+        )
+        cached = SCORES.get(key)
+        if cached is not None:
+            return cached, True
+    answer_vector = None
+    if answer_state is not None and answer_state.vocab_key == vocab_key:
+        answer_vector = answer_state.vector(vocab)
+    ev = evaluate(
+        Question(prompt, vocab, analysis, CONFIG, revision),
+        model_answer,
+        verdict=False,
+        answer_vector=answer_vector,
+        config=CONFIG,
+    )
+    result = case_result(ev, vocab)
+    if key is not None:
+        SCORES.set(key, result)
+    return result, False
+
+
+def preload(warm: bool = True) -> dict:
+    """Load what scoring needs before serving, e.g. in a pre-fork server master.
+
+    Compiles the vocab (without starting the reload watcher) and, with
+    ``warm``, loads the interned learned-vocab terms and builds each active
+    testcase's learned-vocab overlay, so forked workers share them instead
+    of each rebuilding them on first request. Nothing is written: stored
+    question analyses are refreshed by compaction, relearn_vocab and
+    ``TestCase.save()``. A database that is unreachable or not yet migrated
+    only skips the warm-up.
+    """
+    vocab = VOCABS.preload()
+    questions = 0
+    if warm:
+        from .models import TestCase
+
+        try:
+            load_terms()
+            active = TestCase.objects.filter(is_active=True).only("id", "slug", "learned_vocab")
+            for tc in active.iterator():
+                if tc.learned_vocab and OVERLAYS.stats()["size"] < OVERLAYS.maxsize:
+                    OVERLAYS.get(vocab, tc.learned_vocab, tc.slug)
+                questions += 1
+        except DatabaseError as e:
+            logger.warning("Could not warm scoring state from the DB (%s); workers will build it on demand", e)
+    return {
+        "vocab_version": vocab.version,
+        "questions": questions,
+        "overlays": OVERLAYS.stats()["size"],
+        "terms": len(TERMS),
+    }
+
+
+def scoring_stats() -> dict:
+    """Per-process cache counters and stage timings for the scoring layer."""
     return {
-        "score": structural["structural_score"],
-        "score_details": structural,
+        "vocab_version": _get_vocab().version,
+        "scorer": SCORER,
+        "score_cache": SCORES.stats(),
+        "overlays": OVERLAYS.stats(),
+        "previews": PREVIEWS.stats(),
+        "terms": len(TERMS),
+        "profile": PROFILER.snapshot(),
     }
 
 
-def score_answer(testcase, answer_text: str) -> dict:
+def preview_state(
+    session_key,
+    answer: str,
+    learned_vocab: dict | None = None,
+    question_slug: str = "q",
+    revision=None,
+) -> AnswerState:
+    """Incrementally analyze an answer that is being typed.
+
+    ``session_key`` identifies the editing session (e.g. session id and
+    testcase id); the previous revision stored under it is resumed, so only
+    the edited tail of ``answer`` is re-scanned. Pass the result to
+    ``score_case(answer_state=...)``; it also carries word and sentence counts.
+    """
+    text = truncate(answer or "", _max_chars())
+    with PROFILER.stage("preview_state"):
+        vocab, vocab_key = _keyed_vocab(learned_vocab, question_slug)
+        return PREVIEWS.update(session_key, text, vocab, vocab_key, revision)
+
+
+def score_many(pairs, vocab=None, weights: dict | None = None) -> dict:
+    """Structural alignment scores for many (prompt, answer) pairs.
+
+    Each distinct text is analyzed once, however many pairs it appears in;
+    the axis, base-score and penalty arithmetic then runs as NumPy array
+    operations (see structural_scoring.score_alignment_batch). ``vocab``
+    defaults to the base vocab; pass an overlay to score with learned vocab.
+
+    Returns NumPy arrays aligned with ``pairs`` (unrounded):
+    ``structural_score``, ``base_score``, ``axis_scores[axis]``, ``flags[flag]``.
+    """
+    vocab = compile_vocab(vocab if vocab is not None else _get_vocab())
+    vectors: dict = {}
+
+    def vector(text):
+        vec = vectors.get(text)
+        if vec is None:
+            vec = vectors[text] = infer_vector(budget_text(text), vocab)[0]
+        return vec
+
+    q_vecs = []
+    a_vecs = []
+    for prompt, answer in pairs:
+        q_vecs.append(vector(prompt))
+        a_vecs.append(vector(answer))
+    return score_alignment_batch(q_vecs, a_vecs, vocab, weights=weights)
+
+
+def _validation_limits(testcase) -> tuple:
+    return validation_limits(testcase.expected, CONFIG)
+
+
+def score_answer(testcase, answer_text: TextLike) -> dict:
     """Return a structured verdict for an answer.
 
     The returned dict is intended to be stored in Result.score_details.
     """
-    expected = testcase.expected or {}
-    validation = expected.get("validation") if isinstance(expected, dict) else None
+    min_words, min_sentences = _validation_limits(testcase)
+
+    # prompt keywords/type only depend on the prompt, so any stored analysis
+    # for the current prompt will do
+    analysis = getattr(testcase, "question_analysis", None)
+    if not (isinstance(analysis, dict) and analysis.get("prompt_hash") == _prompt_hash(testcase.prompt)):
+        analysis = {}
 
-    # Defaults from settings, overridable per-testcase via expected.validation
-    min_words = settings.SOPHISTRY_MIN_WORDS
-    min_sentences = settings.SOPHISTRY_MIN_SENTENCES
+    question = Question(testcase.prompt, _get_vocab(), analysis, CONFIG)
+    ev = evaluate(
+        question, answer_text, alignment=False, min_words=min_words, min_sentences=min_sentences, config=CONFIG,
+    )
+    return answer_result(ev, min_words, min_sentences)
 
-    if isinstance(validation, dict):
-        min_words = int(validation.get("min_words") or min_words)
-        min_sentences = int(validation.get("min_sentences") or min_sentences)
 
-    v = score_structural(
-        testcase.prompt,
+def score_both(testcase, answer_text: TextLike) -> tuple:
+    """``(score_case(...), score_answer(...))`` for a testcase from one pass.
+
+    The answer is analyzed once and the question side comes from the
+    testcase's stored analysis when current.
+    """
+    vocab = _scoring_vocab(testcase.learned_vocab, testcase.slug)
+    min_words, min_sentences = _validation_limits(testcase)
+    question = Question(
+        testcase.prompt, vocab, question_analysis(testcase), CONFIG, learned_revision(testcase.learned_vocab)
+    )
+    ev = evaluate(
+        question,
         answer_text,
         min_words=min_words,
         min_sentences=min_sentences,
+        config=CONFIG,
     )
-
-    wc = int(v.signals.get("word_count", 0) or 0)
-    sc = int(v.signals.get("sentence_count", 0) or 0)
-    val_ok = (wc >= min_words) and (sc >= min_sentences)
-
-    return {
-        "score_0_100": v.score_0_100,
-        "band": v.band,
-        "signals": v.signals,
-        "notes": v.notes,
-        "validation": {
-            "min_words": min_words,
-            "min_sentences": min_sentences,
-            "word_count": wc,
-            "sentence_count": sc,
-            "ok": val_ok,
-        },
-    }
+    return case_result(ev, vocab), answer_result(ev, min_words, min_sentences)
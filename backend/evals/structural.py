@@ -13,14 +13,11 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Dict, List
-from django.conf import settings
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from .config import DEFAULT_CONFIG
 from .structural_scoring import infer_structural_vector, score_structural_alignment, detect_flags 
-
-
-
-_WORD_RE = re.compile(r"\b[\w']+\b", re.UNICODE)
-_SENT_SPLIT_RE = re.compile(r"[.!?]+(?:\s|$)")
+from .text_analysis import TextLike, analyze
 
 
 CAUSE_WORDS = {"because", "therefore", "thus", "since", "hence", "so"}
@@ -45,16 +42,12 @@ def band_from_score(score_0_100: int) -> str:
     return "FLUENCY"
 
 
-def count_words(text: str) -> int:
-    return len(_WORD_RE.findall(text or ""))
+def count_words(text: TextLike) -> int:
+    return len(analyze(text).words)
 
 
-def count_sentences(text: str) -> int:
-    t = (text or "").strip()
-    if not t:
-        return 0
-    parts = [p for p in _SENT_SPLIT_RE.split(t) if p.strip()]
-    return max(1, len(parts))
+def count_sentences(text: TextLike) -> int:
+    return analyze(text).sentence_count
 
 
 def classify_prompt_type(prompt: str) -> str:
@@ -70,7 +63,7 @@ def classify_prompt_type(prompt: str) -> str:
     return "EXPLANATION"
 
 
-def extract_keywords(prompt: str) -> List[str]:
+def extract_keywords(prompt: TextLike) -> List[str]:
     stop = {
         "the",
         "a",
@@ -94,7 +87,7 @@ def extract_keywords(prompt: str) -> List[str]:
         "argument",
         "paradox",
     }
-    words = [w.lower() for w in _WORD_RE.findall(prompt or "")]
+    words = analyze(prompt).tokens
     kws: List[str] = []
     seen = set()
     for w in words:
@@ -109,28 +102,53 @@ def extract_keywords(prompt: str) -> List[str]:
     return kws
 
 
-def keyword_overlap_ratio(answer: str, keywords: List[str]) -> float:
+_PLAIN_KEYWORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1024)
+def _keyword_set(keywords: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Tuple[re.Pattern, ...]]:
+    """
+    Split prompt keywords into plain word-character keywords, looked up in
+    the answer's word_runs set, and the rest (e.g. "don't"), which keep a
+    compiled ``\\b...\\b`` pattern. Cached per keyword list, i.e. per prompt.
+    """
+    plain = tuple(k for k in keywords if _PLAIN_KEYWORD_RE.fullmatch(k))
+    other = tuple(re.compile(rf"\b{re.escape(k)}\b") for k in keywords if not _PLAIN_KEYWORD_RE.fullmatch(k))
+    return plain, other
+
+
+def keyword_overlap_ratio(answer: TextLike, keywords: Sequence[str]) -> float:
+    """Fraction of ``keywords`` occurring as whole words in the lowercased answer."""
     if not keywords:
         return 0.0
-    a = (answer or "").lower()
-    hits = 0
-    for k in keywords:
-        if re.search(rf"\b{re.escape(k)}\b", a):
-            hits += 1
+    at = analyze(answer)
+    plain, other = _keyword_set(tuple(keywords))
+    runs = at.word_runs
+    hits = sum(1 for k in plain if k in runs)
+    if other:
+        hits += sum(1 for rx in other if rx.search(at.lower))
     return hits / max(1, len(keywords))
 
 
 def score_structural(
     prompt: str,
-    answer: str,
+    answer: TextLike,
     *,
-    min_words: int = settings.SOPHISTRY_MIN_WORDS,
-    min_sentences: int = settings.SOPHISTRY_MIN_SENTENCES,
+    min_words: int = DEFAULT_CONFIG.min_words,
+    min_sentences: int = DEFAULT_CONFIG.min_sentences,
+    prompt_type: Optional[str] = None,
+    prompt_keywords: Optional[List[str]] = None,
 ) -> StructuralVerdict:
-    ans = (answer or "").strip()
-    wc = count_words(ans)
-    sc = count_sentences(ans)
-    ptype = classify_prompt_type(prompt)
+    """Score ``answer`` against ``prompt``.
+
+    ``prompt_type`` / ``prompt_keywords`` may be passed precomputed (see
+    scoring.question_analysis); otherwise they are derived from ``prompt``.
+    """
+    at = analyze(answer)
+    ans = at.stripped
+    wc = count_words(at)
+    sc = count_sentences(at)
+    ptype = prompt_type or classify_prompt_type(prompt)
 
     signals: Dict = {
         "prompt_type": ptype,
@@ -149,8 +167,8 @@ def score_structural(
     notes: List[str] = []
     score = 0
 
-    kws = extract_keywords(prompt)
-    ov = keyword_overlap_ratio(ans, kws)
+    kws = prompt_keywords if prompt_keywords is not None else extract_keywords(prompt)
+    ov = keyword_overlap_ratio(at, kws)
     signals["keyword_overlap"] = ov
     if ov >= 0.25:
         score += 20
@@ -161,7 +179,7 @@ def score_structural(
         score += 4
         notes.append("This doesn’t yet look like it’s addressing the question directly.")
 
-    lower = ans.lower()
+    lower = at.lower
     has_cause = any(w in lower for w in CAUSE_WORDS)
     signals["has_cause_words"] = has_cause
 
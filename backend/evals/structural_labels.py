@@ -0,0 +1,148 @@
+"""Label sets of structural vectors as bitmasks.
+
+Each compiled vocab interns the labels of its intent, level and mode axes
+(a LabelSpace of LabelTables), so a vector's label sets are ints and the
+similarity arithmetic is bitwise. StructuralVector turns them back into label
+names on demand.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Set
+
+
+class LabelTable:
+    """
+    Interns the labels of one axis to bit positions, so a label set is an int
+    bitmask. Labels outside the vocab (e.g. from a stored vector) are appended
+    on first use.
+    """
+
+    __slots__ = ("names", "ids", "_lock")
+
+    def __init__(self, names: List[str]):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for n in names:
+            self.intern(n)
+
+    def intern(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(name)
+                if i is None:
+                    i = len(self.names)
+                    self.names.append(name)
+                    self.ids[name] = i
+        return i
+
+    def mask(self, names: Any) -> int:
+        m = 0
+        for n in names:
+            m |= 1 << self.intern(n)
+        return m
+
+    def names_of(self, mask: int) -> Set[str]:
+        out: Set[str] = set()
+        i = 0
+        while mask:
+            if mask & 1:
+                out.add(self.names[i])
+            mask >>= 1
+            i += 1
+        return out
+
+
+class LabelSpace:
+    """The intent/level/mode label tables of one compiled vocab."""
+
+    __slots__ = ("intent", "level", "mode")
+
+    def __init__(self, intent: LabelTable, level: LabelTable, mode: LabelTable):
+        self.intent = intent
+        self.level = level
+        self.mode = mode
+
+
+class StructuralVector:
+    """
+    Structural position of a text: domain, scope and three label sets.
+
+    intent/level/mode are int bitmasks over ``space``; the ``intent``,
+    ``level`` and ``mode`` properties materialize label sets on demand.
+    Treat instances as immutable.
+    """
+
+    __slots__ = ("domain", "intent_mask", "level_mask", "mode_mask", "scope", "space")
+
+    def __init__(self, domain: str, intent_mask: int, level_mask: int, mode_mask: int, scope: str, space: LabelSpace):
+        self.domain = domain
+        self.intent_mask = intent_mask
+        self.level_mask = level_mask
+        self.mode_mask = mode_mask
+        self.scope = scope
+        self.space = space
+
+    @classmethod
+    def from_labels(
+        cls, domain: str, intent: Any, level: Any, mode: Any, scope: str, space: LabelSpace,
+    ) -> "StructuralVector":
+        return cls(
+            domain,
+            space.intent.mask(intent),
+            space.level.mask(level),
+            space.mode.mask(mode),
+            scope,
+            space,
+        )
+
+    @property
+    def intent(self) -> Set[str]:
+        return self.space.intent.names_of(self.intent_mask)
+
+    @property
+    def level(self) -> Set[str]:
+        return self.space.level.names_of(self.level_mask)
+
+    @property
+    def mode(self) -> Set[str]:
+        return self.space.mode.names_of(self.mode_mask)
+
+    def in_space(self, space: LabelSpace) -> "StructuralVector":
+        """This vector re-encoded over ``space`` (self if already there)."""
+        if space is self.space:
+            return self
+        return StructuralVector.from_labels(self.domain, self.intent, self.level, self.mode, self.scope, space)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, StructuralVector):
+            return NotImplemented
+        other = other.in_space(self.space)
+        return (
+            self.domain == other.domain
+            and self.scope == other.scope
+            and self.intent_mask == other.intent_mask
+            and self.level_mask == other.level_mask
+            and self.mode_mask == other.mode_mask
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"StructuralVector(domain={self.domain!r}, intent={sorted(self.intent)!r}, "
+            f"level={sorted(self.level)!r}, mode={sorted(self.mode)!r}, scope={self.scope!r})"
+        )
+
+
+def vector_to_dict(vec: StructuralVector) -> Dict[str, Any]:
+    return {
+        "domain": vec.domain,
+        "intent": sorted(vec.intent),
+        "level": sorted(vec.level),
+        "mode": sorted(vec.mode),
+        "scope": vec.scope,
+    }
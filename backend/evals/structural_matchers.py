@@ -0,0 +1,453 @@
+"""Compiled marker and domain matchers for a structural vocab.
+
+_AxisMatcher fuses all label patterns of one axis into one regex (with
+``X.*Y`` patterns run as linear _GapPattern searches); _DomainMatcher counts
+every domain's keyword hits with one trie-shaped regex. CompiledVocab
+(structural_scoring) builds one of each per axis.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .structural_labels import LabelTable
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants, _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
+
+
+class _GapPattern:
+    """
+    A pattern ``X.*Y`` with one top-level ``.*`` and fixed-width ``X``, run
+    as two searches: the first ``X`` match, then ``Y`` anywhere after it.
+
+    As one regex, every ``X`` occurrence scans and backtracks over the rest of
+    the text looking for ``Y``, which is quadratic when ``Y`` is absent (a
+    long paste of "if if if ..." against ``\\bif\\b.*\\bthen\\b``). ``.*``
+    matches anything on a line, so the pattern matches iff ``Y`` matches
+    after the end of the leftmost ``X``: the two searches give the same answer
+    in linear time. Only valid for text without newlines (normalized text).
+    """
+
+    __slots__ = ("pattern", "x", "y")
+
+    def __init__(self, pattern: str, x: re.Pattern, y: re.Pattern):
+        self.pattern = pattern
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def split(cls, pattern: str) -> Optional["_GapPattern"]:
+        i = _top_level_gap(pattern)
+        if i is None:
+            return None
+        try:
+            x = re.compile(pattern[:i], re.IGNORECASE)
+            y = re.compile(pattern[i + 2:], re.IGNORECASE)
+            lo, hi = _sre_parse.parse(pattern[:i], re.IGNORECASE).getwidth()
+        except re.error:  # e.g. Y refers to a group in X
+            return None
+        if lo != hi:
+            return None
+        return cls(pattern, x, y)
+
+    def search(self, t: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """Span of a match starting at the leftmost possible position >= ``pos``."""
+        m = self.x.search(t, pos)
+        if m is None:
+            return None
+        n = self.y.search(t, m.end())
+        return (m.start(), n.end()) if n else None
+
+
+def _top_level_gap(pattern: str) -> Optional[int]:
+    """Offset of the only top-level greedy ``.*`` in a pattern without top-level ``|`` or inline flags."""
+    gaps: List[int] = []
+    depth = 0
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i += 1
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if c == "(":
+            if pattern.startswith("(?", i) and pattern[i + 2:i + 3] in tuple("aiLmsux-"):
+                return None
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0:
+            if c == "|":
+                return None
+            if pattern.startswith(".*", i):
+                if pattern[i + 2:i + 3] in ("?", "+"):
+                    return None
+                gaps.append(i)
+                i += 2
+                continue
+        i += 1
+    return gaps[0] if len(gaps) == 1 else None
+
+
+def _join(patterns: List[str]) -> str:
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+class _AxisMatcher:
+    """
+    All label patterns of one axis (intent, level, mode, scope) fused into a
+    single regex, compiled once.
+
+    The fused regex is a lookahead alternation with one named group per label,
+    so a single finditer() visits every position where *some* label matches.
+    When two labels match at the same position only the first group is set, so
+    the remaining unmatched labels are re-checked at that position only. The
+    result is identical to running every pattern's search() separately.
+
+    ``X.*Y`` patterns stay out of the fused regex and run as _GapPattern
+    searches, which keeps matching linear in the text length.
+    """
+
+    def __init__(
+        self,
+        label_patterns: Dict[str, List[str]],
+        extra_labels: Tuple[str, ...] = (),
+        reach: Optional[List[Tuple[bool, Optional[int]]]] = None,
+    ):
+        """``reach`` is an optional precomputed (local, reach) per label (see vocab_artifact)."""
+        self.labels: List[str] = []
+        # per label: its fused (non-gap) patterns, its gap patterns, and all
+        # of them as one regex (used for text with newlines)
+        self.per_label: List[Optional[re.Pattern]] = []
+        self.gapped: List[List[_GapPattern]] = []
+        self.full: List[re.Pattern] = []
+        alternatives: List[str] = []
+        for label, patterns in (label_patterns or {}).items():
+            if not patterns:
+                continue
+            idx = len(self.labels)
+            plain: List[str] = []
+            gapped: List[_GapPattern] = []
+            for p in patterns:
+                gap = _GapPattern.split(p)
+                if gap is not None:
+                    gapped.append(gap)
+                else:
+                    plain.append(p)
+            rx: Optional[re.Pattern] = None
+            if plain:
+                rx = re.compile(_join(plain), re.IGNORECASE)
+                alternatives.append(f"(?P<g{idx}>{_join(plain)})")
+            self.per_label.append(rx)
+            self.gapped.append(gapped)
+            self.full.append(re.compile(_join(patterns), re.IGNORECASE))
+            self.labels.append(label)
+        self.fused: Optional[re.Pattern] = None
+        if alternatives:
+            self.fused = re.compile("(?=" + "|".join(alternatives) + ")", re.IGNORECASE)
+        # labels the fused regex can find on its own
+        self.fused_mask = 0
+        for j, rx in enumerate(self.per_label):
+            if rx is not None:
+                self.fused_mask |= 1 << j
+        # per label: can a match be re-used when only text after it changed,
+        # and the longest text a match can span (None: unbounded)
+        if reach is None or len(reach) != len(self.full):
+            reach = [_pattern_reach(rx.pattern, rx.flags) for rx in self.full]
+        self.local: List[bool] = [local for local, _ in reach]
+        self.reach: List[Optional[int]] = [r for _, r in reach]
+        # bit i of a match mask is self.labels[i]; extra labels (fallbacks)
+        # get bits after the pattern labels
+        self.table = LabelTable(self.labels + list(extra_labels))
+
+    def search(self, j: int, t: str, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """Span of label ``j``'s leftmost match in ``t`` at or after ``pos``."""
+        if "\n" in t:
+            m = self.full[j].search(t, pos)
+            return m.span() if m else None
+        best: Optional[Tuple[int, int]] = None
+        rx = self.per_label[j]
+        if rx is not None:
+            m = rx.search(t, pos)
+            if m:
+                best = m.span()
+        for gap in self.gapped[j]:
+            span = gap.search(t, pos)
+            if span is not None and (best is None or span[0] < best[0]):
+                best = span
+        return best
+
+    def match(self, t: str) -> int:
+        """Bitmask of labels with at least one pattern matching normalized text ``t``."""
+        if "\n" in t:
+            return self.mask_of({j: None for j, rx in enumerate(self.full) if rx.search(t)})
+        found = 0
+        if self.fused is not None:
+            n = len(self.labels)
+            for m in self.fused.finditer(t):
+                idx = int(m.lastgroup[1:])
+                found |= 1 << idx
+                pos = m.start()
+                for j in range(idx + 1, n):
+                    rx = self.per_label[j]
+                    if rx is not None and not found & (1 << j) and rx.match(t, pos):
+                        found |= 1 << j
+                if found & self.fused_mask == self.fused_mask:
+                    break
+        for j, gaps in enumerate(self.gapped):
+            if gaps and not found & (1 << j):
+                if any(gap.search(t) is not None for gap in gaps):
+                    found |= 1 << j
+        return found
+
+    def spans(self, t: str) -> Dict[int, Tuple[int, int]]:
+        """
+        Label index -> (start, end) of its leftmost match in ``t``, for every
+        label that matches. ``update_spans`` maintains this across edits.
+        """
+        out: Dict[int, Tuple[int, int]] = {}
+        if "\n" in t:
+            for j in range(len(self.labels)):
+                span = self.search(j, t)
+                if span is not None:
+                    out[j] = span
+            return out
+        if self.fused is not None:
+            n = len(self.labels)
+            for m in self.fused.finditer(t):
+                idx = int(m.lastgroup[1:])
+                pos = m.start()
+                if idx not in out:
+                    out[idx] = (pos, m.end(m.lastgroup))
+                for j in range(idx + 1, n):
+                    rx = self.per_label[j]
+                    if rx is not None and j not in out:
+                        mj = rx.match(t, pos)
+                        if mj:
+                            out[j] = (pos, mj.end())
+                if len(out) == n:
+                    break
+        for j, gaps in enumerate(self.gapped):
+            if gaps:
+                # gap labels are unbounded; any match will do as the witness
+                span = out.get(j)
+                for gap in gaps:
+                    if span is not None:
+                        break
+                    span = gap.search(t)
+                if span is not None:
+                    out[j] = span
+        return out
+
+    def update_spans(
+        self, spans: Dict[int, Tuple[int, int]], t: str, unchanged: int
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        ``spans(t)`` given ``spans`` of a previous text that shares its first
+        ``unchanged`` characters with ``t``.
+
+        A match ending before the changed region (with one character to
+        spare for ``\\b``) is still a match. A label whose patterns can span
+        at most ``reach`` characters can only gain an earlier match that
+        starts within ``reach`` of the change, so it is searched from there;
+        unbounded or lookaround patterns are searched from the start.
+        """
+        out: Dict[int, Tuple[int, int]] = {}
+        for j in range(len(self.labels)):
+            prev = spans.get(j)
+            reach = self.reach[j]
+            if not self.local[j]:
+                lo = 0
+            elif reach is None:
+                if prev is not None and prev[1] < unchanged:
+                    out[j] = prev
+                    continue
+                lo = 0
+            else:
+                lo = max(0, unchanged - reach - 1)
+                if prev is not None and prev[0] < lo:
+                    out[j] = prev
+                    continue
+            span = self.search(j, t, lo)
+            if span is not None:
+                out[j] = span
+        return out
+
+    @staticmethod
+    def mask_of(spans: Dict[int, Any]) -> int:
+        found = 0
+        for j in spans:
+            found |= 1 << j
+        return found
+
+
+def _pattern_reach(pattern: str, flags: int = 0) -> Tuple[bool, Optional[int]]:
+    """
+    (local, reach) for a regex: ``local`` is False if it has lookarounds
+    (a match then depends on text beyond its span, other than the one
+    character ``\\b`` looks at); ``reach`` is the maximum match length, or
+    None if unbounded.
+    """
+    tree = _sre_parse.parse(pattern, flags)
+
+    def has_lookaround(node: Any) -> bool:
+        if isinstance(node, _sre_parse.SubPattern):
+            return any(
+                op in (_sre_constants.ASSERT, _sre_constants.ASSERT_NOT) or has_lookaround(av)
+                for op, av in node
+            )
+        if isinstance(node, (list, tuple)):
+            return any(has_lookaround(x) for x in node)
+        return False
+
+    hi = tree.getwidth()[1]
+    return not has_lookaround(tree), (None if hi >= _sre_constants.MAXREPEAT - 1 else hi)
+
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Build a regex alternation for literal ``words`` shaped like a trie, so the
+    engine branches on one character at a time instead of trying every word at
+    every position. At a given start position the longest word wins.
+    """
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # greedy optional: try the longer word first, fall back to this one
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class _DomainMatcher:
+    """
+    Counts domain keyword hits (``kw.lower() in text``) for all domains in one
+    pass over the text.
+
+    Keywords are fused into a single trie-shaped regex wrapped in a lookahead,
+    so findall() reports the longest keyword starting at each position; every
+    keyword that is a prefix of it is credited too. When ``base`` is given,
+    domains whose keyword list is shared with it are counted by the base
+    matcher, and only the remaining (e.g. learned overlay) domains are compiled
+    here.
+    """
+
+    def __init__(self, domains: Dict[str, List[str]], base: Optional["_DomainMatcher"] = None):
+        self.order: List[str] = list(domains.keys())
+        self.base = base
+        self.from_base: List[str] = []
+        own: Dict[str, List[str]] = {}
+        for d, kws in domains.items():
+            if base is not None and base.lists.get(d) is kws:
+                self.from_base.append(d)
+            else:
+                own[d] = kws
+        if not self.from_base:
+            self.base = None
+        self.lists: Dict[str, List[str]] = dict(domains)
+
+        # keyword -> [(domain, multiplicity)]
+        hits: Dict[str, Counter] = {}
+        self.always: Counter = Counter()
+        for d, kws in own.items():
+            for kw in kws or []:
+                k = str(kw).lower()
+                if not k:
+                    self.always[d] += 1
+                    continue
+                hits.setdefault(k, Counter())[d] += 1
+        self.hits: Dict[str, List[Tuple[str, int]]] = {k: list(c.items()) for k, c in hits.items()}
+        self.prefixes: Dict[str, List[str]] = {
+            k: [k[:i] for i in range(1, len(k) + 1) if k[:i] in hits] for k in hits
+        }
+        self.regex: Optional[re.Pattern] = None
+        if hits:
+            self.regex = re.compile("(?=(" + _trie_regex(list(hits)) + "))")
+        self.maxlen: int = max((len(k) for k in hits), default=0)
+        if self.base is not None:
+            self.maxlen = max(self.maxlen, self.base.maxlen)
+
+    def count(self, t: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {d: 0 for d in self.order}
+        if self.base is not None:
+            base_counts = self.base.count(t)
+            for d in self.from_base:
+                counts[d] = base_counts[d]
+        for d, n in self.always.items():
+            counts[d] += n
+        if self.regex is None:
+            return counts
+        seen: Set[str] = set()
+        for k in set(self.regex.findall(t)):
+            seen.update(self.prefixes[k])
+        for k in seen:
+            for d, n in self.hits[k]:
+                counts[d] += n
+        return counts
+
+    def starts(self, t: str, pos: int = 0) -> Dict[str, int]:
+        """Keyword -> offset of its first occurrence in ``t`` at or after ``pos``."""
+        out: Dict[str, int] = self.base.starts(t, pos) if self.base is not None else {}
+        if self.regex is None:
+            return out
+        for m in self.regex.finditer(t, pos):
+            s = m.start()
+            for k in self.prefixes[m.group(1)]:
+                if k not in out or s < out[k]:
+                    out[k] = s
+        return out
+
+    def update_starts(self, starts: Dict[str, int], t: str, unchanged: int) -> Dict[str, int]:
+        """
+        ``starts(t)`` given ``starts`` of a previous text that shares its
+        first ``unchanged`` characters with ``t``: occurrences inside that
+        prefix stand, and only the last ``maxlen`` characters of it onwards
+        are re-scanned.
+        """
+        lo = max(0, unchanged - self.maxlen + 1)
+        out = {k: s for k, s in starts.items() if s + len(k) <= unchanged}
+        for k, s in self.starts(t, lo).items():
+            if k not in out or s < out[k]:
+                out[k] = s
+        return out
+
+    def counts_for(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """Domain counts for text in which exactly ``keywords`` occur."""
+        counts: Dict[str, int] = {d: 0 for d in self.order}
+        if self.base is not None:
+            base_counts = self.base.counts_for(keywords)
+            for d in self.from_base:
+                counts[d] = base_counts[d]
+        for d, n in self.always.items():
+            counts[d] += n
+        for k in keywords:
+            for d, n in self.hits.get(k, ()):
+                counts[d] += n
+        return counts
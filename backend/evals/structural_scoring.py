@@ -1,36 +1,55 @@
 from __future__ import annotations
 
 import re
-import math
+import hashlib
+import json
+import logging
 from collections import Counter
-from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional
+
+from .profiling import PROFILER
+from .structural_labels import LabelSpace, StructuralVector, vector_to_dict
+from .structural_matchers import _AxisMatcher, _DomainMatcher
+from .text_analysis import TextLike, analyze
+from .vocab_lint import lint_vocab
+
+logger = logging.getLogger(__name__)
 
 try:
     import yaml  # pip install pyyaml
 except Exception:
     yaml = None
 
+try:
+    import numpy as np  # pip install numpy; only needed for batch scoring
+except Exception:
+    np = None
+
 
-@dataclass(frozen=True)
-class StructuralVector:
-    domain: str
-    intent: Set[str]
-    level: Set[str]
-    mode: Set[str]
-    scope: str
+DEFAULT_WEIGHTS: Dict[str, float] = {"domain": 0.25, "intent": 0.25, "level": 0.20, "mode": 0.15, "scope": 0.15}
 
+# flag -> score multiplier, applied in this order
+PENALTIES: List[Tuple[str, float]] = [
+    ("category_error", 0.6),
+    ("off_topic", 0.5),
+    ("scope_mismatch", 0.85),
+]
 
-def _normalize(text: str) -> str:
-    # keep simple; deterministic
-    t = text.strip().lower()
-    # normalize punctuation spacing a bit
-    t = re.sub(r"\s+", " ", t)
-    return t
 
+def vector_from_dict(d: Dict[str, Any], vocab: Any) -> StructuralVector:
+    """Rebuild a vector_to_dict() payload over ``vocab``'s label space."""
+    return StructuralVector.from_labels(
+        d["domain"], d["intent"], d["level"], d["mode"], d["scope"], compile_vocab(vocab).labels,
+    )
+
+
+def _normalize(text: TextLike) -> str:
+    # keep simple; deterministic: strip, lowercase, collapse whitespace
+    return analyze(text).normalized
 
 
-def _tokenize(text: str) -> List[str]:
+
+def _tokenize(text: TextLike) -> List[str]:
     """Deterministic tokenization for anti-gaming signals."""
     t = _normalize(text)
     # keep alphabetic-ish tokens; treat hyphens as separators
@@ -61,14 +80,66 @@ def _max_ngram_repeats(tokens: List[str], n: int = 3) -> int:
     return c.most_common(1)[0][1] if grams else 0
 
 
-def _compile_patterns(patterns: List[str]) -> List[re.Pattern]:
-    compiled: List[re.Pattern] = []
-    for p in patterns:
-        compiled.append(re.compile(p, re.IGNORECASE))
-    return compiled
+# fallback labels when nothing is detected on an axis (keeps scoring stable)
+_DEFAULT_INTENT = "describe_process"
+_DEFAULT_LEVEL = "interpretive"
+_DEFAULT_MODE = "descriptive"
+
+
+class CompiledVocab:
+    """
+    A vocab dict with every marker regex compiled up front.
+
+    Built once per vocab (see ``compile_vocab``) and reused for every scored
+    text. ``raw`` keeps the original dict for callers that need it.
+    ``version`` is a content hash of the base vocab; overlays keep it.
+    """
+
+    def __init__(self, vocab: Dict[str, Any], reach: Optional[Dict[str, list]] = None):
+        """``reach`` optionally maps marker axis to its precomputed per-label match analysis."""
+        reach = reach or {}
+        self.raw: Dict[str, Any] = vocab
+        self.version: str = vocab_version(vocab)
+        self.domains: Dict[str, List[str]] = vocab.get("domains", {}) or {}
+        self.domain_matcher = _DomainMatcher(self.domains)
+        self.intent = _AxisMatcher(vocab.get("intent_markers", {}), (_DEFAULT_INTENT,), reach.get("intent_markers"))
+        self.level = _AxisMatcher(vocab.get("level_markers", {}), (_DEFAULT_LEVEL,), reach.get("level_markers"))
+        self.mode = _AxisMatcher(vocab.get("mode_markers", {}), (_DEFAULT_MODE,), reach.get("mode_markers"))
+        self.scope = _AxisMatcher(vocab.get("scope_markers", {}), (), reach.get("scope_markers"))
+        self.labels = LabelSpace(self.intent.table, self.level.table, self.mode.table)
+
+    def with_domains(self, domains: Dict[str, List[str]]) -> "CompiledVocab":
+        """
+        Return a copy with different domains, sharing the compiled marker
+        regexes. Domains whose keyword list is unchanged keep using this
+        vocab's domain matcher; only new or replaced domains are compiled.
+        """
+        clone = object.__new__(CompiledVocab)
+        clone.__dict__.update(self.__dict__)
+        clone.raw = {**self.raw, "domains": domains}
+        clone.domains = domains
+        clone.domain_matcher = _DomainMatcher(domains, base=self.domain_matcher)
+        return clone
+
+
+def vocab_version(vocab: Dict[str, Any]) -> str:
+    """Stable content hash of a vocab dict (key order independent)."""
+    blob = json.dumps(vocab, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_vocab(vocab: Any) -> CompiledVocab:
+    if isinstance(vocab, CompiledVocab):
+        return vocab
+    return CompiledVocab(vocab)
 
 
 def load_vocab(path: str) -> Dict[str, Any]:
+    """A vocab dict from a YAML file, or from a compile_vocab artifact (``.json``)."""
+    if str(path).endswith(".json"):
+        from .vocab_artifact import read_artifact, vocab_from_artifact
+
+        return vocab_from_artifact(read_artifact(path))
     if yaml is None:
         raise RuntimeError("PyYAML not available. Install pyyaml or load vocab as dict.")
     try:
@@ -79,23 +150,23 @@ def load_vocab(path: str) -> Dict[str, Any]:
             f"Structural vocab file not found: '{path}'. "
             "Set STRUCTURAL_VOCAB_PATH to the correct path or place structural_vocab.yaml in the evals directory."
         )
+    for issue in lint_vocab(vocab or {}):
+        logger.warning("Structural vocab %s: %s", path, issue)
     return vocab
 
 
-def _score_domain(text: str, domains: Dict[str, List[str]]) -> Tuple[str, Dict[str, int]]:
+def _score_domain(text: TextLike, matcher: _DomainMatcher) -> Tuple[str, Dict[str, int]]:
     """
     Deterministic: count keyword hits for each domain.
     Return best domain (or 'mixed' if tie/close) + hit counts for debugging.
     """
     t = _normalize(text)
-    counts: Dict[str, int] = {d: 0 for d in domains.keys()}
+    # keyword treated as literal token-ish; cheap + stable
+    counts = matcher.count(t)
+    return _pick_domain(counts), counts
 
-    for domain, kws in domains.items():
-        for kw in kws:
-            # keyword treated as literal token-ish; cheap + stable
-            if kw.lower() in t:
-                counts[domain] += 1
 
+def _pick_domain(counts: Dict[str, int]) -> str:
     # pick best
     best_domain = max(counts.items(), key=lambda kv: kv[1])[0]
     best_score = counts[best_domain]
@@ -106,73 +177,95 @@ def _score_domain(text: str, domains: Dict[str, List[str]]) -> Tuple[str, Dict[s
         second_domain, second_score = sorted_counts[1]
         # mixed if both have meaningful hits and close
         if best_score >= 2 and second_score >= best_score - 1 and second_score > 0:
-            return "mixed", counts
+            return "mixed"
 
     if best_score == 0:
-        return "other", counts
+        return "other"
 
-    return best_domain, counts
+    return best_domain
 
 
-def _match_labels(text: str, label_patterns: Dict[str, List[str]]) -> Set[str]:
+def _match_labels(text: TextLike, matcher: _AxisMatcher) -> int:
     t = _normalize(text)
-    out: Set[str] = set()
-    for label, patterns in label_patterns.items():
-        compiled = _compile_patterns(patterns)
-        if any(p.search(t) for p in compiled):
-            out.add(label)
-    return out
+    return matcher.match(t)
 
 
-def _pick_scope(text: str, scope_patterns: Dict[str, List[str]]) -> str:
+def _pick_scope(text: TextLike, matcher: _AxisMatcher) -> str:
     t = _normalize(text)
+    return _scope_of(matcher.match(t), matcher)
+
+
+def _scope_of(found: int, matcher: _AxisMatcher) -> str:
+    ids = matcher.table.ids
     # order matters: boundary_extremes should win if present
     priority = ["boundary_extremes", "concrete_case", "general_principle"]
     for k in priority:
-        if k not in scope_patterns:
-            continue
-        compiled = _compile_patterns(scope_patterns[k])
-        if any(p.search(t) for p in compiled):
+        i = ids.get(k)
+        if i is not None and found & (1 << i):
             return k
     return "mixed"
 
 
-def infer_structural_vector(text: str, vocab: Dict[str, Any]) -> Tuple[StructuralVector, Dict[str, Any]]:
+def infer_vector(text: TextLike, vocab: Any) -> Tuple[StructuralVector, Dict[str, int]]:
     """
-    Infer a structural vector + debug info for transparency.
+    Infer a structural vector and the raw domain counts, without materializing
+    any label names. ``infer_structural_vector`` adds the debug payload.
     """
-    domains = vocab.get("domains", {})
-    intent_markers = vocab.get("intent_markers", {})
-    level_markers = vocab.get("level_markers", {})
-    mode_markers = vocab.get("mode_markers", {})
-    scope_markers = vocab.get("scope_markers", {})
-
-    domain, domain_counts = _score_domain(text, domains)
-    intent = _match_labels(text, intent_markers)
-    level = _match_labels(text, level_markers)
-    mode = _match_labels(text, mode_markers)
-    scope = _pick_scope(text, scope_markers)
-
+    cv = compile_vocab(vocab)
+    text = analyze(text)
+
+    with PROFILER.stage("domain"):
+        domain, domain_counts = _score_domain(text, cv.domain_matcher)
+    with PROFILER.stage("labels.intent"):
+        intent = _match_labels(text, cv.intent)
+    with PROFILER.stage("labels.level"):
+        level = _match_labels(text, cv.level)
+    with PROFILER.stage("labels.mode"):
+        mode = _match_labels(text, cv.mode)
+    with PROFILER.stage("scope"):
+        scope = _pick_scope(text, cv.scope)
+    return vector_from_matches(cv, domain, intent, level, mode, scope), domain_counts
+
+
+def vector_from_matches(
+    cv: CompiledVocab, domain: str, intent: int, level: int, mode: int, scope: str
+) -> StructuralVector:
+    """Assemble a vector from matched label masks, applying the fallback labels."""
     # default fallback labels if nothing detected (keeps scoring stable)
+    space = cv.labels
     if not intent:
-        intent = {"describe_process"}
+        intent = 1 << space.intent.ids[_DEFAULT_INTENT]
     if not level:
-        level = {"interpretive"}
+        level = 1 << space.level.ids[_DEFAULT_LEVEL]
     if not mode:
-        mode = {"descriptive"}
+        mode = 1 << space.mode.ids[_DEFAULT_MODE]
+
+    return StructuralVector(domain, intent, level, mode, scope, space)
+
+
+def infer_structural_vector(text: TextLike, vocab: Any) -> Tuple[StructuralVector, Dict[str, Any]]:
+    """
+    Infer a structural vector + debug info for transparency.
+
+    ``vocab`` may be a raw vocab dict or a CompiledVocab; pass the compiled
+    form when scoring more than one text.
+    """
+    vec, domain_counts = infer_vector(text, vocab)
+    return vec, vector_debug(vec, domain_counts)
+
 
-    vec = StructuralVector(domain=domain, intent=intent, level=level, mode=mode, scope=scope)
-    debug = {
+def vector_debug(vec: StructuralVector, domain_counts: Dict[str, int]) -> Dict[str, Any]:
+    """The debug payload infer_structural_vector reports alongside ``vec``."""
+    return {
         "domain_counts": domain_counts,
-        "intent": sorted(intent),
-        "level": sorted(level),
-        "mode": sorted(mode),
-        "scope": scope,
+        "intent": sorted(vec.intent),
+        "level": sorted(vec.level),
+        "mode": sorted(vec.mode),
+        "scope": vec.scope,
     }
-    return vec, debug
 
 
-def jaccard(a: Set[str], b: Set[str]) -> float:
+def jaccard(a: set[str], b: set[str]) -> float:
     if not a and not b:
         return 1.0
     if not a or not b:
@@ -182,6 +275,15 @@ def jaccard(a: Set[str], b: Set[str]) -> float:
     return inter / union if union else 0.0
 
 
+def jaccard_mask(a: int, b: int) -> float:
+    """jaccard() over label bitmasks from the same LabelTable."""
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return (a & b).bit_count() / (a | b).bit_count()
+
+
 def _sim_domain(q: str, a: str) -> float:
     if q == a:
         return 1.0
@@ -203,33 +305,39 @@ def _sim_scope(q: str, a: str) -> float:
 def detect_flags(
     q_vec: StructuralVector,
     a_vec: StructuralVector,
-    q_text: str,
-    a_text: str,
+    q_text: TextLike,
+    a_text: TextLike,
 ) -> Dict[str, bool]:
     """
     Rule-based flags for category errors & drift.
     Deterministic, intentionally conservative.
+    Only the vectors are used; the texts are kept for signature compatibility.
     """
-    qt = _normalize(q_text)
-    at = _normalize(a_text)
+    space = q_vec.space
+    a_vec = a_vec.in_space(space)
+    intent_j = jaccard_mask(q_vec.intent_mask, a_vec.intent_mask)
 
     # Off-topic: domain mismatch + weak overlap on intent/level
-    off_topic = (_sim_domain(q_vec.domain, a_vec.domain) == 0.0) and (jaccard(q_vec.intent, a_vec.intent) < 0.34)
+    off_topic = (_sim_domain(q_vec.domain, a_vec.domain) == 0.0) and (intent_j < 0.34)
 
     # Category error: question asks mechanism/limits/evidence but answer is purely normative/historical
-    q_needs = {"explain_mechanism", "analyze_limits", "interpret_evidence"}
-    a_bad_levels = {"normative", "historical"}
+    q_needs = space.intent.mask(("explain_mechanism", "analyze_limits", "interpret_evidence"))
+    a_bad_levels = space.level.mask(("normative", "historical"))
 
     category_error = False
-    if q_vec.intent & q_needs:
-        if (a_vec.level <= a_bad_levels) or (len(a_vec.level & a_bad_levels) == len(a_vec.level)):
+    if q_vec.intent_mask & q_needs:
+        if (a_vec.level_mask & ~a_bad_levels) == 0:
             category_error = True
 
     # Scope mismatch: question boundary_extremes but answer not boundary/mixed
     scope_mismatch = (q_vec.scope == "boundary_extremes") and (a_vec.scope not in {"boundary_extremes", "mixed"})
 
     # Stays on topic heuristic: shared domain OR strong overlap in intent/level
-    stays_on_topic = (q_vec.domain == a_vec.domain) or (jaccard(q_vec.intent, a_vec.intent) >= 0.5) or (jaccard(q_vec.level, a_vec.level) >= 0.5)
+    stays_on_topic = (
+        (q_vec.domain == a_vec.domain)
+        or (intent_j >= 0.5)
+        or (jaccard_mask(q_vec.level_mask, a_vec.level_mask) >= 0.5)
+    )
 
     return {
         "off_topic": off_topic,
@@ -240,10 +348,12 @@ def detect_flags(
 
 
 def score_structural_alignment(
-    question: str,
-    answer: str,
-    vocab: Dict[str, Any],
+    question: TextLike,
+    answer: TextLike,
+    vocab: Any,
     weights: Optional[Dict[str, float]] = None,
+    question_vector: Optional[Tuple[StructuralVector, Dict[str, Any]]] = None,
+    answer_vector: Optional[Tuple[StructuralVector, Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
     """
     Returns a rich score payload for your dial:
@@ -251,18 +361,32 @@ def score_structural_alignment(
     - axis_scores
     - flags + penalties
     - inferred vectors + debug counts
+
+    ``question_vector`` / ``answer_vector`` are optional precomputed
+    ``infer_structural_vector`` results for ``question`` / ``answer`` (same
+    vocab), skipping that side's inference.
     """
     if weights is None:
-        weights = {"domain": 0.25, "intent": 0.25, "level": 0.20, "mode": 0.15, "scope": 0.15}
-
-    q_vec, q_dbg = infer_structural_vector(question, vocab)
-    a_vec, a_dbg = infer_structural_vector(answer, vocab)
-
+        weights = DEFAULT_WEIGHTS
+
+    vocab = compile_vocab(vocab)
+    question = analyze(question)
+    answer = analyze(answer)
+    if question_vector is not None:
+        q_vec, q_dbg = question_vector
+    else:
+        q_vec, q_dbg = infer_structural_vector(question, vocab)
+    if answer_vector is not None:
+        a_vec, a_dbg = answer_vector
+    else:
+        a_vec, a_dbg = infer_structural_vector(answer, vocab)
+
+    q_vec = q_vec.in_space(vocab.labels)
     axis_scores = {
         "domain": _sim_domain(q_vec.domain, a_vec.domain),
-        "intent": jaccard(q_vec.intent, a_vec.intent),
-        "level": jaccard(q_vec.level, a_vec.level),
-        "mode": jaccard(q_vec.mode, a_vec.mode),
+        "intent": jaccard_mask(q_vec.intent_mask, a_vec.intent_mask),
+        "level": jaccard_mask(q_vec.level_mask, a_vec.level_mask),
+        "mode": jaccard_mask(q_vec.mode_mask, a_vec.mode_mask),
         "scope": _sim_scope(q_vec.scope, a_vec.scope),
     }
 
@@ -270,20 +394,16 @@ def score_structural_alignment(
     for k, w in weights.items():
         base += w * axis_scores.get(k, 0.0)
 
-    flags = detect_flags(q_vec, a_vec, question, answer)
+    with PROFILER.stage("flags"):
+        flags = detect_flags(q_vec, a_vec, question, answer)
 
     # penalties
     score = base
     penalties: List[str] = []
-    if flags["category_error"]:
-        score *= 0.6
-        penalties.append("category_error x0.6")
-    if flags["off_topic"]:
-        score *= 0.5
-        penalties.append("off_topic x0.5")
-    if flags["scope_mismatch"]:
-        score *= 0.85
-        penalties.append("scope_mismatch x0.85")
+    for flag, factor in PENALTIES:
+        if flags[flag]:
+            score *= factor
+            penalties.append(f"{flag} x{factor}")
 
     # clamp
     score = max(0.0, min(1.0, score))
@@ -308,25 +428,119 @@ def score_structural_alignment(
         "axis_scores": {k: round(v, 4) for k, v in axis_scores.items()},
         "flags": flags,
         "penalties": penalties,
-        "question_vector": {
-            "domain": q_vec.domain,
-            "intent": sorted(q_vec.intent),
-            "level": sorted(q_vec.level),
-            "mode": sorted(q_vec.mode),
-            "scope": q_vec.scope,
-        },
-        "answer_vector": {
-            "domain": a_vec.domain,
-            "intent": sorted(a_vec.intent),
-            "level": sorted(a_vec.level),
-            "mode": sorted(a_vec.mode),
-            "scope": a_vec.scope,
-        },
+        "question_vector": vector_to_dict(q_vec),
+        "answer_vector": vector_to_dict(a_vec),
         "debug": {"question": q_dbg, "answer": a_dbg},
         "explain": explain,
     }
 
 
+def _popcount(arr: Any) -> Any:
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(arr).astype(np.float64)
+    lut = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return lut[arr.view(np.uint8).reshape(arr.shape + (8,))].sum(axis=-1).astype(np.float64)
+
+
+def _jaccard_arrays(a: Any, b: Any) -> Any:
+    union = _popcount(a | b)
+    inter = _popcount(a & b)
+    out = np.divide(inter, union, out=np.zeros_like(union), where=union > 0)
+    # jaccard(): both empty -> 1.0
+    out[(a == 0) & (b == 0)] = 1.0
+    return out
+
+
+def score_alignment_batch(
+    q_vecs: List[StructuralVector],
+    a_vecs: List[StructuralVector],
+    vocab: Any,
+    weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Vectorized core of score_structural_alignment for many (question, answer)
+    vector pairs at once.
+
+    Returns NumPy arrays (one entry per pair, unrounded): ``structural_score``,
+    ``base_score``, ``axis_scores[axis]`` and ``flags[flag]``. Values match
+    the scalar path before its 4-decimal rounding.
+    """
+    if np is None:
+        raise RuntimeError("NumPy not available. Install numpy for batch scoring.")
+    if len(q_vecs) != len(a_vecs):
+        raise ValueError("q_vecs and a_vecs must have the same length")
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    space = compile_vocab(vocab).labels
+    for table in (space.intent, space.level, space.mode):
+        if len(table.names) > 64:
+            raise ValueError("batch scoring supports at most 64 labels per axis")
+    q_vecs = [v.in_space(space) for v in q_vecs]
+    a_vecs = [v.in_space(space) for v in a_vecs]
+
+    def masks(vecs: List[StructuralVector], attr: str) -> Any:
+        return np.fromiter((getattr(v, attr) for v in vecs), dtype=np.uint64, count=len(vecs))
+
+    # domains/scopes as small int codes; "mixed"/"other" get fixed codes
+    codes: Dict[str, int] = {"mixed": 0, "other": 1}
+
+    def encode(vecs: List[StructuralVector], attr: str) -> Any:
+        return np.fromiter(
+            (codes.setdefault(getattr(v, attr), len(codes)) for v in vecs), dtype=np.int64, count=len(vecs),
+        )
+
+    q_dom, a_dom = encode(q_vecs, "domain"), encode(a_vecs, "domain")
+    q_scope, a_scope = encode(q_vecs, "scope"), encode(a_vecs, "scope")
+    mixed, other = codes["mixed"], codes["other"]
+    boundary = codes.setdefault("boundary_extremes", len(codes))
+
+    same_dom = q_dom == a_dom
+    sim_domain = np.where(
+        same_dom, 1.0,
+        np.where(((q_dom == mixed) & (a_dom != other)) | ((a_dom == mixed) & (q_dom != other)), 0.7, 0.0),
+    )
+    sim_scope = np.where(q_scope == a_scope, 1.0, np.where((q_scope == mixed) | (a_scope == mixed), 0.7, 0.0))
+
+    q_intent, a_intent = masks(q_vecs, "intent_mask"), masks(a_vecs, "intent_mask")
+    q_level, a_level = masks(q_vecs, "level_mask"), masks(a_vecs, "level_mask")
+    axis_scores = {
+        "domain": sim_domain,
+        "intent": _jaccard_arrays(q_intent, a_intent),
+        "level": _jaccard_arrays(q_level, a_level),
+        "mode": _jaccard_arrays(masks(q_vecs, "mode_mask"), masks(a_vecs, "mode_mask")),
+        "scope": sim_scope,
+    }
+
+    n = len(q_vecs)
+    base = np.zeros(n, dtype=np.float64)
+    for k, w in weights.items():
+        if k in axis_scores:
+            base = base + w * axis_scores[k]
+
+    # same rules as detect_flags
+    q_needs = np.uint64(space.intent.mask(("explain_mechanism", "analyze_limits", "interpret_evidence")))
+    not_bad = np.uint64(~space.level.mask(("normative", "historical")) & ((1 << 64) - 1))
+    flags = {
+        "off_topic": (sim_domain == 0.0) & (axis_scores["intent"] < 0.34),
+        "category_error": ((q_intent & q_needs) != 0) & ((a_level & not_bad) == 0),
+        "scope_mismatch": (q_scope == boundary) & (a_scope != boundary) & (a_scope != mixed),
+        "stays_on_topic": same_dom | (axis_scores["intent"] >= 0.5) | (axis_scores["level"] >= 0.5),
+    }
+
+    score = base.copy()
+    for flag, factor in PENALTIES:
+        score = np.where(flags[flag], score * factor, score)
+    score = np.clip(score, 0.0, 1.0)
+
+    return {
+        "structural_score": score,
+        "base_score": base,
+        "axis_scores": axis_scores,
+        "flags": flags,
+    }
+
+
 if __name__ == "__main__":
     # quick smoke test
     sample_q = (
@@ -339,5 +553,8 @@ if __name__ == "__main__":
         "This changes what we can predict and connects to uncertainty and decoherence."
     )
 
-    vocab = load_vocab("structural_vocab.yaml")
+    # run from backend/: python -m evals.structural_scoring
+    from pathlib import Path
+
+    vocab = compile_vocab(load_vocab(str(Path(__file__).parent / "structural_vocab.yaml")))
     print(score_structural_alignment(sample_q, sample_a, vocab))
@@ -17,3 +17,11 @@ def score_run(run_id):
         )
 
     return "done"
+
+
+@shared_task
+def compact_learned_vocab():
+    """Merge logged answer terms into TestCase.learned_vocab (see evals.learning)."""
+    from .learning import compact_answer_terms
+
+    return compact_answer_terms()
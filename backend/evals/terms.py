@@ -0,0 +1,147 @@
+"""Interned learned-vocab terms.
+
+The same keywords and bigrams recur across many questions' learned vocabs.
+Each distinct term is stored once (the Term table) and a learned vocab is
+stored as term ids (``pack``), which ``unpack`` turns back into the usual
+learned_vocab dict:
+
+    {"packed": 1,
+     "keywords": [id, ...],            # domain_keywords, in order
+     "tracked": [id, ...],             # term_counts terms
+     "counts": [n, ...], "errors": [e, ...],   # parallel to "tracked"
+     "from_prompt": ..., "answer_count": ..., "revision": ...}
+
+Terms longer than MAX_TERM_CHARS are not interned and stay inline as
+strings. Packing is lossless: ``unpack(pack(lv))`` equals ``lv``. Dicts that
+are not packed (written before terms were interned) unpack as they are.
+
+A TermIndex is the in-process id <-> term map. Terms resolved through one
+index are the same string objects in every learned vocab that uses them, and
+it is filled from the DB once (scoring.preload) so forked workers share it.
+This module does not import Django; evals/fields.py connects it to the Term
+table.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Set, Tuple
+
+PACKED_FORMAT = 1
+# longer terms (rare: one pasted run of letters) are stored inline
+MAX_TERM_CHARS = 200
+
+
+class TermIndex:
+    """Thread-safe bidirectional term <-> id map."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._texts: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.max_id = 0
+
+    def add(self, pairs: Iterable[Tuple[int, str]]) -> None:
+        """Remember (id, term) pairs; only ever add committed Term rows."""
+        with self._lock:
+            for term_id, text in pairs:
+                text = sys.intern(text)
+                self._ids[text] = term_id
+                self._texts[term_id] = text
+                if term_id > self.max_id:
+                    self.max_id = term_id
+
+    def ids(self, texts: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+        """(term -> id for the known terms, the unknown terms)."""
+        known, missing = {}, []
+        with self._lock:
+            for t in texts:
+                i = self._ids.get(t)
+                if i is None:
+                    missing.append(t)
+                else:
+                    known[t] = i
+        return known, missing
+
+    def missing(self, ids: Iterable[int]) -> List[int]:
+        """The ids not known yet."""
+        texts = self._texts
+        return [i for i in ids if i not in texts]
+
+    @property
+    def texts(self) -> Mapping[int, str]:
+        """id -> term. Entries are only ever added, so it can be read without the lock."""
+        return self._texts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._texts.clear()
+            self.max_id = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+
+def is_packed(learned: Any) -> bool:
+    return isinstance(learned, dict) and learned.get("packed") == PACKED_FORMAT
+
+
+def terms_of(learned: Dict[str, Any]) -> Set[str]:
+    """Every term an unpacked learned vocab refers to that can be interned."""
+    terms = set(learned.get("domain_keywords") or ()) | set(learned.get("term_counts") or ())
+    return {t for t in terms if len(t) <= MAX_TERM_CHARS}
+
+
+def ids_of(packed: Dict[str, Any]) -> Set[int]:
+    """Every term id a packed learned vocab refers to."""
+    refs = list(packed.get("keywords") or ()) + list(packed.get("tracked") or ())
+    return {i for i in refs if isinstance(i, int)}
+
+
+def pack(learned: Dict[str, Any], ids: Mapping[str, int]) -> Dict[str, Any]:
+    """``learned`` with its terms replaced by their ids (terms missing from ``ids`` stay inline)."""
+    out = {k: v for k, v in learned.items() if k not in ("domain_keywords", "term_counts")}
+    out["packed"] = PACKED_FORMAT
+    out["keywords"] = [ids.get(t, t) for t in learned.get("domain_keywords") or ()]
+    if "term_counts" in learned:
+        counts = learned["term_counts"]
+        out["tracked"] = [ids.get(t, t) for t in counts]
+        out["counts"] = [c for c, _e in counts.values()]
+        out["errors"] = [e for _c, e in counts.values()]
+    return out
+
+
+def unpack(packed: Dict[str, Any], texts: Mapping[int, str], drop_unknown: bool = False) -> Dict[str, Any]:
+    """
+    The learned_vocab dict a packed one was built from. An id missing from
+    ``texts`` raises KeyError, or is left out with ``drop_unknown``.
+    """
+    if not is_packed(packed):
+        return packed
+    keywords = packed.get("keywords", ())
+    tracked = packed.get("tracked")
+    try:
+        kw_terms = [texts[i] for i in keywords]
+        tracked_terms = [texts[i] for i in tracked] if tracked is not None else None
+    except KeyError:  # inline terms, or ids ``texts`` lacks
+
+        def term(i):
+            if isinstance(i, str):
+                return i
+            return texts.get(i) if drop_unknown else texts[i]
+
+        kw_terms = [t for t in map(term, keywords) if t is not None]
+        tracked_terms = [term(i) for i in tracked] if tracked is not None else None
+
+    out: Dict[str, Any] = {"domain_keywords": kw_terms}
+    if tracked_terms is not None:
+        # pack kept term_counts' order, so this is sorted by term again
+        out["term_counts"] = {
+            t: [c, e] for t, c, e in zip(tracked_terms, packed["counts"], packed["errors"]) if t is not None
+        }
+    for k, v in packed.items():
+        if k not in ("packed", "keywords", "tracked", "counts", "errors"):
+            out[k] = v
+    return out
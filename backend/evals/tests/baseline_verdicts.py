@@ -0,0 +1,76 @@
+"""The seed-corpus pairs test_baseline_verdicts checks, and the script that recorded their verdicts.
+
+Each of the 150 seed prompts is paired with 15 answers (2250 pairs): its own
+expected answer, 11 other questions' answers, and three stress cases (its
+answer repeated, the prompt parroted back, two answers across a newline).
+
+baseline_verdicts.json.gz holds both verdicts for every pair as computed by
+the original scorers (structural_scoring.score_structural_alignment and
+structural.score_structural before any of the matcher, label-space or
+engine changes), recorded by running this file against a checkout of that
+tree with the same structural_vocab.yaml:
+
+    git worktree add /tmp/baseline <baseline commit>
+    cd /tmp/baseline/backend
+    DJANGO_SETTINGS_MODULE=sophistry.settings \\
+        python /path/to/backend/evals/tests/baseline_verdicts.py . /path/to/backend/evals/tests/baseline_verdicts.json.gz
+
+It only records: the verdicts are a fixed reference, so a vocab change that
+legitimately changes them needs a re-recording from the baseline scorers
+with the new vocab, never from the current ones.
+"""
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+SEED = Path(__file__).resolve().parents[2] / "seed_data" / "testcases.json"
+FIXTURE = Path(__file__).with_name("baseline_verdicts.json.gz")
+OTHERS = 11
+MIN_WORDS = 23
+MIN_SENTENCES = 2
+
+
+def pairs(seed: Path = SEED) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """(prompts, [(prompt index, answer)]) in fixture order."""
+    data = json.loads(seed.read_text(encoding="utf-8"))
+    prompts = [d["input"]["prompt"] for d in data]
+    answers = [(d.get("expected") or {}).get("answer", "") for d in data]
+    n = len(prompts)
+    out = []
+    for i, prompt in enumerate(prompts):
+        out.append((i, answers[i]))
+        out.extend((i, answers[(i + 10 * k) % n]) for k in range(1, OTHERS + 1))
+        out.append((i, ". ".join([answers[i]] * 20)))
+        out.append((i, prompt))
+        out.append((i, answers[i] + "\n" + answers[(i + 1) % n]))
+    return prompts, out
+
+
+def record(backend: str, out: str) -> None:
+    sys.path.insert(0, os.path.abspath(backend))
+    import django
+
+    django.setup()
+    from evals.structural import score_structural
+    from evals.structural_scoring import load_vocab, score_structural_alignment
+
+    vocab = load_vocab(os.path.join(backend, "evals", "structural_vocab.yaml"))
+    prompts, todo = pairs(Path(backend) / "seed_data" / "testcases.json")
+    rows = []
+    for i, answer in todo:
+        v = score_structural(prompts[i], answer, min_words=MIN_WORDS, min_sentences=MIN_SENTENCES)
+        rows.append({
+            "alignment": score_structural_alignment(prompts[i], answer, vocab),
+            "verdict": {"score_0_100": v.score_0_100, "band": v.band, "signals": v.signals, "notes": v.notes},
+        })
+    with gzip.open(out, "wt", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    print(f"recorded {len(rows)} pairs to {out}")
+
+
+if __name__ == "__main__":
+    record(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else str(FIXTURE))
@@ -0,0 +1,72 @@
+"""Both verdicts on the seed corpus, pinned against the original scorers.
+
+The fused matchers, label bitmasks, shared text analysis and scoring engine
+are all meant to be exact replacements for the original per-pattern scorers.
+baseline_verdicts.json.gz (see baseline_verdicts.py) holds what those
+scorers returned for 2250 prompt/answer pairs; every pair must still score
+the same, called directly and through the engine.
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from evals.engine import Question, answer_result, evaluate
+from evals.structural import score_structural
+from evals.structural_scoring import compile_vocab, load_vocab, score_structural_alignment
+
+from .baseline_verdicts import FIXTURE, MIN_SENTENCES, MIN_WORDS, pairs
+
+VOCAB = Path(__file__).resolve().parents[1] / "structural_vocab.yaml"
+
+
+def _verdict(v):
+    return {"score_0_100": v.score_0_100, "band": v.band, "signals": v.signals, "notes": v.notes}
+
+
+class BaselineVerdictTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with gzip.open(FIXTURE, "rt", encoding="utf-8") as f:
+            cls.expected = json.load(f)
+        cls.prompts, cls.pairs = pairs()
+        cls.vocab = compile_vocab(load_vocab(str(VOCAB)))
+
+    def assertSameVerdicts(self, actual):
+        self.assertEqual(len(actual), len(self.expected))
+        bad = [n for n, (a, e) in enumerate(zip(actual, self.expected)) if a != e]
+        if bad:
+            n = bad[0]
+            i, answer = self.pairs[n]
+            self.assertEqual(
+                actual[n], self.expected[n],
+                f"{len(bad)} of {len(actual)} pairs differ, e.g. pair {n} (prompt {i}, answer {answer[:60]!r})",
+            )
+
+    def test_scorers_match_baseline(self):
+        actual = []
+        for i, answer in self.pairs:
+            prompt = self.prompts[i]
+            actual.append({
+                "alignment": score_structural_alignment(prompt, answer, self.vocab),
+                "verdict": _verdict(
+                    score_structural(prompt, answer, min_words=MIN_WORDS, min_sentences=MIN_SENTENCES)
+                ),
+            })
+        self.assertSameVerdicts(actual)
+
+    def test_engine_matches_baseline(self):
+        questions = {}
+        actual = []
+        for i, answer in self.pairs:
+            q = questions.get(i)
+            if q is None:
+                q = questions[i] = Question(self.prompts[i], self.vocab)
+            ev = evaluate(q, answer, min_words=MIN_WORDS, min_sentences=MIN_SENTENCES)
+            result = answer_result(ev, MIN_WORDS, MIN_SENTENCES)
+            actual.append({"alignment": ev.alignment, "verdict": _verdict(ev.verdict)})
+            self.assertEqual(result["band"], ev.verdict.band)
+        self.assertSameVerdicts(actual)
@@ -0,0 +1,33 @@
+"""Question-side reuse of stored analyses."""
+
+from django.test import SimpleTestCase
+
+from evals.engine import Question
+from evals.scoring import CONFIG, OVERLAYS, _get_vocab, analyze_question
+from evals.structural_scoring import infer_structural_vector
+from evals.vocab_learner import learned_revision
+
+PROMPT = "How does a vaccine train the immune system to recognize a virus?"
+
+
+class QuestionVectorTests(SimpleTestCase):
+    def setUp(self):
+        self.base = _get_vocab()
+        self.before = {"domain_keywords": ["vaccine"], "from_prompt": True, "answer_count": 0}
+        self.after = {"domain_keywords": ["antibody", "antigen", "immune", "vaccine", "virus"], "answer_count": 9}
+
+    def _question(self, analysis, learned):
+        vocab = OVERLAYS.get(self.base, learned, "vaccines")
+        return Question(PROMPT, vocab, analysis, CONFIG, learned_revision(learned))
+
+    def test_current_analysis_is_reused(self):
+        analysis = analyze_question(PROMPT, self.after, "vaccines")
+        analysis["debug"] = {"reused": True}
+        self.assertEqual(self._question(analysis, self.after).vector[1], {"reused": True})
+
+    def test_analysis_for_an_older_learned_vocab_is_recomputed(self):
+        stale = analyze_question(PROMPT, self.before, "vaccines")
+        q = self._question(stale, self.after)
+        self.assertEqual(stale["vocab_version"], q.vocab.version)
+        self.assertEqual(q.vector, infer_structural_vector(q.text, q.vocab))
+        self.assertNotEqual(q.vector[1], stale["debug"])
@@ -0,0 +1,37 @@
+"""Preview states and the overlay cache's memory bound."""
+
+import gc
+import weakref
+
+from django.test import SimpleTestCase
+
+from evals.incremental import PreviewStates
+from evals.scoring import _get_vocab
+from evals.structural_scoring import infer_structural_vector
+from evals.vocab_learner import OverlayCache, overlay_key
+
+LEARNED = {"domain_keywords": ["enzyme", "substrate", "active site"]}
+OTHER = {"domain_keywords": ["glacier", "moraine"]}
+
+
+class PreviewStatesTests(SimpleTestCase):
+    def test_states_do_not_keep_evicted_overlays_alive(self):
+        base = _get_vocab()
+        overlays = OverlayCache(maxsize=1)
+        states = PreviewStates()
+        text = "The enzyme binds its substrate at the active site because"
+
+        vocab = overlays.get(base, LEARNED, "enzymes")
+        states.update("session", text, vocab, overlay_key(base, LEARNED, "enzymes"))
+        evicted = weakref.ref(vocab)
+        overlays.get(base, OTHER, "glaciers")
+        del vocab
+        gc.collect()
+        self.assertIsNone(evicted())
+
+        # the rebuilt overlay has the same key, so the session still resumes
+        vocab = overlays.get(base, LEARNED, "enzymes")
+        text += " its shape fits."
+        state = states.update("session", text, vocab, overlay_key(base, LEARNED, "enzymes"))
+        self.assertEqual(states.hits, 1)
+        self.assertEqual(state.vector(vocab), infer_structural_vector(text, vocab))
@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from evals import models
+from evals.question_deck import QuestionDecks
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def delete(self, key):
+        self.ops.append(lambda: self.redis.lists.pop(key, None))
+
+    def rpush(self, key, *values):
+        self.ops.append(lambda: self.redis.lists.setdefault(key, []).extend(str(v).encode() for v in values))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: None)
+
+    def execute(self):
+        for op in self.ops:
+            op()
+
+
+class FakeRedis:
+    """The slice of redis.Redis QuestionDecks uses: LPOP and a transactional pipeline."""
+
+    def __init__(self):
+        self.lists = {}
+        self.calls = 0
+
+    def lpop(self, key):
+        self.calls += 1
+        values = self.lists.get(key)
+        if not values:
+            return None
+        value = values.pop(0)
+        if not values:
+            del self.lists[key]
+        return value
+
+    def pipeline(self, transaction=True):
+        self.calls += 1
+        return FakePipeline(self)
+
+
+class BrokenRedis(FakeRedis):
+    def lpop(self, key):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+
+class QuestionDeckTests(TestCase):
+    def setUp(self):
+        self.decks = QuestionDecks("redis://decks.test/0")
+        self.decks._client = FakeRedis()
+        patcher = mock.patch("evals.views.DECKS", self.decks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.ts = models.TestSet.objects.create(name="physics")
+        self.tcs = [
+            models.TestCase.objects.create(slug=f"q{i}", prompt=f"Why does question {i} matter?", test_set=self.ts)
+            for i in range(3)
+        ]
+        res = self.client.post("/api/mobile/run/", {"test_set_id": self.ts.id}, content_type="application/json")
+        self.run_uuid = res.json()["run_uuid"]
+        self.key = self.decks.key(self.run_uuid, "run")
+
+    def deal(self, *tcs):
+        self.decks.store(self.run_uuid, "run", [tc.id for tc in tcs])
+
+    def next_question(self):
+        return self.client.get("/api/mobile/question", {"run_uuid": self.run_uuid})
+
+    def test_new_run_is_dealt_every_active_question(self):
+        self.assertEqual(sorted(int(v) for v in self.decks._client.lists[self.key]), sorted(tc.id for tc in self.tcs))
+
+    def test_pop_skips_answered_and_deactivated_questions(self):
+        answered, deactivated, left = self.tcs
+        self.deal(answered, deactivated, left)
+        run = models.Run.objects.get(run_uuid=self.run_uuid)
+        models.Result.objects.create(
+            run=run, run_uuid=run.run_uuid, testcase=answered, provider="human", model="web", input_used=answered.prompt
+        )
+        models.TestCase.objects.filter(id=deactivated.id).update(is_active=False)
+
+        res = self.next_question()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["testcase_id"], left.id)
+        self.assertEqual(self.decks.stats()["hits"], 3)
+        self.assertNotIn(self.key, self.decks._client.lists)
+
+    def test_exhausted_deck_is_rebuilt_from_the_db(self):
+        self.deal(self.tcs[0])
+        self.assertEqual(self.next_question().json()["testcase_id"], self.tcs[0].id)
+        builds = self.decks.stats()["builds"]
+
+        # skipped, not answered: the rebuilt deck deals every question again
+        res = self.next_question()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.decks.stats()["builds"], builds + 1)
+        dealt = [res.json()["testcase_id"]] + [int(v) for v in self.decks._client.lists[self.key]]
+        self.assertEqual(sorted(dealt), sorted(tc.id for tc in self.tcs))
+
+    def test_redis_failure_falls_back_to_the_db_and_backs_off(self):
+        self.decks._client = broken = BrokenRedis()
+        with self.assertLogs("evals.question_deck", "WARNING"):
+            res = self.next_question()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.decks.stats()["errors"], 1)
+        self.assertEqual(broken.calls, 1)
+
+        # within retry_after Redis is not tried again
+        self.assertEqual(self.next_question().status_code, 200)
+        self.assertEqual(broken.calls, 1)
+
+        # after it, decks are used again
+        self.decks._client = FakeRedis()
+        with mock.patch("evals.question_deck.time.monotonic", return_value=self.decks._down_until + 1):
+            self.deal(self.tcs[2])
+            res = self.next_question()
+        self.assertEqual(res.json()["testcase_id"], self.tcs[2].id)
+        self.assertEqual(self.decks.stats()["errors"], 1)
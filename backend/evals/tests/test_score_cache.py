@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from evals import score_cache
+from evals.config import DEFAULT_CONFIG
+from evals.score_cache import score_key, scorer_fingerprint
+from evals.scoring import CONFIG, score_case
+
+
+class ScoreKeyTests(SimpleTestCase):
+    def key(self, config):
+        return score_key("Why?", "Because.", "v1", "0", "", scorer_fingerprint(config), 8)
+
+    def test_same_scorer_same_key(self):
+        self.assertEqual(self.key(DEFAULT_CONFIG), self.key(DEFAULT_CONFIG.replace()))
+
+    def test_score_affecting_settings_change_the_key(self):
+        limited = DEFAULT_CONFIG.replace(max_analyzed_chars=DEFAULT_CONFIG.max_analyzed_chars + 1)
+        self.assertNotEqual(self.key(DEFAULT_CONFIG), self.key(limited))
+
+    def test_cache_settings_do_not_change_the_key(self):
+        resized = DEFAULT_CONFIG.replace(score_cache_l1_size=1, overlay_cache_size=1, profile=True)
+        self.assertEqual(self.key(DEFAULT_CONFIG), self.key(resized))
+
+    def test_scoring_code_changes_the_key(self):
+        key = self.key(DEFAULT_CONFIG)
+        # stands in for a change to one of the scoring modules
+        with mock.patch.object(score_cache, "SCORING_MODULES", score_cache.SCORING_MODULES[:-1]):
+            self.assertNotEqual(self.key(DEFAULT_CONFIG), key)
+
+
+class ScoreCaseCacheTests(SimpleTestCase):
+    def test_over_budget_answers_do_not_share_an_entry(self):
+        prompt = "Why does a compass needle point north?"
+        limit = CONFIG.max_analyzed_chars
+        answer = "The needle is a small magnet that lines up with the magnetic field of the earth. " * (limit // 80 + 10)
+        first = score_case(prompt, answer)["score_details"]["truncated"]
+        second = score_case(prompt, answer + "And so on. " * 5000)["score_details"]["truncated"]
+        self.assertEqual(first["total_chars"], len(answer))
+        self.assertEqual(second["total_chars"], len(answer) + len("And so on. ") * 5000)
+        self.assertEqual(first["analyzed_chars"], second["analyzed_chars"])
@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, OperationalError
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from evals import models, views
+from evals.scoring import SCORES, analyze_question, preload
+from evals.vocab_learner import extract_from_prompt
+
+
+class ScoringMetricsTests(TestCase):
+    url = "/api/scoring/metrics/"
+
+    def test_requires_staff(self):
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+        user = get_user_model().objects.create_user("player", password="pw")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_reports_this_process_to_staff(self):
+        staff = get_user_model().objects.create_user("ops", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("score_cache", res.json())
+
+
+class TestCaseCreateTests(TestCase):
+    prompt = "Why do seasons change on Earth even though its distance from the Sun barely varies?"
+
+    def test_api_create_seeds_learned_vocab(self):
+        res = self.client.post(
+            "/api/testcases/", {"slug": "seasons", "prompt": self.prompt}, content_type="application/json"
+        )
+        self.assertEqual(res.status_code, 201)
+        tc = models.TestCase.objects.get(id=res.json()["id"])
+        self.assertEqual(tc.learned_vocab, extract_from_prompt(self.prompt))
+
+    def test_given_learned_vocab_is_kept(self):
+        learned = {"domain_keywords": ["axis", "tilt"], "from_prompt": False, "answer_count": 3}
+        tc = models.TestCase.objects.create(slug="tilt", prompt=self.prompt, learned_vocab=learned)
+        self.assertEqual(models.TestCase.objects.get(id=tc.id).learned_vocab, learned)
+
+
+class MobileAnswerTests(TestCase):
+    prompt = "Why does ice float on liquid water when most solids sink in their own liquid?"
+    answer = (
+        "Ice floats because hydrogen bonds hold water molecules in an open lattice when it freezes. "
+        "So ice is less dense than the liquid, and therefore it floats."
+    )
+
+    def setUp(self):
+        self.tc = models.TestCase.objects.create(slug="floating-ice", prompt=self.prompt)
+        self.run = models.Run.objects.create(name="mobile")
+
+    def _answer(self):
+        return self.client.post(
+            "/api/mobile/answer/",
+            {"run_uuid": str(self.run.run_uuid), "testcase_id": self.tc.id, "answer": self.answer},
+            content_type="application/json",
+        )
+
+    def test_answer_is_scored_against_the_stored_learned_vocab(self):
+        preview = self.client.post(
+            "/api/mobile/preview_score/", {"testcase_id": self.tc.id, "answer": self.answer},
+            content_type="application/json",
+        ).json()
+        hits = SCORES.l1_hits + SCORES.l2_hits
+        res = self._answer()
+        self.assertEqual(res.status_code, 200)
+        # the answer reuses the score its preview cached
+        self.assertEqual(res.json()["score_details"], preview["score_details"])
+        self.assertEqual(SCORES.l1_hits + SCORES.l2_hits, hits + 1)
+        self.assertEqual(models.TestCase.objects.get(id=self.tc.id).learned_vocab, self.tc.learned_vocab)
+
+    def test_terms_are_logged_only_for_a_stored_answer(self):
+        self.assertEqual(self._answer().status_code, 200)
+        self.assertEqual(models.AnswerTerms.objects.filter(testcase=self.tc).count(), 1)
+        with mock.patch.object(models.Result.objects, "create", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                self._answer()
+        self.assertEqual(models.AnswerTerms.objects.filter(testcase=self.tc).count(), 1)
+
+
+class PreviewWritesTests(TestCase):
+    prompt = "What makes a rainbow form after a storm?"
+
+    def setUp(self):
+        self.tc = models.TestCase.objects.create(slug="rainbow", prompt=self.prompt)
+
+    def test_full_save_stores_a_current_analysis(self):
+        analysis = models.TestCase.objects.get(id=self.tc.id).question_analysis
+        self.assertEqual(analysis, analyze_question(self.prompt, self.tc.learned_vocab, "rainbow"))
+
+    def test_previews_do_not_write_a_stale_analysis(self):
+        models.TestCase.objects.filter(id=self.tc.id).update(question_analysis=None)
+        body = {"testcase_id": self.tc.id, "answer": "Sunlight is refracted and reflected inside raindrops."}
+        for url in ("/api/mobile/preview_score/", "/api/mobile/validate/"):
+            self.assertEqual(self.client.post(url, body, content_type="application/json").status_code, 200)
+        self.assertIsNone(models.TestCase.objects.get(id=self.tc.id).question_analysis)
+
+    def test_preload_does_not_write_analyses(self):
+        models.TestCase.objects.filter(id=self.tc.id).update(question_analysis=None)
+        self.assertEqual(preload()["questions"], 1)
+        self.assertIsNone(models.TestCase.objects.get(id=self.tc.id).question_analysis)
+
+    def test_preload_starts_without_the_db(self):
+        with mock.patch("evals.scoring.load_terms", side_effect=OperationalError("no such table")):
+            with self.assertLogs("evals.scoring", "WARNING"):
+                stats = preload()
+        self.assertEqual(stats["questions"], 0)
+        self.assertTrue(stats["vocab_version"])
+
+
+class QuestionSetsTests(TestCase):
+    def setUp(self):
+        self.run = models.Run.objects.create(name="mobile")
+        for name in ("alpha", "beta", "gamma"):
+            ts = models.TestSet.objects.create(name=name)
+            for i in range(3):
+                tc = models.TestCase.objects.create(slug=f"{name}-{i}", prompt=f"Why does {name} {i} hold?", test_set=ts)
+                if i == 0 and name != "gamma":
+                    # answered twice: counted once
+                    for _ in range(2):
+                        models.Result.objects.create(
+                            run=self.run, run_uuid=self.run.run_uuid, testcase=tc,
+                            provider="human", model="web", input_used=tc.prompt,
+                        )
+        models.TestCase.objects.filter(slug="beta-2").update(is_active=False)
+        models.TestCase.objects.create(slug="loose", prompt="Why is this question in no set?")
+
+    def get_sets(self):
+        request = APIRequestFactory().get("/api/mobile/question_sets", {"run_uuid": str(self.run.run_uuid)})
+        return views.mobile_question_sets(request).data["sets"]
+
+    def test_counts_in_a_constant_number_of_queries(self):
+        with self.assertNumQueries(3):
+            sets = self.get_sets()
+        counts = {s["name"]: (s["count"], s["answered"]) for s in sets}
+        self.assertEqual(counts, {"all": (9, 2), "alpha": (3, 1), "beta": (2, 1), "gamma": (3, 0)})
+
+        models.TestSet.objects.create(name="delta")
+        with self.assertNumQueries(3):
+            self.get_sets()
@@ -0,0 +1,67 @@
+"""Online compaction and offline relearn must learn the same vocab from the same answers."""
+
+import random
+from unittest import mock
+
+from django.test import TestCase
+
+from evals import learning, models
+from evals.config import DEFAULT_CONFIG
+from evals.vocab_learner import extract_from_prompt, learn_answers, merge_keywords
+
+# small enough that the answers below cross several half-lives and evictions
+CONFIG = DEFAULT_CONFIG.replace(learned_counters=12, learned_half_life=7)
+
+PROMPT = "Why does a heavier object not fall faster than a lighter one in a vacuum?"
+TERMS = ["mass", "gravity", "inertia", "vacuum", "acceleration", "air", "resistance", "force",
+         "galileo", "newton", "weight", "drag", "feather", "hammer", "moon", "equal", "cancel"]
+
+
+def _answers(n, seed=0):
+    rng = random.Random(seed)
+    return [sorted(set(rng.sample(TERMS, rng.randint(1, 6)))) for _ in range(n)]
+
+
+def _split(answers, sizes):
+    i = 0
+    for size in sizes:
+        yield answers[i:i + size]
+        i += size
+    yield answers[i:]
+
+
+class LearnAnswersTests(TestCase):
+    def test_batching_does_not_change_the_result(self):
+        answers = _answers(60)
+        seed = extract_from_prompt(PROMPT)
+        expected = learn_answers(seed, answers, config=CONFIG)
+
+        one_by_one = seed
+        for keywords in answers:
+            one_by_one = merge_keywords(one_by_one, keywords, config=CONFIG)
+        self.assertEqual(one_by_one, expected)
+
+        for sizes in ([5, 3, 13, 1, 20], [6, 6, 6], [59]):
+            batched = seed
+            for batch in _split(answers, sizes):
+                batched = learn_answers(batched, batch, config=CONFIG)
+            self.assertEqual(batched, expected, sizes)
+
+
+class CompactionTests(TestCase):
+    def test_compaction_matches_relearn(self):
+        answers = _answers(45, seed=1)
+        tc = models.TestCase.objects.create(
+            slug="falling-objects", prompt=PROMPT, learned_vocab=extract_from_prompt(PROMPT)
+        )
+        with mock.patch.object(learning, "CONFIG", CONFIG):
+            for keywords in answers:
+                learning.record_answer_terms(tc, keywords)
+            # batches that cut across half-life boundaries
+            learning.compact_answer_terms(batch_size=4)
+
+        compacted = models.TestCase.objects.get(id=tc.id).learned_vocab
+        relearned = learn_answers(extract_from_prompt(PROMPT), answers, config=CONFIG)
+        self.assertEqual(compacted["answer_count"], 45)
+        self.assertEqual(compacted["domain_keywords"], relearned["domain_keywords"])
+        self.assertEqual(compacted["term_counts"], relearned["term_counts"])
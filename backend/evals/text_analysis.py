@@ -0,0 +1,124 @@
+"""Shared per-text analysis for the scorers.
+
+structural_scoring, structural and vocab_learner each need a different view
+of the same answer: lowercased, whitespace-normalized, split into words or
+sentences. AnalyzedText computes each view once, on first use, so a request
+that runs several scorers over one answer lowercases and splits it once.
+
+Every function that takes text accepts either a plain string or an
+AnalyzedText; use ``analyze()`` to get the latter.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cached_property
+from typing import FrozenSet, List, Optional, Tuple, Union
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\b[\w']+\b", re.UNICODE)
+_SENT_SPLIT_RE = re.compile(r"[.!?]+(?:\s|$)")
+_LEARNER_WORD_RE = re.compile(r"[a-z][a-z0-9'-]*[a-z0-9]|[a-z]")
+_RUN_RE = re.compile(r"\w+")
+
+
+def truncate(text: str, max_chars: Optional[int]) -> str:
+    """
+    The first ``max_chars`` characters of ``text`` (all of it if
+    ``max_chars`` is falsy), cut back to a preceding space if there is one
+    within the last 64 characters, so the last word is not split.
+    Deterministic: the same text and limit always give the same prefix.
+    """
+    if not max_chars or max_chars < 0 or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    i = max(cut.rfind(" ", max_chars - 64), cut.rfind("\n", max_chars - 64))
+    return cut[:i] if i > 0 else cut
+
+
+class AnalyzedText:
+    """Lazily computed views of one text, each derived at most once."""
+
+    def __init__(self, text: str, max_chars: Optional[int] = None):
+        """Only the first ``max_chars`` characters are analyzed (see truncate)."""
+        text = text or ""
+        self.original_length: int = len(text)
+        self.raw: str = truncate(text, max_chars)
+
+    def __repr__(self) -> str:
+        return f"AnalyzedText({self.raw[:40]!r})"
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.raw) < self.original_length
+
+    @cached_property
+    def stripped(self) -> str:
+        return self.raw.strip()
+
+    @cached_property
+    def lower(self) -> str:
+        """Stripped and lowercased."""
+        return self.stripped.lower()
+
+    @cached_property
+    def normalized(self) -> str:
+        """Stripped, lowercased, runs of whitespace collapsed to one space."""
+        return _WS_RE.sub(" ", self.lower)
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Word tokens (letters, digits, apostrophes) in original case."""
+        return _WORD_RE.findall(self.raw)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Lowercased word tokens."""
+        return [w.lower() for w in self.words]
+
+    @cached_property
+    def token_set(self) -> FrozenSet[str]:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def word_runs(self) -> FrozenSet[str]:
+        """
+        Maximal ``\\w+`` runs of ``lower``: for a word-character-only ``k``,
+        ``k in word_runs`` iff ``re.search(rf"\\b{k}\\b", lower)``.
+        """
+        return frozenset(_RUN_RE.findall(self.lower))
+
+    @cached_property
+    def sentence_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets into ``stripped`` of each non-blank sentence."""
+        t = self.stripped
+        spans: List[Tuple[int, int]] = []
+        start = 0
+        for m in _SENT_SPLIT_RE.finditer(t):
+            if t[start:m.start()].strip():
+                spans.append((start, m.start()))
+            start = m.end()
+        if t[start:].strip():
+            spans.append((start, len(t)))
+        return spans
+
+    @cached_property
+    def sentence_count(self) -> int:
+        if not self.stripped:
+            return 0
+        return max(1, len(self.sentence_spans))
+
+    @cached_property
+    def learner_words(self) -> List[str]:
+        """Lowercase alphanumeric/hyphenated words, as used by vocab_learner."""
+        return _LEARNER_WORD_RE.findall(self.normalized)
+
+
+TextLike = Union[str, AnalyzedText]
+
+
+def analyze(text: TextLike, max_chars: Optional[int] = None) -> AnalyzedText:
+    """``text`` as an AnalyzedText; an AnalyzedText is returned as is."""
+    if isinstance(text, AnalyzedText):
+        return text
+    return AnalyzedText(text, max_chars)
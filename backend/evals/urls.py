@@ -21,4 +21,5 @@ urlpatterns = [
     path("api/mobile/testcase/", views.mobile_create_testcase),
     path("api/mobile/review/", review),
     path("api/mobile/stats", views.mobile_stats),
+    path("api/scoring/metrics/", views.scoring_metrics),
 ]
@@ -1,15 +1,18 @@
-from .scoring import score_case
+from .scoring import budget_text, preview_state, question_analysis, score_case, scoring_stats
 import os
 import random
 from django.http import JsonResponse
-from rest_framework import decorators, response, status, viewsets
+from django.db.models import Count
+from rest_framework import decorators, permissions, response, status, viewsets
 from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import TestSet, TestCase, Run, Result
 from .serializers import TestSetSerializer, TestCaseSerializer, RunSerializer, ResultSerializer
 from evals.tasks import score_run
-from .vocab_learner import extract_from_prompt, merge_answer_vocab
+from .learning import record_answer_terms
+from .question_deck import DECKS
+from .vocab_learner import extract_from_prompt, extract_keywords, merge_answer_vocab
 
 def perform_create(self, serializer):
     run = serializer.save()
@@ -37,6 +40,17 @@ def mobile_info(request):
     })
 
 
+@decorators.api_view(["GET"])
+@decorators.permission_classes([permissions.IsAdminUser])
+def scoring_metrics(request):
+    """Scoring cache counters (score cache hit rate etc.) and stage timers, for staff users.
+
+    The numbers are per process: each gunicorn worker keeps its own caches
+    and counters, and this reports only the worker that served the request.
+    """
+    return response.Response(scoring_stats())
+
+
 
 @decorators.api_view(["GET"])
 def mobile_question_sets(request):
@@ -47,35 +61,45 @@ def mobile_question_sets(request):
     """
     run_uuid = request.query_params.get("run_uuid")
 
-    answered_ids = set()
+    # A constant number of queries however many sets: active questions and
+    # this run's distinct answered questions, each grouped by set (None for
+    # questions in no set)
+    totals = dict(
+        TestCase.objects.filter(is_active=True)
+        .order_by()
+        .values("test_set_id")
+        .annotate(n=Count("id"))
+        .values_list("test_set_id", "n")
+    )
+    answered_by_set = {}
     if run_uuid:
-        answered_ids = set(
+        answered_by_set = dict(
             Result.objects.filter(run_uuid=run_uuid, provider="human")
-            .values_list("testcase_id", flat=True)
+            .order_by()
+            .values("testcase__test_set_id")
+            .annotate(n=Count("testcase_id", distinct=True))
+            .values_list("testcase__test_set_id", "n")
         )
 
     sets = []
     qs = TestSet.objects.all().order_by("name")
     for s in qs:
-        total = TestCase.objects.filter(is_active=True, test_set=s).count()
+        total = totals.get(s.id, 0)
         if total == 0 and s.is_active is False:
             # hide empty + inactive sets
             continue
-        answered = 0
-        if answered_ids:
-            answered = TestCase.objects.filter(id__in=answered_ids, test_set=s).count()
         sets.append({
             "id": s.id,
             "name": s.name,
             "description": s.description,
             "is_active": s.is_active,
             "count": total,
-            "answered": answered,
+            "answered": answered_by_set.get(s.id, 0),
         })
 
     # Pseudo-set: all active questions
-    all_total = TestCase.objects.filter(is_active=True).count()
-    all_answered = len(answered_ids) if answered_ids else 0
+    all_total = sum(totals.values())
+    all_answered = sum(answered_by_set.values())
     sets.insert(0, {
         "id": None,
         "name": "all",
@@ -136,9 +160,47 @@ def mobile_create_run(request):
         status="created",
         filters=filters or None,
     )
+    # deal the run's question deck now, so its first question is a pop too
+    # (a new run has no answers to exclude)
+    if DECKS.enabled:
+        active = TestCase.objects.filter(is_active=True)
+        if filters.get("test_set_id"):
+            active = active.filter(test_set_id=filters["test_set_id"])
+        ids = list(active.values_list("id", flat=True))
+        random.shuffle(ids)
+        DECKS.store(str(run.run_uuid), "run", ids)
     return response.Response({"run_uuid": str(run.run_uuid)})
 
 
+def _deck_scope(test_set_id, test_set_name) -> str:
+    """Deck key suffix for the set a mobile_question request asks for (mirrors its resolution)."""
+    if test_set_name and test_set_name.strip().lower() == "all":
+        return "all"
+    if test_set_id:
+        return f"set:{int(test_set_id)}"
+    if test_set_name:
+        return f"name:{test_set_name}"
+    return "run"
+
+
+def _questions():
+    # only what mobile_question returns (not learned_vocab / question_analysis)
+    return TestCase.objects.select_related("test_set").only(
+        "id", "slug", "title", "prompt", "test_set__name"
+    )
+
+
+def _answered(run_uuid):
+    return Result.objects.filter(run_uuid=run_uuid, provider="human").values("testcase_id")
+
+
+def _unanswered_ids(run_uuid, test_set_id) -> list:
+    remaining = TestCase.objects.filter(is_active=True).exclude(id__in=_answered(run_uuid))
+    if test_set_id:
+        remaining = remaining.filter(test_set_id=int(test_set_id))
+    return list(remaining.values_list("id", flat=True))
+
+
 @decorators.api_view(["GET"])
 def mobile_question(request):
     run_uuid = request.query_params.get("run_uuid")
@@ -153,44 +215,53 @@ def mobile_question(request):
     test_set_id = request.query_params.get("test_set_id")
     test_set_name = request.query_params.get("test_set") or request.query_params.get("set")
 
-    if test_set_name:
-        if test_set_name.strip().lower() == "all":
-            test_set_id = None
-        elif not test_set_id:
-            try:
-                ts = TestSet.objects.get(name=test_set_name)
-                test_set_id = ts.id
-            except TestSet.DoesNotExist:
-                # ignore unknown set name (acts like "all")
-                test_set_id = None
-
-    if not test_set_id:
-        try:
-            run = Run.objects.get(run_uuid=run_uuid)
-            test_set_id = (run.filters or {}).get("test_set_id")
-        except Run.DoesNotExist:
-            pass
-
-    # Exclude questions already answered in this run
-    answered_ids = list(
-        Result.objects.filter(run_uuid=run_uuid, provider="human")
-        .values_list("testcase_id", flat=True)
-    )
-    remaining = TestCase.objects.filter(is_active=True).exclude(id__in=answered_ids)
-    if test_set_id:
-        remaining = remaining.filter(test_set_id=int(test_set_id))
-    ids = list(remaining.values_list("id", flat=True))
-
-    if not ids:
-        return response.Response({"detail": "no more questions"}, status=404)
-
-    tc = TestCase.objects.get(id=random.choice(ids))
-
-    # Seed learned_vocab from prompt if not yet populated
-    if not tc.learned_vocab:
-        tc.learned_vocab = extract_from_prompt(tc.prompt)
-        tc.save(update_fields=["learned_vocab"])
+    # Next question from the run's deck for this set, if it has one
+    scope = _deck_scope(test_set_id, test_set_name)
+    tc = None
+    while tc is None:
+        next_id = DECKS.pop(run_uuid, scope)
+        if next_id is None:
+            break
+        # skip questions deactivated since the deck was dealt, or answered
+        # since (e.g. through another set's deck of the same run)
+        tc = (
+            _questions()
+            .filter(id=next_id, is_active=True)
+            .exclude(id__in=_answered(run_uuid))
+            .first()
+        )
 
+    if tc is None:
+        if test_set_name:
+            if test_set_name.strip().lower() == "all":
+                test_set_id = None
+            elif not test_set_id:
+                try:
+                    ts = TestSet.objects.get(name=test_set_name)
+                    test_set_id = ts.id
+                except TestSet.DoesNotExist:
+                    # ignore unknown set name (acts like "all")
+                    test_set_id = None
+
+        if not test_set_id:
+            try:
+                run = Run.objects.get(run_uuid=run_uuid)
+                test_set_id = (run.filters or {}).get("test_set_id")
+            except Run.DoesNotExist:
+                pass
+
+        # Exclude questions already answered in this run
+        ids = _unanswered_ids(run_uuid, test_set_id)
+        if not ids:
+            return response.Response({"detail": "no more questions"}, status=404)
+
+        # deal the rest as the deck for the next requests
+        random.shuffle(ids)
+        DECKS.store(run_uuid, scope, ids[1:])
+        tc = _questions().get(id=ids[0])
+
+    # learned_vocab is seeded when testcases are created and rebuilt by
+    # manage.py relearn_vocab, so this read path never writes
     return response.Response({
         "testcase_id": tc.id,
         "slug": tc.slug,
@@ -217,13 +288,17 @@ def mobile_answer(request):
 
     run = Run.objects.get(run_uuid=run_uuid)
     tc = TestCase.objects.get(id=testcase_id)
+    analyzed = budget_text(answer)
 
-    # Learn vocabulary from this answer
-    tc.learned_vocab = merge_answer_vocab(tc.learned_vocab, answer)
-    tc.save(update_fields=["learned_vocab"])
+    # Scored against the stored learned vocab, so its revision (and the
+    # question analysis, overlay and cached scores keyed by it, e.g. this
+    # answer's last preview) stays the same between compactions
+    analysis = question_analysis(tc, save=False)
 
     # Structural scoring with learned vocab
-    score_result = score_case(tc.prompt, answer, learned_vocab=tc.learned_vocab, question_slug=tc.slug)
+    score_result = score_case(
+        tc.prompt, analyzed, learned_vocab=tc.learned_vocab, question_slug=tc.slug, analysis=analysis,
+    )
     raw = score_result.get("score", 0) or 0
     # score is already 0..1 from structural_scoring; normalize defensively
     normalized_score = round(raw if raw <= 1.0 else raw / 100.0, 2)
@@ -241,6 +316,12 @@ def mobile_answer(request):
         status="done",
     )
 
+    # Learn vocabulary from this answer: its terms go to the append-only log,
+    # merged into tc.learned_vocab by the compaction task (the testcase row
+    # is not written here). Logged once its Result exists, so a failed
+    # submission leaves no terms behind.
+    record_answer_terms(tc, extract_keywords(analyzed))
+
     # Update run counters
     run.completed = Result.objects.filter(run_uuid=run.run_uuid, status="done").count()
     run.total = max(run.total, run.completed)
@@ -254,6 +335,18 @@ def mobile_answer(request):
     })
 
 
+def _preview_key(request, tc):
+    """Incremental-scoring key for this editing session, or None to score in full.
+
+    Clients opt in by sending a ``revision`` id with each keystroke's request;
+    it is echoed back so stale responses can be dropped.
+    """
+    session_id = getattr(request, "sophistry_session_id", None)
+    if request.data.get("revision") is None or not session_id:
+        return None
+    return (session_id, tc.id)
+
+
 @decorators.api_view(["POST"])
 def mobile_preview_score(request):
     """Preview structural score without creating a Result."""
@@ -270,17 +363,25 @@ def mobile_preview_score(request):
     except TestCase.DoesNotExist:
         return response.Response({"detail": "unknown testcase_id"}, status=404)
 
-    score_result = score_case(tc.prompt, answer, learned_vocab=tc.learned_vocab, question_slug=tc.slug)
+    state = None
+    key = _preview_key(request, tc)
+    if key is not None:
+        state = preview_state(key, answer, tc.learned_vocab, tc.slug, request.data.get("revision"))
+    score_result = score_case(
+        tc.prompt, answer, learned_vocab=tc.learned_vocab, question_slug=tc.slug,
+        analysis=question_analysis(tc, save=False), answer_state=state,
+    )
     raw = score_result.get("score", 0) or 0
     normalized_score = round(raw if raw <= 1.0 else raw / 100.0, 2)
 
-    return response.Response(
-        {
-            "ok": True,
-            "score": normalized_score,
-            "score_details": score_result,
-        }
-    )
+    payload = {
+        "ok": True,
+        "score": normalized_score,
+        "score_details": score_result,
+    }
+    if state is not None:
+        payload["revision"] = state.revision
+    return response.Response(payload)
 
 
 @decorators.api_view(["POST"])
@@ -295,10 +396,24 @@ def mobile_validate(request):
     min_words = int(request.data.get("min_words", _s.SOPHISTRY_MIN_WORDS))
     min_sentences = int(request.data.get("min_sentences", _s.SOPHISTRY_MIN_SENTENCES))
 
+    tc = None
+    if testcase_id:
+        try:
+            tc = TestCase.objects.get(id=testcase_id)
+        except TestCase.DoesNotExist:
+            pass
+
     # --- basic validation (always returned) ---
     from .structural import count_words, count_sentences
-    wc = count_words(answer)
-    sc = count_sentences(answer)
+    analyzed = budget_text(answer)
+    state = None
+    key = _preview_key(request, tc) if tc is not None else None
+    if key is not None:
+        state = preview_state(key, answer, tc.learned_vocab, tc.slug, request.data.get("revision"))
+        wc, sc = state.word_count, state.sentence_count
+    else:
+        wc = count_words(analyzed)
+        sc = count_sentences(analyzed)
     validation = {
         "word_count": wc,
         "sentence_count": sc,
@@ -310,25 +425,28 @@ def mobile_validate(request):
     }
 
     payload = {"ok": True, "validation": validation}
+    if state is not None:
+        payload["revision"] = state.revision
 
     # --- optional scoring (needs a prompt) ---
     question_text = None
     learned = None
     slug = "q"
-    tc = None
-    if testcase_id:
-        try:
-            tc = TestCase.objects.get(id=testcase_id)
-            question_text = tc.prompt
-            learned = tc.learned_vocab
-            slug = tc.slug
-        except TestCase.DoesNotExist:
-            pass
+    analysis = None
+    if tc is not None:
+        question_text = tc.prompt
+        learned = tc.learned_vocab
+        slug = tc.slug
     if not question_text and prompt:
         question_text = prompt
 
     if question_text and answer.strip():
-        score_result = score_case(question_text, answer, learned_vocab=learned, question_slug=slug)
+        if tc is not None and question_text == tc.prompt:
+            analysis = question_analysis(tc, save=False)
+        score_result = score_case(
+            question_text, analyzed, learned_vocab=learned, question_slug=slug, analysis=analysis,
+            answer_state=state,
+        )
         raw = score_result.get("score", 0) or 0
         normalized_score = round(raw if raw <= 1.0 else raw / 100.0, 2)
         payload["scored"] = True
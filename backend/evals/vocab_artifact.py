@@ -0,0 +1,158 @@
+"""Precompiled structural vocab artifact.
+
+``manage.py compile_vocab`` turns structural_vocab.yaml into a JSON artifact
+(structural_vocab.json next to it by default) that workers load at boot
+without PyYAML:
+
+- ``labels``: every label name once (a deduplicated table);
+- ``patterns``: every distinct marker regex once, in first-seen order;
+- ``axes``: per marker axis, in vocab order, one ``[label, [pattern ids],
+  local, reach]`` row per label. ``local`` and ``reach`` are the match
+  analysis the incremental scorer otherwise derives by parsing each regex;
+- ``domains`` and any other top-level vocab keys, as they were;
+- ``version``: the vocab's content hash (CompiledVocab.version). Loading
+  rebuilds the vocab dict and checks it still hashes to ``version``, so a
+  corrupt or hand-edited artifact is rejected.
+
+Regexes are still compiled when the artifact is loaded (compiled patterns
+cannot be serialized); what the artifact removes is the YAML parse, the lint
+pass and the per-pattern analysis.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .structural_scoring import CompiledVocab, compile_vocab, vocab_version
+from .vocab_lint import _MARKER_AXES, lint_vocab
+
+ARTIFACT_FORMAT = "sophistry-structural-vocab"
+# Bump when the artifact layout changes; older artifacts are rejected.
+ARTIFACT_SCHEMA = 1
+
+
+def build_artifact(vocab: Dict[str, Any], source: Optional[str] = None) -> Dict[str, Any]:
+    """The artifact for a vocab dict. Raises re.error for an invalid pattern."""
+    cv = compile_vocab(vocab)  # validates every pattern
+    labels: List[str] = []
+    label_ids: Dict[str, int] = {}
+    patterns: List[str] = []
+    pattern_ids: Dict[str, int] = {}
+    axes: Dict[str, List[list]] = {}
+    for axis, matcher in zip(_MARKER_AXES, (cv.intent, cv.level, cv.mode, cv.scope)):
+        rows = []
+        by_label = vocab.get(axis) or {}
+        for j, label in enumerate(matcher.labels):
+            if label not in label_ids:
+                label_ids[label] = len(labels)
+                labels.append(label)
+            ids = []
+            for p in by_label[label]:
+                if p not in pattern_ids:
+                    pattern_ids[p] = len(patterns)
+                    patterns.append(p)
+                ids.append(pattern_ids[p])
+            rows.append([label_ids[label], ids, matcher.local[j], matcher.reach[j]])
+        # labels with no patterns are kept (they are part of the content hash)
+        empty = [label for label, ps in by_label.items() if not ps]
+        axes[axis] = rows
+        if empty:
+            axes[axis + ":empty"] = empty
+    extra = {k: v for k, v in vocab.items() if k not in _MARKER_AXES and k != "domains"}
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "schema": ARTIFACT_SCHEMA,
+        "version": cv.version,
+        "source": source,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "lint": lint_vocab(vocab),
+        "labels": labels,
+        "patterns": patterns,
+        "axes": axes,
+        "domains": vocab.get("domains") or {},
+        "extra": extra,
+        "axis_present": [axis for axis in _MARKER_AXES if axis in vocab],
+        "domains_present": "domains" in vocab,
+    }
+    vocab_from_artifact(artifact)  # round-trips to the same content hash
+    return artifact
+
+
+def is_artifact(obj: Any) -> bool:
+    return isinstance(obj, dict) and obj.get("format") == ARTIFACT_FORMAT
+
+
+def vocab_from_artifact(artifact: Dict[str, Any]) -> Dict[str, Any]:
+    """The vocab dict an artifact was built from. Raises ValueError if invalid."""
+    if not is_artifact(artifact):
+        raise ValueError("not a structural vocab artifact")
+    if artifact.get("schema") != ARTIFACT_SCHEMA:
+        raise ValueError(f"artifact schema {artifact.get('schema')}, expected {ARTIFACT_SCHEMA}; rebuild it")
+    labels = artifact["labels"]
+    patterns = artifact["patterns"]
+    vocab: Dict[str, Any] = dict(artifact.get("extra") or {})
+    if artifact.get("domains_present", True):
+        vocab["domains"] = artifact["domains"]
+    for axis in artifact.get("axis_present", _MARKER_AXES):
+        by_label: Dict[str, List[str]] = {}
+        for label_id, ids, _local, _reach in artifact["axes"].get(axis, []):
+            by_label[labels[label_id]] = [patterns[i] for i in ids]
+        for label in artifact["axes"].get(axis + ":empty", []):
+            by_label[label] = []
+        vocab[axis] = by_label
+    if vocab_version(vocab) != artifact["version"]:
+        raise ValueError(f"artifact content does not match its version {artifact['version']}")
+    return vocab
+
+
+def compile_artifact(artifact: Dict[str, Any]) -> CompiledVocab:
+    """CompiledVocab for an artifact, reusing its precomputed match analysis."""
+    vocab = vocab_from_artifact(artifact)
+    reach = {
+        axis: [(bool(local), reach) for _label, _ids, local, reach in artifact["axes"].get(axis, [])]
+        for axis in _MARKER_AXES
+    }
+    return CompiledVocab(vocab, reach=reach)
+
+
+def read_artifact(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        artifact = json.load(f)
+    if not is_artifact(artifact):
+        raise ValueError(f"{path} is not a structural vocab artifact")
+    return artifact
+
+
+def write_artifact(artifact: Dict[str, Any], path: str) -> None:
+    """Write atomically, so a reloading worker never reads a partial file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def artifact_path(source: str) -> str:
+    """Default artifact location for a vocab source file."""
+    return str(Path(source).with_suffix(".json"))
+
+
+def preferred_vocab_path(source: str) -> str:
+    """
+    The artifact built from ``source`` if there is one at least as new as
+    ``source``; otherwise ``source`` itself (so editing the YAML without
+    rebuilding falls back to it rather than scoring with a stale artifact).
+    """
+    art = artifact_path(source)
+    if art == source or not os.path.exists(art):
+        return source
+    try:
+        if os.stat(art).st_mtime_ns < os.stat(source).st_mtime_ns:
+            return source
+    except OSError:  # no source next to the artifact
+        pass
+    return art
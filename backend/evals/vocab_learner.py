@@ -2,7 +2,7 @@
 
 On each answer submission, we:
 1. Extract meaningful terms from the answer
-2. Merge them into TestCase.learned_vocab
+2. Log them (evals.learning), to be merged into TestCase.learned_vocab in batches
 3. When scoring, overlay learned_vocab onto the base vocab as a question-specific domain
 
 This means the scorer gets smarter for each question as more people answer it.
@@ -10,9 +10,17 @@ This means the scorer gets smarter for each question as more people answer it.
 
 from __future__ import annotations
 
-import re
-from collections import Counter
-from typing import Dict, List, Set, Any, Optional
+import hashlib
+import heapq
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Set, Any, Optional, Tuple
+
+from .config import DEFAULT_CONFIG, ScoringConfig
+from .profiling import PROFILER
+from .structural_scoring import CompiledVocab
+from .text_analysis import TextLike, analyze
 
 # Common English stopwords — kept minimal and deterministic
 STOPWORDS: Set[str] = {
@@ -51,15 +59,14 @@ MIN_WORD_LEN = 3
 MAX_LEARNED_KEYWORDS = 200
 
 
-def extract_keywords(text: str, min_len: int = MIN_WORD_LEN) -> List[str]:
+def extract_keywords(text: TextLike, min_len: int = MIN_WORD_LEN) -> List[str]:
     """Extract meaningful keywords from text, removing stopwords and short words.
 
     Returns lowercased unique terms sorted by frequency (most common first).
     Also extracts bigrams that appear meaningful (noun-noun, adj-noun patterns).
     """
-    t = text.strip().lower()
-    # Split into words, keeping only alphanumeric + hyphens
-    words = re.findall(r"[a-z][a-z0-9'-]*[a-z0-9]|[a-z]", t)
+    # Words keeping only alphanumeric + hyphens
+    words = analyze(text).learner_words
 
     # Filter
     meaningful = [w for w in words if len(w) >= min_len and w not in STOPWORDS]
@@ -98,51 +105,268 @@ def extract_from_prompt(prompt: str) -> Dict[str, Any]:
 
 def merge_answer_vocab(
     existing: Optional[Dict[str, Any]],
-    answer_text: str,
+    answer_text: TextLike,
 ) -> Dict[str, Any]:
     """Merge keywords from a new answer into the existing learned_vocab.
 
     Grows the keyword set over time as more answers come in.
     """
+    return merge_keywords(existing, extract_keywords(answer_text))
+
+
+class TermCounter:
+    """Approximate top-k term counts in bounded memory (Space-Saving).
+
+    At most ``capacity`` terms are tracked. A term seen when all counters are
+    taken replaces the term with the smallest count and inherits that count
+    (recorded as its ``error``, the most it can be overestimated by). Any term
+    whose true count exceeds total / capacity is guaranteed to be tracked, so
+    frequent terms get in however late they first appear. Work per added term
+    is O(log capacity), independent of how many answers came before.
+    """
+
+    __slots__ = ("capacity", "counts", "errors")
+
+    def __init__(self, capacity: int, counts: Optional[Dict[str, float]] = None, errors: Optional[Dict[str, float]] = None):
+        self.capacity = max(1, capacity)
+        self.counts: Dict[str, float] = dict(counts or {})
+        errors = errors or {}
+        self.errors: Dict[str, float] = {k: errors.get(k, 0) for k in self.counts}
+
+    @classmethod
+    def from_learned(cls, learned: Dict[str, Any], capacity: int) -> "TermCounter":
+        """The counter stored in a learned_vocab (legacy ones count each keyword once)."""
+        stored = learned.get("term_counts")
+        if stored is None:
+            return cls(capacity, {k: 1 for k in learned.get("domain_keywords", [])})
+        c = cls(capacity, {k: v[0] for k, v in stored.items()}, {k: v[1] for k, v in stored.items()})
+        c._truncate()
+        return c
+
+    def to_json(self) -> Dict[str, List[float]]:
+        return {k: [_num(self.counts[k]), _num(self.errors.get(k, 0))] for k in sorted(self.counts)}
+
+    def add(self, terms: Iterable[str], weight: float = 1) -> None:
+        counts, errors = self.counts, self.errors
+        heap: Optional[List[Tuple[float, str]]] = None  # built on the first eviction
+        for t in terms:
+            if t in counts:
+                counts[t] += weight
+                continue
+            if len(counts) < self.capacity:
+                counts[t] = weight
+                errors[t] = 0
+                continue
+            if heap is None:
+                heap = [(c, k) for k, c in counts.items()]
+                heapq.heapify(heap)
+            while True:  # skip entries whose count has grown since they were pushed
+                c, k = heap[0]
+                if counts.get(k) == c:
+                    break
+                if k in counts:
+                    heapq.heapreplace(heap, (counts[k], k))
+                else:
+                    heapq.heappop(heap)
+            heapq.heappop(heap)
+            del counts[k]
+            del errors[k]
+            counts[t] = c + weight
+            errors[t] = c
+            heapq.heappush(heap, (counts[t], t))
+
+    def merge(self, other: "TermCounter") -> None:
+        """Add another counter's counts (e.g. from a parallel pass), keeping the largest."""
+        for k, c in other.counts.items():
+            self.counts[k] = self.counts.get(k, 0) + c
+            self.errors[k] = self.errors.get(k, 0) + other.errors.get(k, 0)
+        self._truncate()
+
+    def age(self, factor: float) -> None:
+        """Scale every count (e.g. 0.5 per half-life) so newer terms can displace old ones."""
+        for k in self.counts:
+            self.counts[k] *= factor
+            self.errors[k] = self.errors.get(k, 0) * factor
+
+    def top(self, n: int) -> List[str]:
+        """The ``n`` most frequent terms (ties by term), in alphabetical order."""
+        best = heapq.nsmallest(n, self.counts, key=lambda k: (-self.counts[k], k))
+        return sorted(best)
+
+    def _truncate(self) -> None:
+        if len(self.counts) > self.capacity:
+            keep = set(heapq.nsmallest(self.capacity, self.counts, key=lambda k: (-self.counts[k], k)))
+            self.counts = {k: c for k, c in self.counts.items() if k in keep}
+            self.errors = {k: e for k, e in self.errors.items() if k in keep}
+
+
+def _num(x: float) -> float:
+    # whole counts stay ints; fractional ones (after aging) are kept exactly,
+    # so a stored counter resumes where an in-memory one would have been
+    return int(x) if x == int(x) else x
+
+
+def merge_keywords(
+    existing: Optional[Dict[str, Any]],
+    keywords: Iterable[str],
+    config: Optional[ScoringConfig] = None,
+) -> Dict[str, Any]:
+    """Merge one answer's already-extracted keywords into learned_vocab.
+
+    Each answer's keywords (unique per answer) feed the question's TermCounter
+    (``term_counts``, at most ``config.learned_counters`` terms), which is
+    aged by half every ``config.learned_half_life`` answers.
+    ``domain_keywords``, what overlays and revisions are built from, is its
+    current top MAX_LEARNED_KEYWORDS terms. A ``revision`` counter, if
+    present, is carried over unchanged.
+    """
+    with PROFILER.stage("vocab_learning"):
+        return learn_answers(existing, (keywords,), config=config)
+
+
+def learn_answers(
+    existing: Optional[Dict[str, Any]],
+    answers: Iterable[Iterable[str]],
+    config: Optional[ScoringConfig] = None,
+) -> Dict[str, Any]:
+    """Merge many answers' keywords (one iterable per answer, in answer order) into learned_vocab.
+
+    The same as calling merge_keywords once per answer, whichever way the
+    answers are split between calls (aging happens at the same answers), but
+    the counter is decoded and encoded once rather than per answer.
+    ``answers`` is consumed lazily, so it can be a stream.
+    """
+    config = config or DEFAULT_CONFIG
     if existing is None:
         existing = {"domain_keywords": [], "from_prompt": False, "answer_count": 0}
 
-    current_kws: Set[str] = set(existing.get("domain_keywords", []))
-    new_kws = extract_keywords(answer_text)
-
-    # Add new terms
-    current_kws.update(new_kws)
+    n = existing.get("answer_count", 0)
+    half_life = config.learned_half_life
+    counter = TermCounter.from_learned(existing, config.learned_counters)
+    for keywords in answers:
+        counter.add(keywords)
+        n += 1
+        if half_life > 0 and n % half_life == 0:
+            counter.age(0.5)
+    return _learned(existing, counter, n)
 
-    # Cap at max
-    kw_list = sorted(current_kws)[:MAX_LEARNED_KEYWORDS]
 
-    return {
-        "domain_keywords": kw_list,
+def _learned(existing: Dict[str, Any], counter: TermCounter, answer_count: int) -> Dict[str, Any]:
+    merged = {
+        "domain_keywords": counter.top(MAX_LEARNED_KEYWORDS),
+        "term_counts": counter.to_json(),
         "from_prompt": existing.get("from_prompt", False),
-        "answer_count": existing.get("answer_count", 0) + 1,
+        "answer_count": answer_count,
     }
+    if "revision" in existing:
+        merged["revision"] = existing["revision"]
+    return merged
+
+
+def learned_revision(learned: Optional[Dict[str, Any]]) -> str:
+    """Identify a learned_vocab state, for tagging anything derived from it.
+
+    Content-based, so rows written before revisions were tracked still get a
+    stable id. Empty/missing learned vocab is revision "0".
+    """
+    if not learned or not learned.get("domain_keywords"):
+        return "0"
+    blob = json.dumps(learned["domain_keywords"], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
 
 
 def overlay_vocab(
-    base_vocab: Dict[str, Any],
+    base_vocab: Any,
     learned: Optional[Dict[str, Any]],
     question_slug: str = "question",
-) -> Dict[str, Any]:
-    """Create an augmented vocab dict by adding learned keywords as a question-specific domain.
+) -> Any:
+    """Create an augmented vocab by adding learned keywords as a question-specific domain.
 
     The learned keywords become an additional domain entry so the structural scorer
     can match answers against question-specific vocabulary, not just the base vocab.
+    Accepts a raw vocab dict or a CompiledVocab and returns the same kind; a
+    CompiledVocab overlay reuses the base vocab's compiled marker regexes.
     """
     if not learned or not learned.get("domain_keywords"):
         return base_vocab
 
+    # Add question-specific domain with learned keywords
+    domain_name = f"q_{question_slug}"
+
+    if isinstance(base_vocab, CompiledVocab):
+        domains = dict(base_vocab.domains)
+        domains[domain_name] = learned["domain_keywords"]
+        return base_vocab.with_domains(domains)
+
     # Deep-ish copy of domains
     augmented = dict(base_vocab)
     domains = dict(base_vocab.get("domains", {}))
-
-    # Add question-specific domain with learned keywords
-    domain_name = f"q_{question_slug}"
     domains[domain_name] = learned["domain_keywords"]
     augmented["domains"] = domains
 
     return augmented
+
+
+def overlay_key(base_vocab: CompiledVocab, learned: Optional[Dict[str, Any]], question_slug: str = "question") -> tuple:
+    """(question_slug, learned revision, base version): what overlay_vocab's result depends on."""
+    if not learned or not learned.get("domain_keywords"):
+        return ("", "0", base_vocab.version)  # the base vocab itself
+    return (question_slug, learned_revision(learned), base_vocab.version)
+
+
+class OverlayCache:
+    """LRU of overlay vocabs keyed by (question_slug, learned revision, base version).
+
+    Building an overlay compiles a matcher for up to MAX_LEARNED_KEYWORDS
+    terms; scoring one question against many answers (previews) should pay
+    that once. Bounded to ``maxsize`` overlays; counts hits, misses and
+    evictions.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, base_vocab: CompiledVocab, learned: Optional[Dict[str, Any]], question_slug: str = "question") -> Any:
+        """overlay_vocab(base_vocab, learned, question_slug), cached."""
+        if not learned or not learned.get("domain_keywords") or self.maxsize <= 0:
+            return overlay_vocab(base_vocab, learned, question_slug)
+        key = overlay_key(base_vocab, learned, question_slug)
+        with self._lock:
+            vocab = self._items.get(key)
+            if vocab is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return vocab
+            self.misses += 1
+        # build outside the lock; a concurrent miss on the same key just
+        # builds an identical overlay
+        with PROFILER.stage("overlay_build"):
+            vocab = overlay_vocab(base_vocab, learned, question_slug)
+        with self._lock:
+            self._items[key] = vocab
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return vocab
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,117 @@
+"""Checks for structural vocab marker patterns that could backtrack badly.
+
+``lint_vocab`` flags risky patterns statically (load_vocab logs them, and
+manage.py lint_vocab / compile_vocab / publish_vocab report them);
+``time_patterns`` times each pattern on a given text or an adversarial probe.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from .structural_matchers import _GapPattern, _sre_constants, _sre_parse
+from .text_analysis import analyze
+
+
+_MARKER_AXES = ("intent_markers", "level_markers", "mode_markers", "scope_markers")
+
+
+def lint_pattern(pattern: str) -> List[str]:
+    """
+    Backtracking risks in one marker pattern (empty if none found):
+
+    - an unbounded repeat nested in another (exponential on some inputs);
+    - an unbounded repeat followed by more pattern (quadratic: each start
+      position can scan the rest of the text and back off again), except the
+      ``.*`` of an ``X.*Y`` pattern, which is run as a _GapPattern.
+    """
+    try:
+        tree = _sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as e:
+        return [f"does not compile: {e}"]
+    c = _sre_constants
+    repeats = (c.MAX_REPEAT, c.MIN_REPEAT)
+    gap_ok = _GapPattern.split(pattern) is not None
+    issues: List[str] = []
+
+    def subpatterns(av: Any):
+        if isinstance(av, _sre_parse.SubPattern):
+            yield av
+        elif isinstance(av, (list, tuple)):
+            for x in av:
+                yield from subpatterns(x)
+
+    def has_unbounded(node: Any) -> bool:
+        for op, av in node:
+            if op in repeats and av[1] == c.MAXREPEAT:
+                return True
+            if any(has_unbounded(sub) for sub in subpatterns(av)):
+                return True
+        return False
+
+    def walk(node: Any, top: bool) -> None:
+        items = list(node)
+        for i, (op, av) in enumerate(items):
+            if op in repeats and av[1] == c.MAXREPEAT:
+                body = av[2]
+                if has_unbounded(body):
+                    issues.append("nested unbounded repetition (exponential backtracking risk)")
+                is_gap = top and gap_ok and op == c.MAX_REPEAT and list(body) == [(c.ANY, None)]
+                if not is_gap and any(o != c.AT for o, _ in items[i + 1:]):
+                    issues.append("unbounded repetition followed by more pattern (quadratic on long input)")
+            for sub in subpatterns(av):
+                walk(sub, False)
+
+    walk(tree, True)
+    return list(dict.fromkeys(issues))
+
+
+def lint_vocab(vocab: Dict[str, Any]) -> List[str]:
+    """lint_pattern() over every marker pattern, as "axis.label: pattern: issue" lines."""
+    out: List[str] = []
+    for axis in _MARKER_AXES:
+        for label, patterns in (vocab.get(axis) or {}).items():
+            for p in patterns or []:
+                for issue in lint_pattern(p):
+                    out.append(f"{axis}.{label}: {p!r}: {issue}")
+    return out
+
+
+def _probe_text(pattern: str, size: int) -> str:
+    """Adversarial probe for a pattern: its first literal word repeated, e.g. "if if if ..."."""
+    words = re.findall(r"[a-z]{2,}", re.sub(r"\\[a-zA-Z]", " ", pattern.lower()))
+    unit = (words[0] if words else "a") + " "
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def time_patterns(vocab: Any, text: Optional[str] = None, size: int = 20000) -> List[Dict[str, Any]]:
+    """
+    Time every marker pattern on its own, the way the matcher runs it, on
+    ``text`` (normalized first) or, if None, on an adversarial probe of
+    ``size`` characters built from the pattern itself. Slowest first.
+    """
+    raw = getattr(vocab, "raw", vocab)  # a vocab dict or a CompiledVocab
+    t = analyze(text).normalized if text is not None else None
+    rows: List[Dict[str, Any]] = []
+    for axis in _MARKER_AXES:
+        for label, patterns in (raw.get(axis) or {}).items():
+            for p in patterns or []:
+                gap = _GapPattern.split(p)
+                probe = t if t is not None else _probe_text(p, size)
+                start = time.perf_counter()
+                if gap is not None:
+                    gap.search(probe)
+                else:
+                    re.compile(p, re.IGNORECASE).search(probe)
+                rows.append({
+                    "axis": axis,
+                    "label": label,
+                    "pattern": p,
+                    "gap": gap is not None,
+                    "chars": len(probe),
+                    "seconds": time.perf_counter() - start,
+                })
+    rows.sort(key=lambda r: r["seconds"], reverse=True)
+    return rows
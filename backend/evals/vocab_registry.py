@@ -0,0 +1,171 @@
+"""Versioned, hot-reloadable structural vocab.
+
+The registry holds the CompiledVocab used for scoring and swaps in a new one
+when its source changes, without a restart:
+
+- a DB-stored vocab (the active StructuralVocab row), if there is one, else
+- the file at STRUCTURAL_VOCAB_PATH: a YAML vocab, or a compile_vocab
+  artifact (``.json``, see vocab_artifact), which loads without PyYAML and
+  with its pattern analysis precomputed.
+
+Every vocab is identified by its content hash (CompiledVocab.version), so
+anything derived from a vocab can be tagged with the version that produced it.
+Changes are picked up by a background thread that compiles the new vocab and
+then replaces the reference in one assignment; requests never compile and
+always see either the old or the new vocab, never a mix.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .structural_scoring import CompiledVocab, compile_vocab, load_vocab, vocab_version
+from .vocab_artifact import compile_artifact, is_artifact, read_artifact
+
+logger = logging.getLogger(__name__)
+
+# Returns (version, vocab dict) of the DB-stored vocab, or None to use the file.
+DbSource = Callable[[], Optional[Tuple[str, Dict[str, Any]]]]
+
+# Recently active versions kept around for lookups by version id.
+KEEP_VERSIONS = 4
+
+
+class VocabRegistry:
+    def __init__(
+        self,
+        path: str,
+        db_source: Optional[DbSource] = None,
+        poll_seconds: float = 30.0,
+        after_poll: Optional[Callable[[], None]] = None,
+    ):
+        """
+        ``poll_seconds`` <= 0 disables background reloading. ``after_poll``
+        runs in the watcher thread after each check (e.g. to close the DB
+        connection that thread opened).
+        """
+        self.path = path
+        self.db_source = db_source
+        self.poll_seconds = poll_seconds
+        self.after_poll = after_poll
+        self._current: Optional[CompiledVocab] = None
+        self._signature: Any = None
+        self._versions: "OrderedDict[str, CompiledVocab]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._watcher_pid: Optional[int] = None
+
+    def current(self) -> CompiledVocab:
+        """The vocab to score with. Loads synchronously only on first use."""
+        cv = self._current
+        if cv is None:
+            with self._lock:
+                if self._current is None:
+                    self._refresh_locked()
+            cv = self._current
+        self._ensure_watcher()
+        return cv
+
+    def preload(self) -> CompiledVocab:
+        """
+        Load the vocab without starting the watcher thread, for a process that
+        is about to fork (a thread, and a lock it holds, would not survive the
+        fork). Each child starts its own watcher on first ``current()``.
+        """
+        with self._lock:
+            if self._current is None:
+                self._refresh_locked()
+            return self._current
+
+    def get(self, version: str) -> Optional[CompiledVocab]:
+        """A recently active vocab by version id, if still held."""
+        return self._versions.get(version)
+
+    def refresh(self) -> bool:
+        """Reload if the source changed. Returns True if a new version was swapped in."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def install(self, vocab: Any) -> CompiledVocab:
+        """Swap in ``vocab`` directly (tests, tooling, preloading)."""
+        cv = compile_vocab(vocab)
+        with self._lock:
+            self._swap(cv)
+        return cv
+
+    def _source(self) -> Tuple[Any, Optional[Callable[[], Dict[str, Any]]]]:
+        """(signature, loader) of the source that should be active now.
+
+        If the DB cannot be read, the current vocab stays (loader None); only
+        the very first load falls back to the file.
+        """
+        if self.db_source is not None:
+            try:
+                row = self.db_source()
+            except Exception as e:
+                if self._current is not None:
+                    logger.warning("Could not read DB-stored vocab (%s); keeping %s", e, self._current.version)
+                    return self._signature, None
+                logger.warning("Could not read DB-stored vocab (%s); using %s", e, self.path)
+                row = None
+            if row is not None:
+                version, content = row
+                return ("db", version), (lambda: content)
+        try:
+            st = os.stat(self.path)
+            sig: Any = ("file", self.path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            sig = ("file", self.path, None, None)
+        if self.path.endswith(".json"):
+            return sig, (lambda: read_artifact(self.path))
+        return sig, (lambda: load_vocab(self.path))
+
+    def _refresh_locked(self) -> bool:
+        sig, loader = self._source()
+        if loader is None or (sig == self._signature and self._current is not None):
+            return False
+        vocab = loader()
+        artifact = is_artifact(vocab)
+        version = vocab["version"] if artifact else vocab_version(vocab)
+        self._signature = sig
+        if self._current is not None and version == self._current.version:
+            return False
+        cv = self._versions.get(version) or (compile_artifact(vocab) if artifact else compile_vocab(vocab))
+        self._swap(cv)
+        logger.info("Structural vocab %s active (source %s)", cv.version, sig[0])
+        return True
+
+    def _swap(self, cv: CompiledVocab) -> None:
+        self._versions[cv.version] = cv
+        self._versions.move_to_end(cv.version)
+        while len(self._versions) > KEEP_VERSIONS:
+            self._versions.popitem(last=False)
+        self._current = cv  # single reference assignment: the atomic swap
+
+    def _ensure_watcher(self) -> None:
+        # (Re)start per process: threads do not survive a fork.
+        if self.poll_seconds <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            t = threading.Thread(target=self._watch, name="vocab-registry", daemon=True)
+            t.start()
+
+    def _watch(self) -> None:
+        pid = os.getpid()
+        while self._watcher_pid == pid:
+            time.sleep(self.poll_seconds)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Structural vocab reload failed; keeping %s",
+                                 self._current.version if self._current else None)
+            finally:
+                if self.after_poll is not None:
+                    self.after_poll()
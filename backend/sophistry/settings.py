@@ -118,8 +118,36 @@ REST_FRAMEWORK = {
 }
 
 # ─── Scoring defaults ─────────────────────────────────────
+# Read by evals/scoring.py into a ScoringConfig; the Django-free scoring core
+# defaults to evals.config.ScoringConfig.from_env(), which reads the same variables.
 SOPHISTRY_MIN_WORDS = int(os.getenv("SCORING_MIN_WORDS", 23))
 SOPHISTRY_MIN_SENTENCES = int(os.getenv("SCORING_MIN_SENTENCES", 2))
+# How often each process checks for a changed vocab (file or DB); 0 disables
+SOPHISTRY_VOCAB_RELOAD_SECONDS = float(os.getenv("SCORING_VOCAB_RELOAD_SECONDS", 30))
+# Per-process LRU of per-question learned-vocab overlays
+SOPHISTRY_OVERLAY_CACHE_SIZE = int(os.getenv("SCORING_OVERLAY_CACHE_SIZE", 256))
+# Per-process LRU of in-progress answers for incremental preview scoring
+SOPHISTRY_PREVIEW_STATE_SIZE = int(os.getenv("SCORING_PREVIEW_STATE_SIZE", 1024))
+# Content-addressed score_case cache: TTL in seconds (0 disables), in-process
+# L1 entries, and the CACHES alias of the shared layer ("" for L1 only).
+# Eviction of the shared layer follows the Redis maxmemory-policy.
+SOPHISTRY_SCORE_CACHE_TTL = int(os.getenv("SCORING_CACHE_TTL", 3600))
+SOPHISTRY_SCORE_CACHE_L1_SIZE = int(os.getenv("SCORING_CACHE_L1_SIZE", 2048))
+SOPHISTRY_SCORE_CACHE_ALIAS = os.getenv("SCORING_CACHE_ALIAS", "default")
+# Only the first N characters of an answer/prompt are analyzed (0 = no limit)
+SOPHISTRY_MAX_ANALYZED_CHARS = int(os.getenv("SCORING_MAX_ANALYZED_CHARS", 20000))
+# Per-stage scoring timers (evals/profiling.py), reported by /api/scoring/metrics/
+# and as score_details["debug"]["timings_ms"]; off by default
+SOPHISTRY_PROFILE_SCORING = os.getenv("SCORING_PROFILE", "false").lower() in ("1","true","yes","y")
+
+# Answers append their keywords to a log; a periodic task merges it into
+# TestCase.learned_vocab, at most this many answers per transaction
+SOPHISTRY_VOCAB_COMPACT_SECONDS = float(os.getenv("SCORING_VOCAB_COMPACT_SECONDS", 60))
+SOPHISTRY_VOCAB_COMPACT_BATCH = int(os.getenv("SCORING_VOCAB_COMPACT_BATCH", 2000))
+# Learned vocab: terms counted per question (the top 200 are used for scoring),
+# and answers per halving of their counts so newer terms can displace old ones
+SOPHISTRY_LEARNED_COUNTERS = int(os.getenv("SCORING_LEARNED_COUNTERS", 400))
+SOPHISTRY_LEARNED_HALF_LIFE = int(os.getenv("SCORING_LEARNED_HALF_LIFE", 1000))
 
 CELERY_BROKER_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = "django-db"
@@ -127,6 +155,14 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+# run by the worker started with CELERY_BEAT=true (see entrypoint.sh)
+CELERY_BEAT_SCHEDULE = {
+    "compact-learned-vocab": {
+        "task": "evals.tasks.compact_learned_vocab",
+        "schedule": SOPHISTRY_VOCAB_COMPACT_SECONDS,
+        "options": {"queue": "default"},  # the queue entrypoint.sh workers consume
+    },
+}
 
 REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1")
 CACHES = {
@@ -136,3 +172,8 @@ CACHES = {
         "TIMEOUT": 30,
     }
 }
+
+# Per-run shuffled question decks (evals/question_deck.py): Redis URL ("" to
+# always select from the DB) and how long an idle run's deck is kept
+SOPHISTRY_QUESTION_DECK_URL = os.getenv("QUESTION_DECK_REDIS_URL", REDIS_CACHE_URL)
+SOPHISTRY_QUESTION_DECK_TTL = int(os.getenv("QUESTION_DECK_TTL", 86400))
@@ -19,4 +19,5 @@ urlpatterns = [
     path("api/mobile/validate/", views.mobile_validate),
     path("api/mobile/review/", review),
     path("api/mobile/testcase/", views.mobile_create_testcase),
+    path("api/scoring/metrics/", views.scoring_metrics),
 ]